@@ -0,0 +1,276 @@
+"""
+Benchmarks of the analysis hot paths: `python -m benchmarks.run` from the repository root.
+
+Every case is timed over a grid of team counts and season counts. Results are appended to a
+JSON-lines history, and the run fails (exit status 1) when a case is slower than the median of
+its previous runs on the same machine, Python and NumPy by more than `--threshold`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from src.calculations.power_law import TauPowerLaw
+from src.calculations.simulation import simulate_seasons
+from src.calculations.table_generation import generate_table, rank_tensor_to_table
+from src.calculations.transition_table import calculate_transitions_history
+from src.calculations.utils import spearman_tau_curves, spearman_tau_mean, spearman_tau_table
+from src.scraping.html_table import format_standings_data, parse_standings_html
+
+BENCHMARKS_FOLDER: str = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_HTML: str = os.path.join(BENCHMARKS_FOLDER, "fixtures", "formtabelle.html")
+DEFAULT_HISTORY: str = os.path.join(BENCHMARKS_FOLDER, "history.jsonl")
+
+TEAM_COUNTS: Tuple[int, ...] = (10, 20, 30)
+SEASON_COUNTS: Tuple[int, ...] = (10, 100, 1000)
+QUICK_TEAM_COUNTS: Tuple[int, ...] = (20,)
+QUICK_SEASON_COUNTS: Tuple[int, ...] = (10, 100)
+
+# A case is a name and a function that builds its inputs and returns the callable to time
+Case = Tuple[str, Callable[[], Callable[[], object]]]
+
+
+def build_cases(team_counts: Sequence[int], season_counts: Sequence[int]) -> Iterator[Case]:
+    """
+    Yields every benchmark case of the grid.
+
+    Parameters:
+        team_counts (sequence): The numbers of teams of the simulated leagues.
+        season_counts (sequence): The numbers of seasons, for the cases working on many seasons.
+
+    Returns:
+        iterator: (name, prepare) pairs, where `prepare()` builds the inputs and returns the timed callable.
+    """
+    for n_teams in team_counts:
+        yield f"generate_table[teams={n_teams}]", lambda n_teams=n_teams: (
+            lambda: generate_table(1.325, n_teams=n_teams, random_seed=42)
+        )
+
+        def prepare_table(n_teams: int = n_teams):
+            year_table = generate_table(1.325, n_teams=n_teams, random_seed=42)
+            return lambda: spearman_tau_table(year_table)
+
+        yield f"spearman_tau_table[teams={n_teams}]", prepare_table
+
+        def prepare_power_law(n_teams: int = n_teams):
+            n_rounds = 2 * (n_teams - 1)
+            taus = 0.45 * np.arange(1, n_rounds + 1) ** -0.35
+            return lambda: TauPowerLaw.get_power_law_coefficients(taus, 1, n_rounds)
+
+        yield f"TauPowerLaw.get_power_law_coefficients[teams={n_teams}]", prepare_power_law
+
+        for n_seasons in season_counts:
+
+            def prepare_mean(n_teams: int = n_teams, n_seasons: int = n_seasons):
+                rho, tau = spearman_tau_curves(_rank_tables(n_teams, n_seasons))
+                return lambda: spearman_tau_mean(tau, rho)
+
+            yield f"spearman_tau_mean[teams={n_teams},seasons={n_seasons}]", prepare_mean
+
+            def prepare_transitions(n_teams: int = n_teams, n_seasons: int = n_seasons):
+                rank_tables = _rank_tables(n_teams, n_seasons)
+                return lambda: calculate_transitions_history(rank_tables, init_round=10, final_round=2 * (n_teams - 1))
+
+            yield f"calculate_transitions_history[teams={n_teams},seasons={n_seasons}]", prepare_transitions
+
+    def prepare_standings():
+        with open(FIXTURE_HTML, encoding="utf-8") as fixture_file:
+            html = fixture_file.read()
+
+        def parse_and_format():
+            headers, rows, indexes = parse_standings_html(html)
+            return format_standings_data(rows, headers, indexes)
+
+        return parse_and_format
+
+    yield "format_standings_data[fixture=formtabelle.html]", prepare_standings
+
+
+def time_case(function: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> float:
+    """
+    Times a callable like `timeit`: calls are grouped so every sample lasts at least `min_time`.
+
+    Parameters:
+        function (callable): The callable to time.
+        min_time (float, optional): The shortest duration of a sample, in seconds. Default is 0.2.
+        repeat (int, optional): The number of samples. Default is 5.
+
+    Returns:
+        float: The best time of a single call, in seconds.
+    """
+    number: int = 1
+    while True:
+        start: float = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed: float = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    samples: List[float] = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number)
+
+    return min(samples)
+
+
+def find_regressions(
+    results: Dict[str, float],
+    history: List[Dict],
+    threshold: float,
+    window: int = 5,
+    environment: Dict[str, str] = None,
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Compares the results of a run with the median of the previous runs of every case.
+
+    Parameters:
+        results (dict): The seconds per call of every case.
+        history (list): The previous runs, oldest first.
+        threshold (float): The accepted relative slowdown, such as 0.2 for 20%.
+        window (int, optional): The number of previous runs the baseline is the median of. Default is 5.
+        environment (dict, optional): The machine, Python and NumPy versions of the run, as in
+            `run_environment`. If given, only previous runs with the same ones are compared.
+
+    Returns:
+        dict: The (baseline, current) seconds of every case slower than the threshold.
+    """
+    if environment is not None:
+        # Timings from another machine or another NumPy build say nothing about this run
+        history = [run for run in history if all(run.get(key) == value for key, value in environment.items())]
+
+    regressions: Dict[str, Tuple[float, float]] = {}
+
+    for name, seconds in results.items():
+        previous: List[float] = [run["results"][name] for run in history if name in run["results"]][-window:]
+        if not previous:
+            continue
+
+        baseline: float = statistics.median(previous)
+        if seconds > baseline * (1 + threshold):
+            regressions[name] = (baseline, seconds)
+
+    return regressions
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """
+    Runs the benchmarks, saves them in the history and checks them for regressions.
+
+    Parameters:
+        argv (sequence, optional): The arguments, without the program name. If None, `sys.argv[1:]`.
+
+    Returns:
+        int: The exit status, 1 if any case regressed.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="The JSON-lines history file.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Accepted relative slowdown. Default is 0.2.")
+    parser.add_argument("--window", type=int, default=5, help="Previous runs the baseline is the median of.")
+    parser.add_argument("--quick", action="store_true", help="Only run a small part of the grid.")
+    parser.add_argument("--filter", default="", help="Only run the cases whose name contains this text.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Shortest duration of a sample, in seconds.")
+    parser.add_argument("--no-save", action="store_true", help="Do not append this run to the history.")
+    args = parser.parse_args(argv)
+
+    team_counts = QUICK_TEAM_COUNTS if args.quick else TEAM_COUNTS
+    season_counts = QUICK_SEASON_COUNTS if args.quick else SEASON_COUNTS
+
+    results: Dict[str, float] = {}
+    for name, prepare in build_cases(team_counts, season_counts):
+        if args.filter not in name:
+            continue
+
+        results[name] = time_case(prepare(), min_time=args.min_time)
+        print(f"{name:<70} {_format_seconds(results[name]):>10}")
+
+    history: List[Dict] = _read_history(args.history)
+    regressions = find_regressions(results, history, args.threshold, args.window, run_environment())
+
+    if not args.no_save:
+        with open(args.history, "a", encoding="utf-8") as history_file:
+            history_file.write(json.dumps(_run_record(results)) + "\n")
+
+    for name, (baseline, seconds) in regressions.items():
+        print(
+            f"REGRESSION {name}: {_format_seconds(seconds)} vs {_format_seconds(baseline)} "
+            f"({seconds / baseline - 1:+.0%})",
+            file=sys.stderr,
+        )
+
+    return 1 if regressions else 0
+
+
+def run_environment() -> Dict[str, str]:
+    """
+    Returns what a timing depends on besides the code: the machine, the Python and the NumPy versions.
+
+    Returns:
+        dict: The "machine", "python" and "numpy" entries of a history record.
+    """
+    return {"machine": platform.node(), "python": platform.python_version(), "numpy": np.__version__}
+
+
+def _rank_tables(n_teams: int, n_seasons: int) -> list:
+    """
+    Simulates the rank tables used as inputs, with a fixed seed so every run times the same data.
+    """
+    return [rank_tensor_to_table(ranks) for ranks in simulate_seasons(1.325, n_teams, n_seasons, random_seed=7)]
+
+
+def _read_history(path: str) -> List[Dict]:
+    """
+    Reads the previous runs of a history file, oldest first.
+    """
+    if not os.path.exists(path):
+        return []
+
+    with open(path, encoding="utf-8") as history_file:
+        return [json.loads(line) for line in history_file if line.strip()]
+
+
+def _run_record(results: Dict[str, float]) -> Dict:
+    """
+    Builds the history entry of a run, with enough context to compare runs across machines.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=BENCHMARKS_FOLDER
+        ).stdout.strip()
+    except OSError:
+        commit = None
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit or None,
+        **run_environment(),
+        "results": results,
+    }
+
+
+def _format_seconds(seconds: float) -> str:
+    """
+    Formats a duration with a readable unit.
+    """
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
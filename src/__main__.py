@@ -0,0 +1,251 @@
+"""
+Command line entry points: `python -m src analyze data/ --output results/` and
+`python -m src render data/ --output figures/`.
+
+Only the standard library is imported at startup. NumPy, pandas and SciPy are imported by the
+workers, and only for leagues whose inputs changed since the last run.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+SUMMARY_FILE: str = "summary.json"
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """
+    Parses the command line and runs the requested command.
+
+    Parameters:
+        argv (sequence, optional): The arguments, without the program name. If None, `sys.argv[1:]`.
+
+    Returns:
+        int: The exit status.
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="python -m src")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser(
+        "analyze",
+        help="Computes the curves, power-law fits and transition tables of every league of a data folder.",
+    )
+    analyze.add_argument("data_folder", help="A league folder with rank_tables/, or a folder of league folders.")
+    analyze.add_argument("--output", default="results", help="Where the results are written. Default is results/.")
+    analyze.add_argument("--leagues", nargs="*", help="Only analyze these leagues.")
+    analyze.add_argument("--workers", type=int, default=os.cpu_count(), help="Leagues analyzed in parallel.")
+    analyze.add_argument(
+        "--transition-rounds",
+        type=int,
+        nargs="*",
+        default=[10, 20, 30],
+        help="Rounds the transition tables start from. Default is 10 20 30.",
+    )
+    analyze.add_argument("--force", action="store_true", help="Re-analyze leagues whose inputs did not change.")
+    analyze.add_argument(
+        "--profile",
+        metavar="TRACE_JSON",
+        help="Run the leagues in this process, print the time spent per stage and save a Chrome trace.",
+    )
+    analyze.add_argument("--profile-memory", action="store_true", help="Also record the peak memory of every stage.")
+
+    render = commands.add_parser(
+        "render",
+        help="Renders the position and Spearman / tau figures of every season of a data folder, headless.",
+    )
+    render.add_argument("data_folder", help="A league folder with rank_tables/, or a folder of league folders.")
+    render.add_argument("--output", default="figures", help="Where the figures are written. Default is figures/.")
+    render.add_argument("--leagues", nargs="*", help="Only render these leagues.")
+    render.add_argument("--workers", type=int, default=os.cpu_count(), help="Seasons rendered in parallel.")
+    render.add_argument("--format", default="png", help="The image format, such as png, svg or pdf. Default is png.")
+    render.add_argument("--dpi", type=int, default=100, help="The resolution of raster formats. Default is 100.")
+
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    if args.command == "render":
+        return run_render(args)
+
+    return run_analyze(args)
+
+
+def run_analyze(args: argparse.Namespace) -> int:
+    """
+    Analyzes every league whose inputs changed, in parallel.
+
+    Parameters:
+        args (argparse.Namespace): The parsed `analyze` arguments.
+
+    Returns:
+        int: The exit status, 1 if any league failed.
+    """
+    leagues: Dict[str, str] = find_leagues(args.data_folder)
+    if args.leagues:
+        leagues = {league: folder for league, folder in leagues.items() if league in args.leagues}
+
+    if not leagues:
+        print(f"No rank_tables/ folder found in {args.data_folder}", file=sys.stderr)
+        return 1
+
+    tasks: List[Tuple] = []
+    for league, folder in sorted(leagues.items()):
+        output_folder: str = os.path.join(args.output, league)
+        fingerprint: str = input_fingerprint(folder, {"transition_rounds": args.transition_rounds})
+
+        if not args.force and stored_fingerprint(output_folder) == fingerprint:
+            print(f"{league}: unchanged, skipped")
+            continue
+
+        tasks.append((league, folder, output_folder, tuple(args.transition_rounds), fingerprint))
+
+    if args.profile:
+        from src import instrumentation
+
+        instrumentation.enable(track_memory=args.profile_memory)
+
+    status: int = 0
+    if len(tasks) > 1 and args.workers > 1 and not args.profile:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(tasks))) as executor:
+            results = list(executor.map(_analyze_task, tasks))
+    else:
+        results = [_analyze_task(task) for task in tasks]
+
+    for league, elapsed, error in results:
+        if error is None:
+            print(f"{league}: done in {elapsed:.2f}s")
+        else:
+            print(f"{league}: failed, {error}", file=sys.stderr)
+            status = 1
+
+    if args.profile:
+        instrumentation.disable()
+        print(instrumentation.format_summary())
+        instrumentation.export_chrome_trace(args.profile)
+
+    return status
+
+
+def run_render(args: argparse.Namespace) -> int:
+    """
+    Renders the figures of every season of every league, in parallel.
+
+    Parameters:
+        args (argparse.Namespace): The parsed `render` arguments.
+
+    Returns:
+        int: The exit status, 1 if any season failed.
+    """
+    leagues: Dict[str, str] = find_leagues(args.data_folder)
+    if args.leagues:
+        leagues = {league: folder for league, folder in leagues.items() if league in args.leagues}
+
+    if not leagues:
+        print(f"No rank_tables/ folder found in {args.data_folder}", file=sys.stderr)
+        return 1
+
+    from src.visualization.batch import render_leagues
+
+    start: float = time.perf_counter()
+    results = render_leagues(leagues, args.output, args.workers, args.format, args.dpi)
+
+    failed: int = 0
+    for league, season, _, error in results:
+        if error is not None:
+            print(f"{league} {season}: failed, {error}", file=sys.stderr)
+            failed += 1
+
+    print(f"{len(results) - failed} of {len(results)} seasons rendered to {args.output} in {time.perf_counter() - start:.2f}s")
+
+    return 1 if failed else 0
+
+
+def find_leagues(data_folder: str) -> Dict[str, str]:
+    """
+    Finds the league folders of a data folder.
+
+    Parameters:
+        data_folder (str): A league folder with `rank_tables/`, or a folder of league folders.
+
+    Returns:
+        dict: The folder of every league, keyed by league name.
+    """
+    if os.path.isdir(os.path.join(data_folder, "rank_tables")):
+        return {os.path.basename(os.path.normpath(data_folder)): data_folder}
+
+    return {
+        entry.name: entry.path
+        for entry in os.scandir(data_folder)
+        if entry.is_dir() and os.path.isdir(os.path.join(entry.path, "rank_tables"))
+    }
+
+
+def input_fingerprint(league_folder: str, parameters: Dict) -> str:
+    """
+    Hashes the rank tables of a league together with the analysis parameters.
+
+    Parameters:
+        league_folder (str): The league folder.
+        parameters (dict): The parameters that change the results.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    digest = hashlib.sha256(json.dumps(parameters, sort_keys=True).encode("utf-8"))
+
+    rank_tables_folder: str = os.path.join(league_folder, "rank_tables")
+    for name in sorted(os.listdir(rank_tables_folder)):
+        if name.endswith(".csv"):
+            digest.update(name.encode("utf-8"))
+            with open(os.path.join(rank_tables_folder, name), "rb") as rank_table_file:
+                digest.update(rank_table_file.read())
+
+    return digest.hexdigest()
+
+
+def stored_fingerprint(output_folder: str) -> str:
+    """
+    Reads the input fingerprint of the last successful analysis of a league.
+
+    Parameters:
+        output_folder (str): The output folder of the league.
+
+    Returns:
+        str: The fingerprint, or None if the league was never analyzed.
+    """
+    try:
+        with open(os.path.join(output_folder, SUMMARY_FILE), encoding="utf-8") as summary_file:
+            return json.load(summary_file).get("fingerprint")
+    except (OSError, ValueError):
+        return None
+
+
+def _analyze_task(task: Tuple) -> Tuple[str, float, str]:
+    """
+    Analyzes one league, importing the numerical stack only when there is work to do.
+
+    Parameters:
+        task (tuple): The league, its folder, the output folder, the transition rounds and the fingerprint.
+
+    Returns:
+        tuple: The league, the elapsed seconds and the error message, None on success.
+    """
+    league, folder, output_folder, transition_rounds, fingerprint = task
+    start: float = time.perf_counter()
+
+    try:
+        from src.calculations.pipeline import analyze_league
+
+        analyze_league(folder, output_folder, transition_rounds, fingerprint)
+    except Exception as error:
+        return league, time.perf_counter() - start, repr(error)
+
+    return league, time.perf_counter() - start, None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
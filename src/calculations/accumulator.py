@@ -0,0 +1,115 @@
+import numpy as np
+
+from statistics import NormalDist
+
+
+class CurveAccumulator:
+    """
+    A streaming accumulator for the per-round mean and variance of a family of curves.
+
+    Curves are merged batch by batch with the parallel form of Welford's algorithm, so memory
+    stays constant whatever the number of seasons.
+
+    Attributes:
+        count (int): The number of curves accumulated so far.
+        mean (np.ndarray): The running mean of every round.
+        m2 (np.ndarray): The running sum of squared deviations from the mean of every round.
+    """
+
+    def __init__(self, n_rounds: int):
+        """
+        Initializes an empty accumulator.
+
+        Parameters:
+            n_rounds (int): The number of points of every curve.
+        """
+        self.count: int = 0
+        self.mean: np.ndarray = np.zeros(n_rounds)
+        self.m2: np.ndarray = np.zeros(n_rounds)
+
+    def update(self, curves) -> "CurveAccumulator":
+        """
+        Adds a batch of curves to the accumulator.
+
+        Parameters:
+            curves (array-like): Curves with shape (batch, n_rounds), or a single curve.
+
+        Returns:
+            CurveAccumulator: The accumulator itself, to allow chaining.
+        """
+        curves = np.atleast_2d(np.asarray(curves, dtype=np.float64))
+        if curves.shape[0] == 0:
+            return self
+
+        batch_mean: np.ndarray = curves.mean(axis=0)
+        batch_m2: np.ndarray = np.sum((curves - batch_mean) ** 2, axis=0)
+
+        self.__merge(curves.shape[0], batch_mean, batch_m2)
+
+        return self
+
+    def merge(self, other: "CurveAccumulator") -> "CurveAccumulator":
+        """
+        Merges the statistics of another accumulator into this one.
+
+        Parameters:
+            other (CurveAccumulator): An accumulator over curves with the same number of rounds.
+
+        Returns:
+            CurveAccumulator: The accumulator itself, to allow chaining.
+        """
+        if other.count:
+            self.__merge(other.count, other.mean, other.m2)
+
+        return self
+
+    def variance(self) -> np.ndarray:
+        """
+        Computes the per-round sample variance of the accumulated curves.
+
+        Returns:
+            np.ndarray: The unbiased variance of every round, NaN with fewer than two curves.
+        """
+        if self.count < 2:
+            return np.full_like(self.mean, np.nan)
+
+        return self.m2 / (self.count - 1)
+
+    def std_error(self) -> np.ndarray:
+        """
+        Computes the per-round standard error of the mean.
+
+        Returns:
+            np.ndarray: The standard error of every round, NaN with fewer than two curves.
+        """
+        return np.sqrt(self.variance() / max(self.count, 1))
+
+    def confidence_width(self, confidence: float = 0.95) -> np.ndarray:
+        """
+        Computes the per-round width of the normal confidence interval for the mean.
+
+        Parameters:
+            confidence (float, optional): The confidence level of the interval. Default is 0.95.
+
+        Returns:
+            np.ndarray: The full width of the interval for every round.
+        """
+        z: float = NormalDist().inv_cdf((1 + confidence) / 2)
+
+        return 2 * z * self.std_error()
+
+    def __merge(self, count: int, mean: np.ndarray, m2: np.ndarray):
+        """
+        Combines the running statistics with those of another group of curves.
+
+        Parameters:
+            count (int): The number of curves of the other group.
+            mean (np.ndarray): The per-round mean of the other group.
+            m2 (np.ndarray): The per-round sum of squared deviations of the other group.
+        """
+        total: int = self.count + count
+        delta: np.ndarray = mean - self.mean
+
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta**2 * (self.count * count / total)
+        self.count = total
@@ -0,0 +1,79 @@
+import numpy as np
+
+from typing import List, Tuple
+
+from src.calculations.power_law import fit_power_laws
+
+
+def bootstrap_curve_bands(
+    spearman_curves: np.ndarray,
+    tau_curves: np.ndarray,
+    n_replicates: int = 10_000,
+    confidence: float = 0.95,
+    init_round: int = 1,
+    chunk_size: int = 1024,
+    random_seed: int = 42,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes bootstrap percentile bands for the mean Spearman and tau curves and for the power
+    law fitted to the mean tau curve.
+
+    Every replicate resamples the seasons with replacement. A chunk of replicates is drawn as an
+    integer index matrix, turned into per-season counts and averaged with one matrix product, so
+    there is no Python loop per replicate and memory only grows with `chunk_size`.
+
+    Parameters:
+        spearman_curves (array-like): Spearman correlations with shape (seasons, rounds).
+        tau_curves (array-like): Normalized Kendall-tau distances with shape (seasons, rounds).
+        n_replicates (int, optional): The number of bootstrap replicates. Default is 10,000.
+        confidence (float, optional): The coverage of the percentile bands. Default is 0.95.
+        init_round (int, optional): The round of the first point of every curve. Default is 1.
+        chunk_size (int, optional): The number of replicates drawn at once. Default is 1024.
+        random_seed (int, optional): The seed for the resampling. Results are deterministic for a
+            given seed and chunk size. Default is 42.
+
+    Returns:
+        spearman_band (np.ndarray): Lower and upper bounds of the mean Spearman curve, shape (2, rounds).
+        tau_band (np.ndarray): Lower and upper bounds of the mean tau curve, shape (2, rounds).
+        power_band (np.ndarray): Lower and upper bounds of the power-law exponent, shape (2,).
+        multiplier_band (np.ndarray): Lower and upper bounds of the power-law multiplier, shape (2,).
+    """
+    spearman_curves = np.asarray(spearman_curves, dtype=np.float64)
+    tau_curves = np.asarray(tau_curves, dtype=np.float64)
+    if spearman_curves.shape != tau_curves.shape:
+        raise ValueError("Spearman and tau curves must have the same shape")
+
+    n_seasons, n_rounds = tau_curves.shape
+    curves: np.ndarray = np.concatenate([spearman_curves, tau_curves], axis=1)
+
+    rng: np.random.Generator = np.random.default_rng(random_seed)
+    spearman_means: List[np.ndarray] = []
+    tau_means: List[np.ndarray] = []
+    powers: List[np.ndarray] = []
+    multipliers: List[np.ndarray] = []
+
+    for start in range(0, n_replicates, chunk_size):
+        n_chunk: int = min(chunk_size, n_replicates - start)
+
+        indexes: np.ndarray = rng.integers(0, n_seasons, size=(n_chunk, n_seasons))
+        offsets: np.ndarray = np.arange(n_chunk)[:, None] * n_seasons
+        counts: np.ndarray = np.bincount(
+            (indexes + offsets).ravel(), minlength=n_chunk * n_seasons
+        ).reshape(n_chunk, n_seasons)
+
+        means: np.ndarray = counts @ curves / n_seasons
+        spearman_means.append(means[:, :n_rounds])
+        tau_means.append(means[:, n_rounds:])
+
+        power, multiplier, _, _ = fit_power_laws(tau_means[-1], init_round=init_round, refine=True)
+        powers.append(power)
+        multipliers.append(multiplier)
+
+    percentiles: List[float] = [50 * (1 - confidence), 50 * (1 + confidence)]
+
+    return (
+        np.nanpercentile(np.concatenate(spearman_means), percentiles, axis=0),
+        np.nanpercentile(np.concatenate(tau_means), percentiles, axis=0),
+        np.nanpercentile(np.concatenate(powers), percentiles),
+        np.nanpercentile(np.concatenate(multipliers), percentiles),
+    )
@@ -0,0 +1,212 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+
+import numpy as np
+
+from typing import Dict, Iterable, List
+
+# Legal-form and filler words that Transfermarkt adds or drops between pages and seasons
+IGNORED_NAME_TOKENS: frozenset = frozenset(
+    {"fc", "afc", "cf", "sc", "ec", "se", "cr", "ac", "fbpa", "club", "clube", "de", "da", "do", "futebol", "football"}
+)
+
+# Transfermarkt naming variants of the same club, keyed by the name the registry keeps
+TRANSFERMARKT_ALIASES: Dict[str, List[str]] = {
+    "Manchester United": ["Man Utd", "Man United"],
+    "Manchester City": ["Man City"],
+    "Tottenham Hotspur": ["Tottenham", "Spurs"],
+    "Wolverhampton Wanderers": ["Wolves", "Wolverhampton"],
+    "Newcastle United": ["Newcastle"],
+    "West Ham United": ["West Ham"],
+    "Brighton & Hove Albion": ["Brighton"],
+    "Nottingham Forest": ["Nottm Forest", "Nott'm Forest"],
+    "Sheffield United": ["Sheff Utd", "Sheffield Utd"],
+    "Sheffield Wednesday": ["Sheff Wed"],
+    "Leicester City": ["Leicester"],
+    "Leeds United": ["Leeds"],
+    "Queens Park Rangers": ["QPR"],
+    "West Bromwich Albion": ["West Brom"],
+    "Atlético Mineiro": ["Atlético-MG", "Atletico-MG", "Clube Atlético Mineiro"],
+    "Athletico Paranaense": ["Athletico-PR", "Atlético-PR", "Atletico-PR", "Atlético Paranaense"],
+    "Atlético Goianiense": ["Atlético-GO", "Atletico-GO"],
+    "Vasco da Gama": ["Vasco", "CR Vasco da Gama"],
+    "América Mineiro": ["América-MG", "America-MG"],
+    "Botafogo": ["Botafogo FR", "Botafogo-RJ"],
+    "Red Bull Bragantino": ["RB Bragantino", "Bragantino"],
+    "Corinthians": ["SC Corinthians", "Corinthians Paulista"],
+}
+
+
+def normalize_club_name(name: str) -> str:
+    """
+    Reduces a club name to the key used to match its variants.
+
+    Accents, case, punctuation and legal-form words ("FC", "EC", "Clube", ...) are dropped, so
+    "São Paulo FC", "Sao Paulo" and "são-paulo" share one key.
+
+    Parameters:
+        name (str): The club name.
+
+    Returns:
+        str: The normalized key.
+    """
+    ascii_name: str = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+    tokens: List[str] = re.sub(r"[^a-z0-9&]+", " ", ascii_name.casefold()).split()
+
+    kept: List[str] = [token for token in tokens if token not in IGNORED_NAME_TOKENS]
+
+    return " ".join(kept or tokens)
+
+
+class ClubRegistry:
+    """
+    A persistent map from club names to stable integer IDs, shared across seasons and leagues.
+
+    Names are matched through `normalize_club_name` and a table of aliases, so the naming variants
+    of a club resolve to the same ID. IDs are never reused or renumbered, so arrays coded with
+    them stay valid as the registry grows.
+
+    Attributes:
+        path (str): The JSON file of the registry, or None for an in-memory registry.
+        names (list): The name of every club ID.
+    """
+
+    def __init__(self, path: str = None, aliases: Dict[str, List[str]] = None):
+        """
+        Opens a registry, loading it from `path` if the file exists.
+
+        Parameters:
+            path (str, optional): The JSON file of the registry. Default is None.
+            aliases (dict, optional): Name variants keyed by the club name. If None,
+                `TRANSFERMARKT_ALIASES`. Their IDs are only assigned when a club is first seen.
+        """
+        self.path: str = path
+        self.names: List[str] = []
+        self.__keys: Dict[str, int] = {}
+        self.__aliases: Dict[str, str] = {}
+        self.__canonical_names: Dict[str, str] = {}
+        self.__lock = threading.Lock()
+
+        for name, variants in (TRANSFERMARKT_ALIASES if aliases is None else aliases).items():
+            self.__canonical_names[normalize_club_name(name)] = name
+            for variant in variants:
+                self.__aliases[normalize_club_name(variant)] = normalize_club_name(name)
+
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as registry_file:
+                saved: Dict = json.load(registry_file)
+
+            self.names = saved["names"]
+            self.__keys = {key: int(club_id) for key, club_id in saved["keys"].items()}
+            self.__aliases.update(saved.get("aliases", {}))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add_alias(self, alias: str, name: str):
+        """
+        Declares that `alias` is another name of the club `name`.
+
+        If only the alias was seen so far, the club keeps the ID of the alias.
+
+        Parameters:
+            alias (str): The naming variant.
+            name (str): A name the registry already resolves, or the name the club will get.
+
+        Raises:
+            ValueError: If `alias` and `name` already have different IDs. IDs are never merged,
+                since arrays already coded with the orphaned ID would silently change meaning.
+        """
+        alias_key: str = normalize_club_name(alias)
+
+        with self.__lock:
+            key: str = self.__resolve(normalize_club_name(name))
+            alias_id = self.__keys.get(self.__resolve(alias_key))
+            club_id = self.__keys.get(key)
+
+            if alias_id is not None and club_id is not None and alias_id != club_id:
+                raise ValueError(
+                    f"{alias} ({alias_id}) and {name} ({club_id}) are already different clubs of the registry"
+                )
+
+            if alias_key != key:
+                self.__aliases[alias_key] = key
+            if club_id is None and alias_id is not None:
+                self.__keys[key] = alias_id
+
+    def get_id(self, name: str, create: bool = True) -> int:
+        """
+        Returns the ID of a club, registering it if it is new.
+
+        New clubs are named after their entry of the alias table if they have one, otherwise as
+        first seen.
+
+        Parameters:
+            name (str): The club name, in any of its variants.
+            create (bool, optional): Whether unknown clubs get a new ID. Default is True.
+
+        Returns:
+            int: The club ID, or -1 for an unknown club when `create` is False.
+        """
+        key: str = self.__resolve(normalize_club_name(name))
+
+        with self.__lock:
+            club_id = self.__keys.get(key)
+            if club_id is None:
+                if not create:
+                    return -1
+
+                club_id = self.__keys[key] = len(self.names)
+                self.names.append(self.__canonical_names.get(key, str(name)))
+
+        return club_id
+
+    def ids(self, names: Iterable[str], create: bool = True) -> np.ndarray:
+        """
+        Returns the IDs of many clubs, in order.
+
+        Parameters:
+            names (iterable): The club names.
+            create (bool, optional): Whether unknown clubs get a new ID. Default is True.
+
+        Returns:
+            np.ndarray: The int32 IDs, -1 for unknown clubs when `create` is False.
+        """
+        return np.array([self.get_id(name, create) for name in names], dtype=np.int32)
+
+    def save(self, path: str = None):
+        """
+        Saves the registry as JSON through a temporary file, so readers never see a partial file.
+
+        Parameters:
+            path (str, optional): The JSON file. If None, `self.path`.
+        """
+        path = path or self.path
+        folder: str = os.path.dirname(path) or "."
+        os.makedirs(folder, exist_ok=True)
+
+        with self.__lock:
+            content: str = json.dumps(
+                {"names": self.names, "keys": self.__keys, "aliases": self.__aliases},
+                ensure_ascii=False,
+                indent=1,
+            )
+
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def __resolve(self, key: str) -> str:
+        """
+        Follows the aliases of a normalized name to the key of its club.
+        """
+        return self.__aliases.get(key, key)
@@ -1,11 +1,16 @@
-from scipy.stats import spearmanr, kendalltau
+import numpy as np
+
 from typing import List, Tuple, Union
 
+from src.calculations.null_distribution import P_VALUE_TABLES
+from src.instrumentation import instrument
+
 
 def spearman_corr(
     partial_standings: List[int],
     final_standings: List[int],
     alternative: str = "two-sided",
+    p_value: Union[str, None] = "asymptotic",
 ) -> Tuple[float, float]:
     """
     Computes the Spearman correlation between two rankings and the associated p-value.
@@ -17,10 +22,17 @@ def spearman_corr(
             - 'two-sided' (default): Two-tailed test.
             - 'less': Tests if the correlation is less than zero.
             - 'greater': Tests if the correlation is greater than zero.
+        p_value (str or None, optional): How the p-value is computed:
+            - 'asymptotic' (default): scipy's t approximation.
+            - 'exact': the exact permutation distribution of `P_VALUE_TABLES`, for untied
+              rankings of at most `MAX_EXACT_SPEARMAN_N` clubs.
+            - 'permutation': the same distribution estimated from random permutations, for
+              untied rankings of any size.
+            - None: no p-value; the correlation is computed with NumPy only, which is much faster.
 
     Returns:
         corr (float): Spearman correlation coefficient, between -1 and 1.
-        p_value (float): p-value of the hypothesis test.
+        p_value (float): p-value of the hypothesis test, None when `p_value` is None.
     """
 
     if len(partial_standings) != len(final_standings):
@@ -28,6 +40,22 @@ def spearman_corr(
             "Partial standings and final standings must have the same length"
         )
 
+    if p_value is None:
+        ranks: np.ndarray = np.stack([partial_standings, final_standings], axis=-1).astype(np.float64)
+        return float(_spearman_against_final(ranks[None])[0, 0]), None
+
+    if p_value in ("exact", "permutation"):
+        partial_ranks, final_ranks = _untied_ranks(partial_standings), _untied_ranks(final_standings)
+        n: int = len(partial_ranks)
+        square_sum: int = int(np.sum((partial_ranks - final_ranks) ** 2))
+        corr: float = 1 - 6 * square_sum / (n * (n**2 - 1))
+
+        if p_value == "exact":
+            return corr, P_VALUE_TABLES.spearman_p_value(square_sum, n, alternative)
+        return corr, P_VALUE_TABLES.spearman_permutation_p_value(square_sum, n, alternative)
+
+    from scipy.stats import spearmanr
+
     corr, p_value = spearmanr(
         partial_standings, final_standings, alternative=alternative
     )
@@ -35,7 +63,11 @@ def spearman_corr(
 
 
 def normalized_tau_distance(
-    partial_standings: List[int], final_standings, complete_return: bool = False
+    partial_standings: List[int],
+    final_standings,
+    complete_return: bool = False,
+    exact: bool = False,
+    p_value: bool = True,
 ) -> Union[float, Tuple[float, float, float]]:
     """
     Computes the normalized Kendall-tau distance between two rankings.
@@ -45,13 +77,19 @@ def normalized_tau_distance(
         final_standings (list or array-like): List of final rankings.
         complete_return (bool, optional): If True, also returns the raw Kendall-tau distance
             and the Kendall-tau correlation. Default is False.
+        exact (bool, optional): If True, counts the discordant pairs with `kendall_pair_counts`
+            instead of going through scipy, so the raw distance is the integer number of
+            discordant pairs even when there are ties. Default is False.
+        p_value (bool, optional): If False, tau is computed with NumPy from the pairwise signs
+            instead of `scipy.stats.kendalltau`, skipping the p-value scipy computes alongside
+            it. The results are the same. Default is True.
 
     Returns:
         If complete_return is False:
             normalized_tau_distance (float): Normalized Kendall-tau distance.
         If complete_return is True:
             normalized_tau_distance (float): Normalized Kendall-tau distance, between 0 and 1.
-            tau_distance (float): Raw Kendall-tau distance.
+            tau_distance (float): Raw Kendall-tau distance (an int when `exact` is True).
             tau_corr (float): Kendall-tau correlation coefficient, between -1 and 1.
     """
 
@@ -60,7 +98,16 @@ def normalized_tau_distance(
             "Partial standings and final standings must have the same length"
         )
 
-    tau_corr, _ = kendalltau(partial_standings, final_standings)
+    if exact:
+        return _exact_tau_distance(partial_standings, final_standings, complete_return)
+
+    if p_value:
+        from scipy.stats import kendalltau
+
+        tau_corr, _ = kendalltau(partial_standings, final_standings)
+    else:
+        tau_corr = _tau_b(np.asarray(partial_standings), np.asarray(final_standings))
+
     tau_distance: float = (
         (1 - tau_corr) * (len(partial_standings) * (len(partial_standings) - 1))
     ) / 4
@@ -72,3 +119,410 @@ def normalized_tau_distance(
         return normalized_tau_distance, tau_distance, tau_corr
 
     return normalized_tau_distance
+
+
+
+def kendall_p_value(
+    partial_standings: List[int],
+    final_standings: List[int],
+    alternative: str = "two-sided",
+) -> float:
+    """
+    Computes the exact p-value of the Kendall-tau association between two untied rankings.
+
+    Parameters:
+        partial_standings (list or array-like): List of partial rankings.
+        final_standings (list or array-like): List of final rankings.
+        alternative (str, optional): "two-sided" (default), "greater" for a positive association
+            or "less" for a negative one.
+
+    Returns:
+        float: The p-value, from the permutation distribution of `P_VALUE_TABLES`.
+    """
+    partial_ranks, final_ranks = _untied_ranks(partial_standings), _untied_ranks(final_standings)
+    discordant, _, _, _ = kendall_pair_counts(partial_ranks, final_ranks)
+
+    return P_VALUE_TABLES.kendall_p_value(discordant, len(partial_ranks), alternative)
+
+
+def _tau_b(partial_standings: np.ndarray, final_standings: np.ndarray) -> float:
+    """
+    Computes the Kendall tau-b correlation of two rankings from the signs of every pair.
+
+    Parameters:
+        partial_standings (np.ndarray): List of partial rankings.
+        final_standings (np.ndarray): List of final rankings.
+
+    Returns:
+        float: The tau-b correlation, NaN if a ranking is constant.
+    """
+    first, second = np.triu_indices(len(partial_standings), k=1)
+    partial_signs: np.ndarray = np.sign(partial_standings[first] - partial_standings[second])
+    final_signs: np.ndarray = np.sign(final_standings[first] - final_standings[second])
+
+    untied: float = float(np.sum(np.abs(partial_signs))) * float(np.sum(np.abs(final_signs)))
+    if untied == 0:
+        return np.nan
+
+    return float(np.sum(partial_signs * final_signs)) / np.sqrt(untied)
+
+
+def _untied_ranks(standings: List[int]) -> np.ndarray:
+    """
+    Converts a ranking without ties into ranks 0 to n - 1, as the exact p-values require.
+
+    Parameters:
+        standings (list or array-like): List of rankings.
+
+    Returns:
+        np.ndarray: The int64 ranks.
+    """
+    values: np.ndarray = np.asarray(standings)
+    if len(np.unique(values)) != len(values):
+        raise ValueError("Exact p-values are only available for rankings without ties")
+
+    return np.argsort(np.argsort(values, kind="stable"), kind="stable")
+
+
+def _exact_tau_distance(
+    partial_standings: List[int], final_standings: List[int], complete_return: bool
+) -> Union[float, Tuple[float, int, float]]:
+    """
+    Computes the normalized Kendall-tau distance from exact discordant and tied pair counts.
+
+    Parameters:
+        partial_standings (list or array-like): List of partial rankings.
+        final_standings (list or array-like): List of final rankings.
+        complete_return (bool): If True, also returns the discordant pair count and the
+            Kendall tau-b correlation.
+
+    Returns:
+        float or tuple: The same values as `normalized_tau_distance`.
+    """
+    discordant, tied_partial, tied_final, tied_both = kendall_pair_counts(
+        partial_standings, final_standings
+    )
+
+    n_pairs: int = len(partial_standings) * (len(partial_standings) - 1) // 2
+    normalized_tau_distance: float = discordant / n_pairs
+
+    if not complete_return:
+        return normalized_tau_distance
+
+    concordant: int = n_pairs - tied_partial - tied_final + tied_both - discordant
+    tau_corr: float = (concordant - discordant) / np.sqrt(
+        float(n_pairs - tied_partial) * float(n_pairs - tied_final)
+    )
+
+    return normalized_tau_distance, discordant, tau_corr
+
+@instrument()
+def spearman_tau_batch(
+    rank_tensor: np.ndarray, chunk_size: int = 1024
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the Spearman correlation and the normalized Kendall-tau distance between every
+    round and the final round of a stack of rank tables in a single vectorized pass.
+
+    When every round is a permutation of 1..n, rho comes from the squared rank differences;
+    otherwise ties are averaged and rho is the Pearson correlation of the ranks, as in scipy.
+    Tau is the tau-b correlation obtained from pairwise sign comparisons, so the results match
+    `spearman_corr` and `normalized_tau_distance` without computing any p-value.
+
+    Parameters:
+        rank_tensor (array-like): Positions with shape (seasons, teams, rounds).
+        chunk_size (int, optional): Number of seasons processed at once by the pairwise
+            comparison, which bounds memory use. Default is 1024.
+
+    Returns:
+        rho (np.ndarray): Spearman correlations with shape (seasons, rounds).
+        tau (np.ndarray): Normalized Kendall-tau distances with shape (seasons, rounds).
+    """
+    ranks: np.ndarray = np.asarray(rank_tensor)
+    if ranks.ndim != 3:
+        raise ValueError("Rank tensor must have shape (seasons, teams, rounds)")
+
+    n_seasons, n_teams, n_rounds = ranks.shape
+    rho: np.ndarray = np.empty((n_seasons, n_rounds))
+    tau: np.ndarray = np.empty((n_seasons, n_rounds))
+
+    first, second = np.triu_indices(n_teams, k=1)
+
+    for start in range(0, n_seasons, chunk_size):
+        chunk: np.ndarray = ranks[start : start + chunk_size].astype(np.float64)
+
+        rho[start : start + chunk_size] = _spearman_against_final(chunk)
+
+        signs: np.ndarray = np.sign(chunk[:, first, :] - chunk[:, second, :]).astype(np.int8)
+        final_signs: np.ndarray = signs[:, :, -1:]
+
+        concordance: np.ndarray = np.sum(signs * final_signs, axis=1, dtype=np.int64)
+        untied: np.ndarray = np.sum(np.abs(signs), axis=1, dtype=np.int64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tau_corr: np.ndarray = concordance / np.sqrt(untied * untied[:, -1:])
+
+        tau[start : start + chunk_size] = (1 - tau_corr) / 2
+
+    return rho, tau
+
+
+@instrument()
+def round_agreement_batch(
+    rank_tensor: np.ndarray, chunk_size: int = 256
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the Spearman correlation and the normalized Kendall-tau distance between every pair
+    of rounds of a stack of rank tables.
+
+    Every round is ranked once. Spearman's rho is the Pearson correlation of the centered ranks,
+    so all round pairs come from one Gram matrix product; tau-b comes from the product of the
+    pairwise sign matrices, whose diagonal holds the untied pairs of every round. Both matrices
+    are symmetric, with a unit (rho) or zero (tau) diagonal, and agree with `spearman_tau_batch`
+    on their last column.
+
+    Parameters:
+        rank_tensor (array-like): Positions with shape (seasons, teams, rounds).
+        chunk_size (int, optional): Number of seasons processed at once, which bounds memory use.
+            Default is 256.
+
+    Returns:
+        rho (np.ndarray): Spearman correlations with shape (seasons, rounds, rounds).
+        tau (np.ndarray): Normalized Kendall-tau distances with shape (seasons, rounds, rounds).
+    """
+    ranks: np.ndarray = np.asarray(rank_tensor)
+    if ranks.ndim != 3:
+        raise ValueError("Rank tensor must have shape (seasons, teams, rounds)")
+
+    n_seasons, n_teams, n_rounds = ranks.shape
+    rho: np.ndarray = np.empty((n_seasons, n_rounds, n_rounds))
+    tau: np.ndarray = np.empty((n_seasons, n_rounds, n_rounds))
+
+    first, second = np.triu_indices(n_teams, k=1)
+    permutation: np.ndarray = np.arange(1, n_teams + 1)
+
+    for start in range(0, n_seasons, chunk_size):
+        chunk: np.ndarray = ranks[start : start + chunk_size].astype(np.float64)
+
+        if not np.array_equal(np.sort(chunk, axis=1), np.broadcast_to(permutation[:, None], chunk.shape)):
+            from scipy.stats import rankdata
+
+            chunk = rankdata(chunk, axis=1)
+
+        centered: np.ndarray = chunk - chunk.mean(axis=1, keepdims=True)
+        rho[start : start + chunk_size] = _normalized_gram(centered)
+
+        # Sign products are small integers, exact in float32 up to 2^24 pairs
+        signs: np.ndarray = np.sign(chunk[:, first, :] - chunk[:, second, :]).astype(np.float32)
+        tau[start : start + chunk_size] = (1 - _normalized_gram(signs)) / 2
+
+    return rho, tau
+
+
+def _normalized_gram(columns: np.ndarray) -> np.ndarray:
+    """
+    Computes the cosine similarity between every pair of columns of a stack of matrices.
+
+    Parameters:
+        columns (np.ndarray): Values with shape (seasons, rows, rounds).
+
+    Returns:
+        np.ndarray: Similarities with shape (seasons, rounds, rounds), NaN for all-zero columns.
+    """
+    gram: np.ndarray = np.matmul(columns.transpose(0, 2, 1), columns).astype(np.float64)
+    norms: np.ndarray = np.sqrt(np.diagonal(gram, axis1=1, axis2=2))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return gram / (norms[:, :, None] * norms[:, None, :])
+
+
+def _spearman_against_final(ranks: np.ndarray) -> np.ndarray:
+    """
+    Computes the Spearman correlation between every round and the last one for a chunk of seasons.
+
+    Parameters:
+        ranks (np.ndarray): Float positions with shape (seasons, teams, rounds).
+
+    Returns:
+        np.ndarray: Spearman correlations with shape (seasons, rounds).
+    """
+    n_teams: int = ranks.shape[1]
+    permutation: np.ndarray = np.arange(1, n_teams + 1)
+
+    if np.array_equal(np.sort(ranks, axis=1), np.broadcast_to(permutation[:, None], ranks.shape)):
+        squared_differences: np.ndarray = np.sum((ranks - ranks[:, :, -1:]) ** 2, axis=1)
+        return 1 - 6 * squared_differences / (n_teams * (n_teams**2 - 1))
+
+    from scipy.stats import rankdata
+
+    ranks = rankdata(ranks, axis=1)
+    centered: np.ndarray = ranks - ranks.mean(axis=1, keepdims=True)
+    covariance: np.ndarray = np.sum(centered * centered[:, :, -1:], axis=1)
+    variance: np.ndarray = np.sum(centered**2, axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return covariance / np.sqrt(variance * variance[:, -1:])
+
+
+def kendall_pair_counts(
+    partial_standings: List[int], final_standings: List[int]
+) -> Tuple[int, int, int, int]:
+    """
+    Counts discordant and tied pairs between two rankings exactly, in O(n log n).
+
+    Parameters:
+        partial_standings (list or array-like): List of partial rankings.
+        final_standings (list or array-like): List of final rankings.
+
+    Returns:
+        discordant (int): Number of pairs ordered differently by the two rankings.
+        tied_partial (int): Number of pairs tied in the partial rankings.
+        tied_final (int): Number of pairs tied in the final rankings.
+        tied_both (int): Number of pairs tied in both rankings.
+    """
+
+    if len(partial_standings) != len(final_standings):
+        raise ValueError(
+            "Partial standings and final standings must have the same length"
+        )
+
+    counts: Tuple[np.ndarray, ...] = kendall_pair_counts_batch(
+        np.asarray(partial_standings)[None], np.asarray(final_standings)[None]
+    )
+
+    return tuple(int(count[0]) for count in counts)
+
+
+def kendall_pair_counts_batch(
+    partial_standings: np.ndarray, final_standings: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Counts discordant and tied pairs for many pairs of rankings at once.
+
+    Pairs are sorted by (partial, final) and the discordant pairs are the inversions left in the
+    final rankings, counted with a bottom-up merge sort that processes every block of every
+    ranking in the same NumPy operations (Knight's algorithm).
+
+    Parameters:
+        partial_standings (array-like): Partial rankings with shape (pairs, n).
+        final_standings (array-like): Final rankings with the same shape.
+
+    Returns:
+        discordant (np.ndarray): Number of discordant pairs for each ranking pair.
+        tied_partial (np.ndarray): Number of pairs tied in the partial rankings.
+        tied_final (np.ndarray): Number of pairs tied in the final rankings.
+        tied_both (np.ndarray): Number of pairs tied in both rankings.
+    """
+    partial: np.ndarray = _dense_ranks(np.asarray(partial_standings))
+    final: np.ndarray = _dense_ranks(np.asarray(final_standings))
+
+    if partial.shape != final.shape:
+        raise ValueError(
+            "Partial standings and final standings must have the same length"
+        )
+
+    order: np.ndarray = np.lexsort((final, partial), axis=-1)
+    partial = np.take_along_axis(partial, order, axis=-1)
+    final = np.take_along_axis(final, order, axis=-1)
+
+    tied_partial: np.ndarray = _tied_pairs(partial == np.roll(partial, 1, axis=-1))
+    tied_both: np.ndarray = _tied_pairs(
+        (partial == np.roll(partial, 1, axis=-1)) & (final == np.roll(final, 1, axis=-1))
+    )
+
+    discordant: np.ndarray = _count_inversions(final)
+
+    tied_final: np.ndarray = _tied_pairs(
+        np.sort(final, axis=-1) == np.roll(np.sort(final, axis=-1), 1, axis=-1)
+    )
+
+    return discordant, tied_partial, tied_final, tied_both
+
+
+def _dense_ranks(values: np.ndarray) -> np.ndarray:
+    """
+    Replaces every row of values by dense integer ranks starting at 0.
+
+    Parameters:
+        values (np.ndarray): Values with shape (pairs, n).
+
+    Returns:
+        np.ndarray: int64 dense ranks with the same shape.
+    """
+    order: np.ndarray = np.argsort(values, axis=-1, kind="stable")
+    sorted_values: np.ndarray = np.take_along_axis(values, order, axis=-1)
+
+    sorted_ranks: np.ndarray = np.zeros(values.shape, dtype=np.int64)
+    sorted_ranks[:, 1:] = np.cumsum(sorted_values[:, 1:] != sorted_values[:, :-1], axis=-1)
+
+    ranks: np.ndarray = np.empty_like(sorted_ranks)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=-1)
+
+    return ranks
+
+
+def _tied_pairs(equal_to_previous: np.ndarray) -> np.ndarray:
+    """
+    Counts tied pairs in sorted rows from a mask marking elements equal to their predecessor.
+
+    Parameters:
+        equal_to_previous (np.ndarray): Boolean mask with shape (pairs, n). The first column is ignored.
+
+    Returns:
+        np.ndarray: Number of tied pairs in each row.
+    """
+    n: int = equal_to_previous.shape[-1]
+    positions: np.ndarray = np.arange(n)
+
+    starts_group: np.ndarray = ~equal_to_previous
+    starts_group[:, 0] = True
+    group_start: np.ndarray = np.maximum.accumulate(np.where(starts_group, positions, 0), axis=-1)
+
+    # Each element is tied with every element of its group that comes before it
+    return np.sum(positions - group_start, axis=-1, dtype=np.int64)
+
+
+def _count_inversions(values: np.ndarray) -> np.ndarray:
+    """
+    Counts the strict inversions of every row with a vectorized bottom-up merge sort.
+
+    Parameters:
+        values (np.ndarray): Non-negative integers with shape (pairs, n).
+
+    Returns:
+        np.ndarray: Number of pairs i < j with values[i] > values[j], for each row.
+    """
+    n_pairs, n = values.shape
+    width: int = 1
+    padded_length: int = 1
+    while padded_length < n:
+        padded_length *= 2
+
+    # Padding with the largest value at the end never creates an inversion
+    key_base: int = int(values.max(initial=0)) + 2
+    blocks: np.ndarray = np.full((n_pairs, padded_length), key_base - 1, dtype=np.int64)
+    blocks[:, :n] = values
+
+    inversions: np.ndarray = np.zeros(n_pairs, dtype=np.int64)
+
+    while width < padded_length:
+        n_blocks: int = n_pairs * padded_length // (2 * width)
+        halves: np.ndarray = blocks.reshape(n_blocks, 2, width)
+
+        # Offsetting every block by its index keeps all the sorted left halves in one sorted array
+        offsets: np.ndarray = (np.arange(n_blocks, dtype=np.int64) * key_base)[:, None]
+        left: np.ndarray = (halves[:, 0, :] + offsets).ravel()
+        right: np.ndarray = halves[:, 1, :] + offsets
+
+        left_end: np.ndarray = (np.arange(1, n_blocks + 1, dtype=np.int64) * width)[:, None]
+        greater_in_left: np.ndarray = left_end - np.searchsorted(left, right, side="right")
+
+        inversions += greater_in_left.reshape(n_pairs, -1).sum(axis=-1)
+
+        # A stable sort of two sorted runs is a linear merge
+        blocks = np.sort(halves.reshape(n_blocks, 2 * width), axis=-1, kind="stable").reshape(
+            n_pairs, padded_length
+        )
+        width *= 2
+
+    return inversions
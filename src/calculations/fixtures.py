@@ -0,0 +1,50 @@
+import numpy as np
+
+from functools import lru_cache
+from typing import Tuple
+
+
+@lru_cache(maxsize=None)
+def fixture_arrays(n_teams: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the double round-robin schedule of a league as home and away index arrays.
+
+    The schedule is the circle method used by `generate_matchweeks`: team 0 stays fixed while
+    the other teams rotate one position per round, and the second half of the season repeats
+    the first one with home and away swapped. It is computed with array arithmetic and cached
+    per league size, so the arrays are shared and read-only.
+
+    Parameters:
+        n_teams (int, optional): The number of teams in the league. Must be even. Default is 20.
+
+    Returns:
+        tuple: Two contiguous integer arrays with shape (2 * (n_teams - 1), n_teams // 2),
+            holding the home and the away team of every match.
+
+    Raises:
+        Exception: If the number of teams is odd, an exception will be raised.
+    """
+
+    if n_teams % 2 == 1:
+        raise Exception("Number of teams must be even")
+
+    n_rotating: int = n_teams - 1
+    rounds: np.ndarray = np.arange(n_rotating)[:, None]
+    slots: np.ndarray = np.arange(n_teams // 2 - 1)[None, :]
+
+    # After r rotations, slot k of the rotating teams holds team 1 + (k - r) mod (n_teams - 1)
+    first_home: np.ndarray = np.empty((n_rotating, n_teams // 2), dtype=np.intp)
+    first_away: np.ndarray = np.empty((n_rotating, n_teams // 2), dtype=np.intp)
+
+    first_home[:, :-1] = 1 + (slots - rounds) % n_rotating
+    first_away[:, :-1] = 1 + (n_rotating - 1 - slots - rounds) % n_rotating
+    first_home[:, -1] = 0
+    first_away[:, -1] = 1 + (n_rotating // 2 - rounds[:, 0]) % n_rotating
+
+    home: np.ndarray = np.concatenate([first_home, first_away])
+    away: np.ndarray = np.concatenate([first_away, first_home])
+
+    home.flags.writeable = False
+    away.flags.writeable = False
+
+    return home, away
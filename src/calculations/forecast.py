@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple, Union
+
+from src.calculations.fixtures import fixture_arrays
+from src.calculations.league_table import LeagueTable
+from src.calculations.team_strength import TeamStrengths
+from src.instrumentation import instrument
+
+# Scores are drawn by inverse CDF from 16-bit uniforms, with at most 16 goals per club so a joint
+# (home, away) score fits a uint8 category
+TABLE_BITS: int = 16
+MAX_GOALS: int = 16
+
+
+@lru_cache(maxsize=None)
+def remaining_fixtures(n_teams: int, played_rounds: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the fixtures of `generate_matchweeks` still to be played after a number of rounds.
+
+    Parameters:
+        n_teams (int): The number of teams in the league.
+        played_rounds (int): The number of rounds already played.
+
+    Returns:
+        tuple: Read-only home and away index arrays with shape (remaining rounds, n_teams // 2).
+    """
+    home, away = fixture_arrays(n_teams)
+
+    return home[played_rounds:], away[played_rounds:]
+
+
+def score_tables(home_rates: np.ndarray, away_rates: np.ndarray) -> np.ndarray:
+    """
+    Builds the inverse-CDF lookup tables of the joint Poisson score of every match.
+
+    Entry [match, u] is the score category home_goals * MAX_GOALS + away_goals drawn by the 16-bit
+    uniform u, so sampling a match is a single table lookup. Score probabilities are rounded to
+    multiples of 2^-16, far below the Monte Carlo error of any feasible number of simulations.
+
+    A rate of 0 is the degenerate distribution that always scores 0 goals.
+
+    Parameters:
+        home_rates (np.ndarray): The Poisson mean of the home club of every match, with shape (matches,).
+        away_rates (np.ndarray): The Poisson mean of the away club of every match, with the same shape.
+
+    Returns:
+        np.ndarray: A uint8 array with shape (matches, 2^16).
+    """
+    goals: np.ndarray = np.arange(MAX_GOALS)
+    log_factorial: np.ndarray = np.concatenate([[0.0], np.cumsum(np.log(goals[1:]))])
+
+    for rates in (home_rates, away_rates):
+        if not np.all(np.isfinite(rates) & (rates >= 0)):
+            raise ValueError("Poisson rates must be finite and non-negative")
+
+    def pmf(rates: np.ndarray) -> np.ndarray:
+        # 0 * log(0) is taken as 0, so a zero rate puts all the mass on 0 goals
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_powers: np.ndarray = np.where(goals == 0, 0.0, goals * np.log(rates[:, None]))
+        probabilities: np.ndarray = np.exp(log_powers - rates[:, None] - log_factorial)
+        # The tail beyond the last goal count is folded into it
+        probabilities[:, -1] += 1 - probabilities.sum(axis=1)
+        return probabilities
+
+    joint: np.ndarray = (pmf(home_rates)[:, :, None] * pmf(away_rates)[:, None, :]).reshape(-1, MAX_GOALS**2)
+
+    # Category c covers the uniforms from round(cdf[c - 1] * 2^16) up to round(cdf[c] * 2^16)
+    size: int = 2**TABLE_BITS
+    bounds: np.ndarray = np.rint(np.cumsum(joint, axis=1)[:, :-1] * size).astype(np.intp)
+    steps: np.ndarray = np.zeros((len(joint), size + 1), dtype=np.uint8)
+    np.add.at(steps, (np.arange(len(joint))[:, None], bounds), 1)
+
+    return np.cumsum(steps[:, :size], axis=1, dtype=np.uint8)
+
+
+@instrument()
+def forecast_final_positions(
+    standings: pd.DataFrame,
+    played_rounds: int = None,
+    n_simulations: int = 100_000,
+    poisson_mean: float = 1.325,
+    strengths: TeamStrengths = None,
+    fixtures: Tuple[np.ndarray, np.ndarray] = None,
+    tie_break: Union[str, Sequence[str]] = "premier_league",
+    relegation_places: int = 3,
+    random_seed: int = 42,
+    chunk_size: int = 10_000,
+) -> pd.DataFrame:
+    """
+    Forecasts the final standings of a season from its standings after some round.
+
+    The remaining rounds are completed `n_simulations` times with the match model of
+    `generate_table`. Every chunk of completions draws one 16-bit uniform per match, turns it
+    into a score through `score_tables`, adds the results of the ranking criteria to the current
+    statistics with one matrix product and ranks all completions at once.
+
+    Example:
+        standings = pd.read_csv("data/premier_league/matchweek_standings/2023/20.csv", index_col=0)
+        forecast = forecast_final_positions(standings, strengths=TeamStrengths.from_standings(standings))
+
+    Parameters:
+        standings (pd.DataFrame): The current standings, one row per club, in any format read by
+            `LeagueTable.from_standings`. The row order is the club index of the fixtures.
+        played_rounds (int, optional): The number of rounds already played. If None, the largest
+            number of matches played by a club.
+        n_simulations (int, optional): The number of completions of the season. Default is 100,000.
+        poisson_mean (float, optional): The mean of the Poisson distribution for simulating match goals.
+            Default is 1.325.
+        strengths (TeamStrengths, optional): Per-club attack, defence and home advantage, replacing
+            `poisson_mean`. Its clubs must be in the row order of `standings`. Default is None.
+        fixtures (tuple, optional): Home and away index arrays of the remaining matches, with any
+            shape. If None, `remaining_fixtures(n_teams, played_rounds)`.
+        tie_break (str or sequence of str, optional): The ranking criteria, a key of
+            `TIE_BREAK_RULES` or a sequence of columns. Default is "premier_league".
+        relegation_places (int, optional): The number of relegated clubs. Default is 3.
+        random_seed (int, optional): The seed for the random number generator. Default is 42.
+        chunk_size (int, optional): The number of completions simulated at once, which bounds the
+            memory used. Default is 10,000.
+
+    Returns:
+        pd.DataFrame: One row per club, in the order of `standings` and indexed by "Club" if there
+            is one, with the probability of every final position (columns 1 to n_teams), "Title",
+            "Relegation" and the "Expected" final position.
+    """
+    current: LeagueTable = LeagueTable.from_standings(standings, tie_break=tie_break)
+    n_teams: int = current.n_teams
+
+    if played_rounds is None:
+        played_rounds = int(current.stats["Matches"].max())
+    home, away = remaining_fixtures(n_teams, played_rounds) if fixtures is None else fixtures
+    home, away = np.ravel(home), np.ravel(away)
+
+    if strengths is None:
+        strengths = TeamStrengths.uniform(n_teams, poisson_mean)
+    elif strengths.n_teams != n_teams:
+        raise ValueError(f"strengths has {strengths.n_teams} clubs, expected {n_teams}")
+
+    rates: np.ndarray = strengths.match_rates(home, away)
+    tables: np.ndarray = score_tables(rates[:, 0], rates[:, 1]).ravel()
+    offsets: np.ndarray = (np.arange(len(home), dtype=np.intp) * 2**TABLE_BITS)[:, None]
+
+    # Only the ranking criteria are simulated. Each gets enough bits for its total over the
+    # remaining matches of a club and all are packed into one float64 per side, exact up to 53
+    # bits, so a chunk needs a single lookup and a single product with the [home | away] incidence
+    columns: List[str] = list(dict.fromkeys(
+        part for column in current.tie_break for part in (("+", "-") if column == "SG" else (column,))
+    ))
+    category_results: Dict[str, Tuple[np.ndarray, np.ndarray]] = _category_results()
+    matches_per_club: int = int(np.bincount(np.concatenate([home, away]), minlength=n_teams).max())
+    bits: List[int] = [int(category_results[column][0].max() * matches_per_club).bit_length() for column in columns]
+    if sum(bits) > 53:
+        raise ValueError(f"The ranking criteria of {matches_per_club} remaining matches do not fit in 53 bits")
+
+    shifts: np.ndarray = np.concatenate([[0], np.cumsum(bits)[:-1]]).astype(np.int64)
+    packed_results: np.ndarray = np.stack([
+        sum(category_results[column][side] * 2.0**shift for column, shift in zip(columns, shifts))
+        for side in (0, 1)
+    ])
+
+    incidence: np.ndarray = np.zeros((n_teams, 2 * len(home)), dtype=np.float64)
+    incidence[home, np.arange(len(home))] = 1
+    incidence[away, len(home) + np.arange(len(home))] = 1
+
+    rng: np.random.Generator = np.random.default_rng(random_seed)
+    counts: np.ndarray = np.zeros((n_teams, n_teams), dtype=np.int64)
+
+    for start in range(0, n_simulations, chunk_size):
+        n_chunk: int = min(chunk_size, n_simulations - start)
+
+        # Matches run along the first axis, so every row of lookups stays within one table
+        uniforms: np.ndarray = rng.integers(0, 2**TABLE_BITS, size=(len(home), n_chunk), dtype=np.uint16)
+        scores: np.ndarray = np.take(tables, offsets + uniforms).astype(np.intp)
+        results: np.ndarray = np.concatenate([np.take(packed_results[0], scores), np.take(packed_results[1], scores)])
+        added: np.ndarray = (incidence @ results).T.astype(np.int64)
+
+        final: LeagueTable = LeagueTable(n_teams, tie_break=tie_break, batch_shape=(n_chunk,), dtype=np.int32)
+        for column, shift, column_bits in zip(columns, shifts, bits):
+            final.stats[column] = current.stats[column] + ((added >> shift) & ((1 << column_bits) - 1)).astype(np.int32)
+
+        cells: np.ndarray = np.arange(n_teams) * n_teams + final.positions() - 1
+        counts += np.bincount(cells.ravel(), minlength=n_teams**2).reshape(n_teams, n_teams)
+
+    probabilities: np.ndarray = counts / n_simulations
+    clubs = standings["Club"].tolist() if "Club" in standings.columns else list(range(n_teams))
+
+    forecast: pd.DataFrame = pd.DataFrame(probabilities, index=pd.Index(clubs, name="Club"), columns=range(1, n_teams + 1))
+    forecast["Title"] = probabilities[:, 0]
+    forecast["Relegation"] = probabilities[:, n_teams - relegation_places :].sum(axis=1)
+    forecast["Expected"] = probabilities @ np.arange(1, n_teams + 1)
+
+    return forecast
+
+
+def _category_results() -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns what every score category adds to each statistic of the home and of the away club.
+
+    Returns:
+        dict: A (home, away) pair of integer arrays with shape (MAX_GOALS^2,) per statistic.
+    """
+    categories: np.ndarray = np.arange(MAX_GOALS**2)
+    home_goals: np.ndarray = categories // MAX_GOALS
+    away_goals: np.ndarray = categories % MAX_GOALS
+
+    home_wins: np.ndarray = (home_goals > away_goals).astype(np.int64)
+    away_wins: np.ndarray = (home_goals < away_goals).astype(np.int64)
+    draws: np.ndarray = (home_goals == away_goals).astype(np.int64)
+
+    return {
+        "Pts": (3 * home_wins + draws, 3 * away_wins + draws),
+        "Matches": (np.ones_like(categories), np.ones_like(categories)),
+        "W": (home_wins, away_wins),
+        "D": (draws, draws),
+        "L": (away_wins, home_wins),
+        "+": (home_goals, away_goals),
+        "-": (away_goals, home_goals),
+    }
@@ -0,0 +1,397 @@
+import numpy as np
+import pandas as pd
+
+from typing import Dict, List, Sequence, Tuple, Union
+
+# Criteria are applied in order, every one of them ranking the largest value first
+TIE_BREAK_RULES: Dict[str, Tuple[str, ...]] = {
+    "premier_league": ("Pts", "SG", "+"),
+    "brasileirao": ("Pts", "W", "SG", "+"),
+}
+
+STAT_COLUMNS: Tuple[str, ...] = ("Pts", "Matches", "W", "D", "L", "+", "-")
+
+
+def rank_dtype(n_teams: int) -> np.dtype:
+    """
+    Returns the smallest signed integer dtype able to hold the positions of a league.
+
+    Parameters:
+        n_teams (int): The number of teams in the league.
+
+    Returns:
+        np.dtype: int8 for leagues up to 127 teams, int16 otherwise.
+    """
+    return np.dtype(np.int8) if n_teams <= np.iinfo(np.int8).max else np.dtype(np.int16)
+
+
+def stat_dtype(n_rounds: int) -> np.dtype:
+    """
+    Returns a small integer dtype for the cumulative statistics of a season.
+
+    Parameters:
+        n_rounds (int): The number of rounds of the season.
+
+    Returns:
+        np.dtype: int16 for seasons up to 1000 rounds, int32 otherwise.
+    """
+    return np.dtype(np.int16) if n_rounds <= 1000 else np.dtype(np.int32)
+
+
+class LeagueTable:
+    """
+    An array-backed league table, optionally batched over seasons or rounds.
+
+    Every statistic is stored as a small-dtype array with shape (*batch_shape, n_teams), where the
+    last axis is the club index, and clubs are ranked with a single `np.lexsort` over the
+    configured tie-break criteria.
+
+    Attributes:
+        stats (dict): Arrays for "Pts", "Matches", "W", "D", "L", "+" and "-".
+        tie_break (tuple): Column names used to rank the clubs, most important first.
+    """
+
+    def __init__(
+        self,
+        n_teams: int,
+        tie_break: Union[str, Sequence[str]] = "premier_league",
+        batch_shape: Tuple[int, ...] = (),
+        dtype: np.dtype = np.int16,
+    ):
+        """
+        Initializes an empty table.
+
+        Parameters:
+            n_teams (int): The number of teams in the league.
+            tie_break (str or sequence of str, optional): A key of `TIE_BREAK_RULES` or the column
+                names used to rank the clubs, most important first. Default is "premier_league".
+            batch_shape (tuple, optional): Leading dimensions of independent tables. Default is ().
+            dtype (np.dtype, optional): The dtype of every statistic. Default is int16.
+        """
+        self.stats: Dict[str, np.ndarray] = {
+            column: np.zeros(tuple(batch_shape) + (n_teams,), dtype=dtype)
+            for column in STAT_COLUMNS
+        }
+        self.tie_break: Tuple[str, ...] = _resolve_tie_break(tie_break)
+
+    @property
+    def n_teams(self) -> int:
+        """The number of teams in the league."""
+        return self.stats["Pts"].shape[-1]
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """
+        Returns a statistic of the table, including the derived goal difference "SG".
+
+        Parameters:
+            column (str): The name of the statistic.
+
+        Returns:
+            np.ndarray: The statistic of every club.
+        """
+        if column == "SG":
+            return self.stats["+"] - self.stats["-"]
+
+        return self.stats[column]
+
+    @classmethod
+    def from_round_goals(
+        cls,
+        goals_for: np.ndarray,
+        goals_against: np.ndarray,
+        played: np.ndarray = None,
+        tie_break: Union[str, Sequence[str]] = "premier_league",
+    ) -> "LeagueTable":
+        """
+        Builds the standings after every round from the goals of each club in each round.
+
+        Parameters:
+            goals_for (np.ndarray): Goals scored with shape (..., rounds, n_teams).
+            goals_against (np.ndarray): Goals conceded with the same shape.
+            played (np.ndarray, optional): Number of matches of each club in each round, with the
+                same shape. If None, every club plays once per round.
+            tie_break (str or sequence of str, optional): The ranking criteria. Default is "premier_league".
+
+        Returns:
+            LeagueTable: A table batched over (..., rounds) with the cumulative standings.
+        """
+        n_rounds: int = goals_for.shape[-2]
+        dtype: np.dtype = stat_dtype(n_rounds)
+
+        if played is None:
+            played = np.ones(goals_for.shape, dtype=dtype)
+
+        wins: np.ndarray = (goals_for > goals_against) & (played > 0)
+        draws: np.ndarray = (goals_for == goals_against) & (played > 0)
+        losses: np.ndarray = (goals_for < goals_against) & (played > 0)
+
+        return cls.from_stats(
+            {
+                "Pts": np.cumsum(3 * wins + draws, axis=-2, dtype=dtype),
+                "Matches": np.cumsum(played, axis=-2, dtype=dtype),
+                "W": np.cumsum(wins, axis=-2, dtype=dtype),
+                "D": np.cumsum(draws, axis=-2, dtype=dtype),
+                "L": np.cumsum(losses, axis=-2, dtype=dtype),
+                "+": np.cumsum(goals_for, axis=-2, dtype=dtype),
+                "-": np.cumsum(goals_against, axis=-2, dtype=dtype),
+            },
+            tie_break,
+        )
+
+    @classmethod
+    def from_stats(
+        cls,
+        stats: Dict[str, np.ndarray],
+        tie_break: Union[str, Sequence[str]] = "premier_league",
+    ) -> "LeagueTable":
+        """
+        Wraps existing statistic arrays into a table, without copying them.
+
+        Parameters:
+            stats (dict): An array for every column of `STAT_COLUMNS`, all with shape (*batch_shape, n_teams).
+            tie_break (str or sequence of str, optional): The ranking criteria. Default is "premier_league".
+
+        Returns:
+            LeagueTable: The table over `stats`.
+        """
+        missing: List[str] = [column for column in STAT_COLUMNS if column not in stats]
+        if missing:
+            raise ValueError(f"Statistics {missing} are missing")
+
+        table: LeagueTable = cls.__new__(cls)
+        table.stats = {column: stats[column] for column in STAT_COLUMNS}
+        table.tie_break = _resolve_tie_break(tie_break)
+
+        return table
+
+    @classmethod
+    def from_matches(
+        cls,
+        rounds: np.ndarray,
+        home: np.ndarray,
+        away: np.ndarray,
+        home_goals: np.ndarray,
+        away_goals: np.ndarray,
+        n_teams: int,
+        n_rounds: int = None,
+        tie_break: Union[str, Sequence[str]] = "premier_league",
+    ) -> "LeagueTable":
+        """
+        Builds the standings after every round from a list of match results.
+
+        Unlike `from_round_goals`, a club may play any number of matches in a round (postponed
+        matches, for instance), since wins, draws and losses are counted per match.
+
+        Parameters:
+            rounds (array-like): 0-based round index of every match, with shape (matches,).
+            home (array-like): Index of the home club of every match.
+            away (array-like): Index of the away club of every match.
+            home_goals (array-like): Goals of the home clubs.
+            away_goals (array-like): Goals of the away clubs.
+            n_teams (int): The number of teams in the league.
+            n_rounds (int, optional): The number of rounds. If None, the last round with a match.
+            tie_break (str or sequence of str, optional): The ranking criteria. Default is "premier_league".
+
+        Returns:
+            LeagueTable: A table batched over rounds with the cumulative standings.
+        """
+        rounds = np.asarray(rounds)
+        home_goals = np.asarray(home_goals)
+        away_goals = np.asarray(away_goals)
+
+        if n_rounds is None:
+            n_rounds = int(rounds.max(initial=-1)) + 1
+
+        dtype: np.dtype = stat_dtype(n_rounds)
+        table: LeagueTable = cls(n_teams, tie_break=tie_break, batch_shape=(n_rounds,), dtype=dtype)
+
+        for clubs, scored, conceded in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+            index: Tuple = (rounds, np.asarray(clubs))
+            np.add.at(table.stats["Matches"], index, 1)
+            np.add.at(table.stats["+"], index, scored)
+            np.add.at(table.stats["-"], index, conceded)
+            np.add.at(table.stats["W"], index, scored > conceded)
+            np.add.at(table.stats["D"], index, scored == conceded)
+            np.add.at(table.stats["L"], index, scored < conceded)
+            np.add.at(table.stats["Pts"], index, 3 * (scored > conceded) + (scored == conceded))
+
+        for column in STAT_COLUMNS:
+            np.cumsum(table.stats[column], axis=-2, out=table.stats[column])
+
+        return table
+
+    @classmethod
+    def from_standings(
+        cls,
+        standings: pd.DataFrame,
+        tie_break: Union[str, Sequence[str]] = "premier_league",
+    ) -> "LeagueTable":
+        """
+        Builds a table from a standings dataframe, either produced by `init_standings` or scraped.
+
+        Goals can be given as "+" and "-" columns or as a Transfermarkt "Goals" column ("45:30").
+        Missing match counts are derived from wins, draws and losses.
+
+        Parameters:
+            standings (pd.DataFrame): The standings, one row per club.
+            tie_break (str or sequence of str, optional): The ranking criteria. Default is "premier_league".
+
+        Returns:
+            LeagueTable: An unbatched table with the clubs in the row order of `standings`.
+        """
+        table: LeagueTable = cls(len(standings), tie_break=tie_break)
+
+        columns: Dict[str, pd.Series] = {column: standings[column] for column in standings.columns}
+        if "Goals" in columns and "+" not in columns:
+            goals: pd.DataFrame = columns["Goals"].astype(str).str.split(":", expand=True)
+            columns["+"], columns["-"] = goals[0], goals[1]
+        if "GP" in columns and "Matches" not in columns:
+            columns["Matches"] = columns["GP"]
+
+        for column in STAT_COLUMNS:
+            if column in columns:
+                table.stats[column][:] = pd.to_numeric(columns[column]).to_numpy()
+
+        if "Matches" not in columns:
+            table.stats["Matches"] = table.stats["W"] + table.stats["D"] + table.stats["L"]
+
+        return table
+
+    def select(self, index) -> "LeagueTable":
+        """
+        Selects part of the batch, such as the standings after a single round.
+
+        Parameters:
+            index (int, slice or tuple): An index into the batch dimensions, as in NumPy.
+
+        Returns:
+            LeagueTable: The selected tables, viewing the statistics of this one when `index` is basic.
+        """
+        index = index if isinstance(index, tuple) else (index,)
+        if len(index) > self.stats["Pts"].ndim - 1:
+            raise IndexError(f"Too many indexes for a table batched over {self.stats['Pts'].shape[:-1]}")
+
+        return LeagueTable.from_stats({column: values[index] for column, values in self.stats.items()}, self.tie_break)
+
+    def update_matchweek(
+        self,
+        home: np.ndarray,
+        away: np.ndarray,
+        home_goals: np.ndarray,
+        away_goals: np.ndarray,
+    ) -> "LeagueTable":
+        """
+        Adds the results of a whole matchweek to the table.
+
+        Parameters:
+            home (array-like): Index of the home club of every match, with shape (matches,).
+            away (array-like): Index of the away club of every match, with shape (matches,).
+            home_goals (array-like): Goals of the home clubs with shape (*batch_shape, matches).
+            away_goals (array-like): Goals of the away clubs with the same shape.
+
+        Returns:
+            LeagueTable: The table itself, to allow chaining.
+        """
+        home_goals = np.asarray(home_goals)
+        away_goals = np.asarray(away_goals)
+
+        for clubs, scored, conceded in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+            index: Tuple = (Ellipsis, np.asarray(clubs))
+            np.add.at(self.stats["Matches"], index, 1)
+            np.add.at(self.stats["+"], index, scored)
+            np.add.at(self.stats["-"], index, conceded)
+            np.add.at(self.stats["W"], index, scored > conceded)
+            np.add.at(self.stats["D"], index, scored == conceded)
+            np.add.at(self.stats["L"], index, scored < conceded)
+            np.add.at(self.stats["Pts"], index, 3 * (scored > conceded) + (scored == conceded))
+
+        return self
+
+    def order(self) -> np.ndarray:
+        """
+        Sorts the clubs by the tie-break criteria. Clubs tied on every criterion keep their index order.
+
+        Returns:
+            np.ndarray: Club indexes from first to last place, with shape (*batch_shape, n_teams).
+        """
+        columns: List[np.ndarray] = [self[column] for column in self.tie_break]
+        if columns[0].size == 0:
+            return np.zeros(columns[0].shape, dtype=np.intp)
+
+        # When the criteria fit together in 62 bits they are packed into one key and sorted once,
+        # which is several times faster than a lexsort over small rows
+        lows: List[int] = [int(column.min()) for column in columns]
+        spans: List[int] = [int(column.max()) - low + 1 for column, low in zip(columns, lows)]
+        if np.prod(spans, dtype=np.float64) < 2**62:
+            key: np.ndarray = np.zeros(columns[0].shape, dtype=np.int64)
+            for column, low, span in zip(columns, lows, spans):
+                key *= span
+                key += column
+                key -= low
+
+            return np.argsort(-key, axis=-1, kind="stable")
+
+        keys: List[np.ndarray] = [-column for column in reversed(columns)]
+
+        return np.lexsort(keys, axis=-1)
+
+    def positions(self) -> np.ndarray:
+        """
+        Computes the 1-based position of every club.
+
+        Returns:
+            np.ndarray: Positions with shape (*batch_shape, n_teams).
+        """
+        positions: np.ndarray = np.empty(self.stats["Pts"].shape, dtype=rank_dtype(self.n_teams))
+        np.put_along_axis(
+            positions,
+            self.order(),
+            np.arange(1, self.n_teams + 1, dtype=positions.dtype),
+            axis=-1,
+        )
+
+        return positions
+
+    def to_dataframe(self, clubs: Sequence = None) -> pd.DataFrame:
+        """
+        Converts an unbatched table into the standings dataframe used by `init_standings`, sorted by position.
+
+        Parameters:
+            clubs (sequence, optional): The club names. If None, club indexes are used.
+
+        Returns:
+            pd.DataFrame: The standings with "Club", the statistics, "SG" and "Position".
+        """
+        standings: pd.DataFrame = pd.DataFrame(
+            {"Club": list(range(self.n_teams)) if clubs is None else list(clubs)}
+        )
+        for column in STAT_COLUMNS:
+            standings[column] = self.stats[column]
+        standings["SG"] = self["SG"]
+        standings["Position"] = self.positions()
+
+        return standings.sort_values("Position")
+
+
+def _resolve_tie_break(tie_break: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+    """
+    Resolves a tie-break configuration into the list of columns to rank by.
+
+    Parameters:
+        tie_break (str or sequence of str): A key of `TIE_BREAK_RULES` or the column names.
+
+    Returns:
+        tuple: The column names, most important first.
+    """
+    if isinstance(tie_break, str):
+        if tie_break not in TIE_BREAK_RULES:
+            raise ValueError(
+                f"Unknown tie-break rule {tie_break}, expected one of {list(TIE_BREAK_RULES)}"
+            )
+        return TIE_BREAK_RULES[tie_break]
+
+    for column in tie_break:
+        if column not in STAT_COLUMNS and column != "SG":
+            raise ValueError(f"Unknown tie-break column {column}")
+
+    return tuple(tie_break)
@@ -0,0 +1,229 @@
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from src.calculations.accumulator import CurveAccumulator
+from src.calculations.corr import spearman_tau_batch
+from src.calculations.rank_cube import RankCube
+from src.calculations.simulation import simulate_seasons
+from src.calculations.team_strength import TeamStrengths
+
+
+def simulate_spearman_tau(
+    num_seasons: int = 22,
+    poisson_mean: float = 1.325,
+    n_teams: int = 20,
+    random_seed: int = 1,
+    n_workers: int = 1,
+    chunk_size: int = 1024,
+    strengths: TeamStrengths = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulates seasons in chunks across a process pool and returns the per-season curves.
+
+    Every chunk gets its own seed spawned from `random_seed`, so the result depends only on the
+    seed and the chunk size: a serial run and a run with any number of workers are bit-identical.
+
+    Parameters:
+        num_seasons (int, optional): The number of seasons to simulate. Default is 22.
+        poisson_mean (float, optional): The mean of the Poisson distribution for simulating match goals.
+            Default is 1.325.
+        n_teams (int, optional): The number of teams in the league. Default is 20.
+        random_seed (int, optional): The seed from which every chunk seed is spawned. Default is 1.
+        n_workers (int, optional): The number of worker processes. With 1, chunks run in the
+            current process. Default is 1.
+        chunk_size (int, optional): The number of seasons simulated by each task. Default is 1024.
+        strengths (TeamStrengths, optional): Per-club attack, defence and home advantage, replacing
+            `poisson_mean`. Default is None.
+
+    Returns:
+        rho (np.ndarray): Spearman correlations with shape (num_seasons, rounds).
+        tau (np.ndarray): Normalized Kendall-tau distances with shape (num_seasons, rounds).
+    """
+    results: List[Tuple[np.ndarray, np.ndarray]] = list(
+        iterate_spearman_tau_chunks(
+            num_seasons, poisson_mean, n_teams, random_seed, n_workers, chunk_size, strengths
+        )
+    )
+
+    rho: np.ndarray = np.concatenate([chunk_rho for chunk_rho, _ in results])
+    tau: np.ndarray = np.concatenate([chunk_tau for _, chunk_tau in results])
+
+    return rho, tau
+
+
+def iterate_spearman_tau_chunks(
+    num_seasons: int = 22,
+    poisson_mean: float = 1.325,
+    n_teams: int = 20,
+    random_seed: int = 1,
+    n_workers: int = 1,
+    chunk_size: int = 1024,
+    strengths: TeamStrengths = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yields the Spearman and tau curves of the simulated seasons chunk by chunk, in order.
+
+    Takes the same parameters as `simulate_spearman_tau` and produces the same chunks, without
+    keeping them all in memory.
+
+    Yields:
+        tuple: The Spearman and normalized Kendall-tau curves of one chunk, each with shape
+            (seasons, rounds).
+    """
+    chunk_lengths: List[int] = [
+        min(chunk_size, num_seasons - start) for start in range(0, num_seasons, chunk_size)
+    ]
+    seeds: List[np.random.SeedSequence] = np.random.SeedSequence(random_seed).spawn(
+        len(chunk_lengths)
+    )
+    tasks: List[Tuple] = [
+        (poisson_mean, n_teams, n_seasons, seed, strengths)
+        for n_seasons, seed in zip(chunk_lengths, seeds)
+    ]
+
+    if n_workers == 1:
+        yield from map(_simulate_chunk, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            yield from executor.map(_simulate_chunk, tasks)
+
+
+def simulate_until_converged(
+    tolerance: float,
+    confidence: float = 0.95,
+    poisson_mean: float = 1.325,
+    n_teams: int = 20,
+    random_seed: int = 1,
+    n_workers: int = 1,
+    chunk_size: int = 1024,
+    max_seasons: int = 1_000_000,
+    strengths: TeamStrengths = None,
+) -> Tuple[CurveAccumulator, CurveAccumulator]:
+    """
+    Keeps simulating chunks of seasons until the confidence interval of the mean tau curve is
+    narrower than `tolerance` at every round.
+
+    Chunks are seeded exactly as in `simulate_spearman_tau`, so stopping after k chunks gives the
+    same curves as a fixed run of k * chunk_size seasons.
+
+    Parameters:
+        tolerance (float): The largest accepted width of the per-round confidence interval.
+        confidence (float, optional): The confidence level of the interval. Default is 0.95.
+        poisson_mean (float, optional): The mean of the Poisson distribution for simulating match goals.
+            Default is 1.325.
+        n_teams (int, optional): The number of teams in the league. Default is 20.
+        random_seed (int, optional): The seed from which every chunk seed is spawned. Default is 1.
+        n_workers (int, optional): The number of worker processes; each step simulates one chunk
+            per worker. Default is 1.
+        chunk_size (int, optional): The number of seasons simulated by each task. Default is 1024.
+        max_seasons (int, optional): The number of seasons after which the simulation stops even if
+            the tolerance was not reached. Default is 1,000,000.
+        strengths (TeamStrengths, optional): Per-club attack, defence and home advantage, replacing
+            `poisson_mean`. Default is None.
+
+    Returns:
+        tuple: The Spearman and the normalized Kendall-tau accumulators.
+    """
+    n_rounds: int = 2 * (n_teams - 1)
+    spearman_accumulator: CurveAccumulator = CurveAccumulator(n_rounds)
+    tau_accumulator: CurveAccumulator = CurveAccumulator(n_rounds)
+
+    seed_sequence: np.random.SeedSequence = np.random.SeedSequence(random_seed)
+    executor: ProcessPoolExecutor = (
+        ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    )
+
+    try:
+        while tau_accumulator.count < max_seasons:
+            remaining: int = max_seasons - tau_accumulator.count
+            chunk_lengths: List[int] = [
+                min(chunk_size, remaining - start)
+                for start in range(0, min(remaining, n_workers * chunk_size), chunk_size)
+            ]
+            tasks: List[Tuple] = [
+                (poisson_mean, n_teams, n_seasons, seed, strengths)
+                for n_seasons, seed in zip(chunk_lengths, seed_sequence.spawn(len(chunk_lengths)))
+            ]
+
+            results = executor.map(_simulate_chunk, tasks) if executor else map(_simulate_chunk, tasks)
+            for rho, tau in results:
+                spearman_accumulator.update(rho)
+                tau_accumulator.update(tau)
+
+            if np.all(tau_accumulator.confidence_width(confidence) < tolerance):
+                break
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return spearman_accumulator, tau_accumulator
+
+
+def simulate_rank_cube(
+    path: str,
+    num_seasons: int,
+    poisson_mean: float = 1.325,
+    n_teams: int = 20,
+    random_seed: int = 1,
+    chunk_size: int = 1024,
+    strengths: TeamStrengths = None,
+) -> RankCube:
+    """
+    Simulates seasons chunk by chunk straight into a memory-mapped rank cube on disk.
+
+    Chunks are seeded as in `simulate_spearman_tau`, so the cube holds the same seasons whose
+    curves that function returns.
+
+    Parameters:
+        path (str): The folder where the cube is saved.
+        num_seasons (int): The number of seasons to simulate.
+        poisson_mean (float, optional): The mean of the Poisson distribution for simulating match goals.
+            Default is 1.325.
+        n_teams (int, optional): The number of teams in the league. Default is 20.
+        random_seed (int, optional): The seed from which every chunk seed is spawned. Default is 1.
+        chunk_size (int, optional): The number of seasons simulated and written at once. Default is 1024.
+        strengths (TeamStrengths, optional): Per-club attack, defence and home advantage, replacing
+            `poisson_mean`. Default is None.
+
+    Returns:
+        RankCube: The cube, backed by the file it was written to.
+    """
+    cube: RankCube = RankCube.create(path, num_seasons, n_teams, 2 * (n_teams - 1))
+
+    n_chunks: int = -(-num_seasons // chunk_size)
+    seeds: List[np.random.SeedSequence] = np.random.SeedSequence(random_seed).spawn(n_chunks)
+
+    for chunk, seed in enumerate(seeds):
+        start: int = chunk * chunk_size
+        n_seasons: int = min(chunk_size, num_seasons - start)
+
+        cube.ranks[start : start + n_seasons] = simulate_seasons(
+            poisson_mean, n_teams=n_teams, n_seasons=n_seasons, random_seed=seed, strengths=strengths
+        )
+
+    cube.ranks.flush()
+
+    return cube
+
+
+def _simulate_chunk(task: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulates one chunk of seasons and reduces it to its Spearman and tau curves.
+
+    Parameters:
+        task (tuple): The Poisson mean, number of teams, number of seasons, seed and team strengths
+            (or None) of the chunk.
+
+    Returns:
+        tuple: The Spearman and normalized Kendall-tau curves of the chunk, each with shape
+            (seasons, rounds).
+    """
+    poisson_mean, n_teams, n_seasons, seed, strengths = task
+
+    rank_tensor: np.ndarray = simulate_seasons(
+        poisson_mean, n_teams=n_teams, n_seasons=n_seasons, random_seed=seed, strengths=strengths
+    )
+
+    return spearman_tau_batch(rank_tensor)
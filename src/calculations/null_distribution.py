@@ -0,0 +1,410 @@
+"""
+Exact permutation distributions of the Spearman and Kendall statistics, kept as p-value lookup tables.
+
+Under the null hypothesis every ordering of n untied clubs is equally likely, so the p-value of a
+statistic is a tail of its distribution over the n! permutations. Both distributions are built
+once per n by dynamic programming, turned into cumulative tables and saved to disk; after that,
+every p-value is two array lookups.
+
+Spearman's distribution is exact up to `MAX_EXACT_SPEARMAN_N` clubs. Past 16 clubs it takes a few
+minutes and a couple of GB to build, so the counts for 17 to 20 clubs ship in `null_tables/`; they
+were generated with `PValueTables(SHIPPED_TABLES_FOLDER).table("spearman", n)`. Larger leagues
+only get the sampled "spearman_permutation" tables, which are never reported as exact.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from math import factorial
+from typing import Dict, Set, Tuple
+
+# The Spearman dynamic program keeps a count vector per subset of clubs, which stops fitting in
+# memory past MAX_SUBSET_DP_N; up to MAX_EXACT_SPEARMAN_N the two halves of the permutation are
+# counted separately and joined, and the n! counts still fit in int64
+MAX_SUBSET_DP_N: int = 16
+MAX_EXACT_SPEARMAN_N: int = 20
+SPEARMAN_PERMUTATIONS: int = 2_000_000
+
+SHIPPED_TABLES_FOLDER: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "null_tables")
+DEFAULT_TABLES_FOLDER: str = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "partial_standings",
+    "null_tables",
+)
+
+
+def kendall_discordant_counts(n: int) -> np.ndarray:
+    """
+    Counts the permutations of n elements by number of discordant pairs (the Mahonian numbers).
+
+    Inserting the k-th element into a permutation of k - 1 elements adds between 0 and k - 1
+    discordant pairs, so each step is a sliding-window sum over the previous counts.
+
+    Parameters:
+        n (int): The number of ranked clubs.
+
+    Returns:
+        np.ndarray: Entry d is the number of permutations with d discordant pairs, for d from 0
+            to n (n - 1) / 2. Counts are exact int64 up to n = 20 and float64 beyond.
+    """
+    dtype: type = np.int64 if factorial(n) < 2**63 else np.float64
+    counts: np.ndarray = np.ones(1, dtype=dtype)
+
+    for k in range(2, n + 1):
+        cumulative: np.ndarray = np.concatenate([np.zeros(1, dtype=dtype), np.cumsum(counts)])
+        size: int = len(counts) + k - 1
+        upper: np.ndarray = np.minimum(np.arange(size) + 1, len(counts))
+        lower: np.ndarray = np.maximum(np.arange(size) - k + 1, 0)
+        counts = cumulative[upper] - cumulative[lower]
+
+    return counts
+
+
+def spearman_square_sum_counts(n: int) -> np.ndarray:
+    """
+    Counts the permutations of n elements by sum of squared rank differences S = sum (i - p(i))^2.
+
+    Positions are assigned in order and the state is the set of ranks already used, so every
+    subset keeps a count vector over the partial sums. Past `MAX_SUBSET_DP_N` clubs the two
+    halves of the positions are counted separately and joined by `_spearman_split_counts`.
+
+    Parameters:
+        n (int): The number of ranked clubs, at most `MAX_EXACT_SPEARMAN_N`.
+
+    Returns:
+        np.ndarray: Entry s is the number of permutations with S = s, for s from 0 to n (n^2 - 1) / 3.
+    """
+    if n > MAX_EXACT_SPEARMAN_N:
+        raise ValueError(f"The exact Spearman distribution is only built up to n = {MAX_EXACT_SPEARMAN_N}")
+    if n > MAX_SUBSET_DP_N:
+        return _spearman_split_counts(n)
+
+    _, counts = _spearman_prefix_counts(n, n)[n]
+
+    return counts[0].astype(np.int64)
+
+
+def _spearman_prefix_counts(n: int, positions: int, keep: Set[int] = frozenset()) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Runs the subset dynamic program over the first `positions` positions of n clubs.
+
+    Only two layers of subsets are alive at a time, which bounds the memory by C(n, n / 2)
+    vectors, each cut at the largest partial sum its layer can reach.
+
+    Parameters:
+        n (int): The number of ranked clubs.
+        positions (int): The number of positions assigned.
+        keep (set, optional): Earlier layers to return as well.
+
+    Returns:
+        dict: For `positions` and every layer in `keep`, the sorted rank subsets of the layer and
+            their counts per partial sum, one row per subset.
+    """
+    dtype: type = np.int32 if factorial(positions) < 2**31 else np.int64
+    subsets: np.ndarray = np.arange(2**n)
+    sizes: np.ndarray = np.zeros(2**n, dtype=np.int64)
+    for rank in range(n):
+        sizes += (subsets >> rank) & 1
+
+    # Row of every subset within its layer
+    rows: np.ndarray = np.zeros(2**n, dtype=np.int64)
+    layers = [subsets[sizes == k] for k in range(positions + 1)]
+    for layer in layers:
+        rows[layer] = np.arange(len(layer))
+    del subsets, sizes
+
+    counts: np.ndarray = np.ones((1, 1), dtype=dtype)
+    kept: Dict[int, Tuple[np.ndarray, np.ndarray]] = {0: (layers[0], counts)} if 0 in keep else {}
+
+    for position in range(positions):
+        layer: np.ndarray = layers[position]
+        width: int = _max_partial_square_sum(n, position + 1) + 1
+        next_counts: np.ndarray = np.zeros((len(layers[position + 1]), width), dtype=dtype)
+
+        for rank in range(n):
+            shift: int = (position - rank) ** 2
+            length: int = min(counts.shape[1], width - shift)
+            # In chunks, so the gathered rows never cost more than a slice of a layer
+            for start in range(0, len(layer), 65_536):
+                chunk: np.ndarray = layer[start : start + 65_536]
+                free: np.ndarray = np.flatnonzero(((chunk >> rank) & 1) == 0)
+                targets: np.ndarray = rows[chunk[free] | (1 << rank)]
+                next_counts[targets, shift : shift + length] += counts[start + free, :length]
+
+        counts = next_counts
+        if position + 1 in keep:
+            kept[position + 1] = layers[position + 1], counts
+
+    kept[positions] = layers[positions], counts
+
+    return kept
+
+
+def _spearman_split_counts(n: int) -> np.ndarray:
+    """
+    Counts the permutations of n elements by S, joining the counts of the first and last halves
+    of the positions.
+
+    The first h positions take a rank subset T and the other positions take its complement.
+    Reflecting positions and ranks (i -> n - 1 - i) maps the last n - h positions onto the first
+    ones without changing S, so the counts of the second half are those of the reflected
+    complement in the same dynamic program. Joining is a sum over T of outer products, computed
+    as matrix products in float64 chunks small enough to stay exact.
+    """
+    h: int = n // 2
+    layers: Dict[int, Tuple[np.ndarray, np.ndarray]] = _spearman_prefix_counts(n, n - h, keep={h})
+    first_subsets, first = layers[h]
+    second_subsets, second = layers[n - h]
+    del layers
+
+    reflected: np.ndarray = np.zeros_like(first_subsets)
+    complement: np.ndarray = (2**n - 1) ^ first_subsets
+    for rank in range(n):
+        reflected |= ((complement >> rank) & 1) << (n - 1 - rank)
+    partner_rows: np.ndarray = np.searchsorted(second_subsets, reflected)
+    del complement, reflected
+
+    # Splitting the first counts in high and low bits keeps every chunk product below 2^53
+    split: int = (int(first.max()).bit_length() + 1) // 2
+    chunk_size: int = max(1, min(16_384, 2**53 // (2**split * max(int(second.max()), 1) + 1)))
+    low_mask: int = 2**split - 1
+
+    products: np.ndarray = np.zeros((first.shape[1], second.shape[1]), dtype=np.int64)
+    for start in range(0, len(first), chunk_size):
+        part: np.ndarray = first[start : start + chunk_size]
+        partners: np.ndarray = second[partner_rows[start : start + chunk_size]].astype(np.float64)
+        high: np.ndarray = (part >> split).astype(np.float64).T @ partners
+        low: np.ndarray = (part & low_mask).astype(np.float64).T @ partners
+        products += (np.rint(high).astype(np.int64) << split) + np.rint(low).astype(np.int64)
+
+    size: int = n * (n**2 - 1) // 3 + 1
+    counts: np.ndarray = np.zeros(products.shape[0] + products.shape[1] - 1, dtype=np.int64)
+    for first_sum in range(products.shape[0]):
+        counts[first_sum : first_sum + products.shape[1]] += products[first_sum]
+
+    return counts[:size]
+
+
+def _max_partial_square_sum(n: int, positions: int) -> int:
+    """
+    The largest sum of squared differences between the first `positions` positions and distinct ranks.
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    cost: np.ndarray = (np.arange(positions)[:, None] - np.arange(n)[None, :]) ** 2
+    assigned_positions, assigned_ranks = linear_sum_assignment(cost, maximize=True)
+
+    return int(cost[assigned_positions, assigned_ranks].sum())
+
+
+def spearman_square_sum_sample(n: int, n_permutations: int = SPEARMAN_PERMUTATIONS, random_seed: int = 0) -> np.ndarray:
+    """
+    Estimates the counts of `spearman_square_sum_counts` from random permutations, for leagues too
+    large for the exact distribution.
+
+    Parameters:
+        n (int): The number of ranked clubs.
+        n_permutations (int, optional): The number of permutations drawn. Default is 2,000,000.
+        random_seed (int, optional): The seed for the random number generator. Default is 0.
+
+    Returns:
+        np.ndarray: Entry s is the number of sampled permutations with S = s.
+    """
+    size: int = n * (n**2 - 1) // 3 + 1
+    rng: np.random.Generator = np.random.default_rng(random_seed)
+    counts: np.ndarray = np.zeros(size, dtype=np.int64)
+
+    for start in range(0, n_permutations, 100_000):
+        n_chunk: int = min(100_000, n_permutations - start)
+        permutations: np.ndarray = rng.permuted(np.broadcast_to(np.arange(n), (n_chunk, n)), axis=1)
+        square_sums: np.ndarray = np.sum((permutations - np.arange(n)) ** 2, axis=1)
+        counts += np.bincount(square_sums, minlength=size)
+
+    return counts
+
+
+class PValueTables:
+    """
+    Exact p-values of the Spearman and Kendall statistics for untied rankings, answered by lookup.
+
+    Tables are built on first use for each (statistic, n), kept in memory and, when a folder is
+    given, saved as `{statistic}_{n}.npz` so later runs only load them. The tables shipped in
+    `SHIPPED_TABLES_FOLDER` are loaded before anything is built.
+
+    Attributes:
+        folder (str): Where the tables are saved, or None to keep them in memory only.
+    """
+
+    def __init__(self, folder: str = None):
+        """
+        Initializes the tables.
+
+        Parameters:
+            folder (str, optional): Where the tables are saved and loaded from. Default is None.
+        """
+        self.folder: str = folder
+        self.__tables: Dict[Tuple[str, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def kendall_p_value(self, discordant: int, n: int, alternative: str = "two-sided") -> float:
+        """
+        Returns the exact p-value of a number of discordant pairs between two untied rankings.
+
+        Parameters:
+            discordant (int): The number of discordant pairs.
+            n (int): The number of ranked clubs.
+            alternative (str, optional): "two-sided" (default), "greater" for a positive
+                association (few discordant pairs) or "less" for a negative one.
+
+        Returns:
+            float: The p-value.
+        """
+        return self.__p_value("kendall", int(discordant), n, alternative)
+
+    def spearman_p_value(self, square_sum: int, n: int, alternative: str = "two-sided") -> float:
+        """
+        Returns the exact p-value of a sum of squared rank differences between two untied rankings.
+
+        Parameters:
+            square_sum (int): The sum of squared rank differences, n (n^2 - 1) (1 - rho) / 6.
+            n (int): The number of ranked clubs, at most `MAX_EXACT_SPEARMAN_N`.
+            alternative (str, optional): "two-sided" (default), "greater" for a positive
+                association (small sums) or "less" for a negative one.
+
+        Returns:
+            float: The p-value.
+        """
+        if n > MAX_EXACT_SPEARMAN_N:
+            raise ValueError(
+                f"Exact Spearman p-values are only available up to n = {MAX_EXACT_SPEARMAN_N}, "
+                "use spearman_permutation_p_value"
+            )
+
+        return self.__p_value("spearman", int(square_sum), n, alternative)
+
+    def spearman_permutation_p_value(self, square_sum: int, n: int, alternative: str = "two-sided") -> float:
+        """
+        Returns the p-value of a sum of squared rank differences estimated from
+        `spearman_square_sum_sample`, with a resolution of 1 / `SPEARMAN_PERMUTATIONS`.
+
+        Parameters:
+            square_sum (int): The sum of squared rank differences, n (n^2 - 1) (1 - rho) / 6.
+            n (int): The number of ranked clubs.
+            alternative (str, optional): "two-sided" (default), "greater" for a positive
+                association (small sums) or "less" for a negative one.
+
+        Returns:
+            float: The estimated p-value.
+        """
+        return self.__p_value("spearman_permutation", int(square_sum), n, alternative)
+
+    def table(self, statistic: str, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the lookup table of a statistic, loading or building it if needed.
+
+        Parameters:
+            statistic (str): "kendall", "spearman" or "spearman_permutation".
+            n (int): The number of ranked clubs.
+
+        Returns:
+            tuple: P(X <= x) and P(X >= x) for every value x of the statistic.
+        """
+        key: Tuple[str, int] = (statistic, n)
+        if key in self.__tables:
+            return self.__tables[key]
+
+        name: str = f"{statistic}_{n}.npz"
+        counts: np.ndarray = _load_counts(os.path.join(SHIPPED_TABLES_FOLDER, name))
+        if counts is None and self.folder:
+            counts = _load_counts(os.path.join(self.folder, name))
+
+        if counts is None:
+            counts = _null_counts(statistic, n)
+            if self.folder:
+                try:
+                    _save_counts(os.path.join(self.folder, name), counts)
+                except OSError:
+                    # A read-only cache only costs rebuilding the table in the next run
+                    pass
+
+        tables: Tuple[np.ndarray, np.ndarray] = _tail_tables(counts, statistic == "spearman_permutation")
+        self.__tables[key] = tables
+
+        return tables
+
+    def __p_value(self, statistic: str, value: int, n: int, alternative: str) -> float:
+        """
+        Looks up the p-value of a statistic whose small values mean positive association.
+        """
+        lower, upper = self.table(statistic, n)
+        if not 0 <= value < len(lower):
+            raise ValueError(f"{value} is not a possible {statistic} statistic for n = {n}")
+
+        if alternative == "greater":
+            return float(lower[value])
+        if alternative == "less":
+            return float(upper[value])
+        if alternative == "two-sided":
+            # Both distributions are symmetric, so the two-sided p-value doubles the smaller tail
+            return float(min(1.0, 2 * min(lower[value], upper[value])))
+
+        raise ValueError(f"Unknown alternative {alternative}, expected 'two-sided', 'less' or 'greater'")
+
+
+def _null_counts(statistic: str, n: int) -> np.ndarray:
+    """
+    Returns the null counts of a statistic, exact except for "spearman_permutation".
+    """
+    if statistic == "kendall":
+        return kendall_discordant_counts(n)
+    if statistic == "spearman":
+        return spearman_square_sum_counts(n)
+    if statistic == "spearman_permutation":
+        return spearman_square_sum_sample(n)
+
+    raise ValueError(f"Unknown statistic {statistic}, expected 'kendall', 'spearman' or 'spearman_permutation'")
+
+
+def _tail_tables(counts: np.ndarray, sampled: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Turns counts per value into the lower and upper tail probabilities of every value.
+
+    Tails of a sampled distribution count the observed value as one more sample, the usual
+    permutation-test estimate, so they are never zero.
+    """
+    total = counts.sum() + sampled
+    lower: np.ndarray = (np.cumsum(counts) + sampled) / total
+    upper: np.ndarray = (np.cumsum(counts[::-1])[::-1] + sampled) / total
+
+    return lower, upper
+
+
+def _load_counts(path: str) -> np.ndarray:
+    """
+    Loads the counts saved by `_save_counts`, or None if there are none at `path`.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path) as saved:
+        # Tables saved before the counts were kept are rebuilt
+        return saved["counts"] if "counts" in saved.files else None
+
+
+def _save_counts(path: str, counts: np.ndarray):
+    """
+    Saves the counts of a table through a temporary file, so concurrent readers never see a partial file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as tmp_file:
+            np.savez(tmp_file, counts=counts)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+P_VALUE_TABLES: PValueTables = PValueTables(DEFAULT_TABLES_FOLDER)
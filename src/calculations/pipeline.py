@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+from src.calculations.corr import spearman_tau_batch
+from src.calculations.power_law import fit_power_laws
+from src.calculations.rank_cube import RankCube, rank_table_to_array
+from src.calculations.transition_table import calculate_transitions_cube
+from src.calculations.utils import spearman_tau_mean
+from src.instrumentation import instrument, stage
+
+SUMMARY_FILE: str = "summary.json"
+CURVES_FILE: str = "curves.npz"
+
+
+@instrument()
+def load_rank_tables(league_folder: str) -> Tuple[List[int], List[pd.DataFrame]]:
+    """
+    Loads every rank table saved under `rank_tables/` by the scrapers.
+
+    Parameters:
+        league_folder (str): The league folder, with one `rank_tables/{year}.csv` per season.
+
+    Returns:
+        tuple: The seasons, sorted, and their rank tables.
+    """
+    rank_tables_folder: str = os.path.join(league_folder, "rank_tables")
+    seasons: List[int] = sorted(
+        int(name[:-4]) for name in os.listdir(rank_tables_folder) if name.endswith(".csv") and name[:-4].isdigit()
+    )
+
+    rank_tables: List[pd.DataFrame] = [
+        pd.read_csv(os.path.join(rank_tables_folder, f"{season}.csv")).drop(columns=["Unnamed: 0"], errors="ignore")
+        for season in seasons
+    ]
+
+    return seasons, rank_tables
+
+
+@instrument()
+def analyze_league(
+    league_folder: str,
+    output_folder: str,
+    transition_rounds: Sequence[int] = (10, 20, 30),
+    fingerprint: str = None,
+) -> Dict:
+    """
+    Runs the whole analysis of a league and saves the results.
+
+    The Spearman and normalized Kendall-tau curves of every season are computed against the final
+    round, averaged, and fitted with the tau = b * round^a power law, both per season and for the
+    mean curve. Transition tables from every round of `transition_rounds` to the final round are
+    built as well. Seasons whose number of clubs or matchweeks differs from the most common one
+    are left out and listed in the summary.
+
+    Parameters:
+        league_folder (str): The league folder, with one `rank_tables/{year}.csv` per season.
+        output_folder (str): The folder where `summary.json` and `curves.npz` are written.
+        transition_rounds (sequence, optional): The rounds the transition tables start from. Default is (10, 20, 30).
+        fingerprint (str, optional): A hash of the inputs, stored in the summary so unchanged
+            leagues can be skipped. Default is None.
+
+    Returns:
+        dict: The summary written to `summary.json`.
+    """
+    seasons, rank_tables = load_rank_tables(league_folder)
+    if not rank_tables:
+        raise ValueError(f"No rank tables found in {league_folder}")
+
+    shapes: List[Tuple[int, int]] = [rank_table_to_array(rank_table).shape for rank_table in rank_tables]
+    shape: Tuple[int, int] = Counter(shapes).most_common(1)[0][0]
+    kept: List[int] = [i for i, season_shape in enumerate(shapes) if season_shape == shape]
+
+    cube: RankCube = RankCube.from_rank_tables([rank_tables[i] for i in kept], seasons=[seasons[i] for i in kept])
+    n_teams, n_rounds = shape
+
+    spearman, tau = spearman_tau_batch(cube.ranks)
+    mean_spearman, mean_tau, spearman_std_error, tau_std_error = spearman_tau_mean(
+        tau, spearman, return_std_error=True
+    )
+
+    power, multiplier, r_square, auc = fit_power_laws(tau, refine=True)
+    mean_power, mean_multiplier, mean_r_square, mean_auc = fit_power_laws(np.asarray(mean_tau), refine=True)
+
+    transitions: Dict[str, np.ndarray] = {
+        f"transitions_{init_round}_{n_rounds}": calculate_transitions_cube(cube, init_round, n_rounds).to_numpy()
+        for init_round in transition_rounds
+        if 1 <= init_round <= n_rounds
+    }
+
+    summary: Dict = {
+        "league": os.path.basename(os.path.normpath(league_folder)),
+        "fingerprint": fingerprint,
+        "seasons": cube.seasons,
+        "skipped_seasons": [seasons[i] for i in range(len(seasons)) if i not in kept],
+        "n_teams": n_teams,
+        "n_rounds": n_rounds,
+        "mean_spearman": mean_spearman,
+        "mean_tau": mean_tau,
+        "spearman_std_error": spearman_std_error,
+        "tau_std_error": tau_std_error,
+        "power_law": {
+            "power": float(mean_power[0]),
+            "multiplier": float(mean_multiplier[0]),
+            "r_square": float(mean_r_square[0]),
+            "auc": float(mean_auc[0]),
+        },
+        "transition_tables": sorted(transitions),
+    }
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    with stage("pipeline.write_outputs"):
+        _atomic_write(
+            os.path.join(output_folder, CURVES_FILE),
+            lambda curves_file: np.savez_compressed(
+                curves_file,
+                seasons=np.asarray(cube.seasons),
+                spearman=spearman,
+                tau=tau,
+                power=power,
+                multiplier=multiplier,
+                r_square=r_square,
+                auc=auc,
+                **transitions,
+            ),
+        )
+        # The summary is written last, so its fingerprint only exists once every output is complete
+        _atomic_write(
+            os.path.join(output_folder, SUMMARY_FILE),
+            lambda summary_file: summary_file.write(json.dumps(summary, indent=2).encode("utf-8")),
+        )
+
+    return summary
+
+
+def _atomic_write(path: str, write):
+    """
+    Writes a file through a temporary file in the same folder, so readers never see a partial file.
+
+    Parameters:
+        path (str): The final path of the file.
+        write (callable): A function writing the content into a binary file object.
+    """
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as tmp_file:
+            write(tmp_file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
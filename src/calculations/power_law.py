@@ -1,8 +1,9 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
 import numpy as np
 
-from scipy.optimize import curve_fit
+from src.instrumentation import instrument
 
 
 class TauPowerLaw:
@@ -58,8 +59,8 @@ class TauPowerLaw:
         """
         return [self.tau_distance(round) for round in range(init_round, end_round + 1)]
     
-    def r_square(self, tau_points: List[float]):
-        predicted_points = self.taus_distances(1, 38)
+    def r_square(self, tau_points: List[float], init_round: int = 1):
+        predicted_points = self.taus_distances(init_round, init_round + len(tau_points) - 1)
 
         residuals = np.array(tau_points) - np.array(predicted_points)
         residuals_sum_of_squares = np.sum(residuals**2)
@@ -68,13 +69,15 @@ class TauPowerLaw:
         return 1 - (residuals_sum_of_squares/total_sum_of_squares)
     
     def area_under_curve(self, tau_points: List[float], init_round: int, end_round: int):
-        return np.trapezoid(tau_points, [i for i in range(init_round, end_round + 1)])
+        return np.trapezoid(tau_points, _rounds(init_round, end_round))
 
     def generic_power_law(round: int, power_coefficient: float, multiplier_coefficient: float):
         return multiplier_coefficient * round ** power_coefficient
     
     def get_power_law_coefficients(tau_points: List[float], init_round: int, end_round: int, full_return=False):
-        params, covariance = curve_fit(TauPowerLaw.generic_power_law, [i for i in range(init_round, end_round + 1)], tau_points)
+        from scipy.optimize import curve_fit
+
+        params, covariance = curve_fit(TauPowerLaw.generic_power_law, _rounds(init_round, end_round), tau_points)
         a, b = params
 
         if full_return:
@@ -82,3 +85,175 @@ class TauPowerLaw:
         
         return a, b
 
+
+@instrument()
+def fit_power_laws(
+    tau_curves: np.ndarray,
+    init_round: int = 1,
+    end_round: int = None,
+    refine: bool = False,
+    max_iterations: int = 100,
+    tolerance: float = 1e-10,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fits the power law tau = b * round^a to many Kendall-tau curves at once.
+
+    Initial estimates come from a closed-form least-squares line in log-log space, computed for
+    every curve in the same array operations; non-positive points are left out of that fit.
+    With `refine`, they are used as the warm start of a batched Levenberg-Marquardt fit of the
+    same least-squares problem `get_power_law_coefficients` solves with `curve_fit`.
+
+    Parameters:
+        tau_curves (array-like): Kendall-tau distances with shape (curves, rounds).
+        init_round (int, optional): The round of the first point of every curve. Default is 1.
+        end_round (int, optional): The round of the last point. If None, it follows from the curve length.
+        refine (bool, optional): Whether to refine the log-log estimates with a nonlinear fit. Default is False.
+        max_iterations (int, optional): The largest number of refinement iterations. Default is 100.
+        tolerance (float, optional): The relative change of the residuals below which a curve is
+            considered converged. Default is 1e-10.
+
+    Returns:
+        power (np.ndarray): The exponent a of every curve.
+        multiplier (np.ndarray): The multiplier b of every curve.
+        r_square (np.ndarray): The R squared of every fit, as computed by `TauPowerLaw.r_square`.
+        auc (np.ndarray): The area under every curve, as computed by `TauPowerLaw.area_under_curve`.
+    """
+    taus: np.ndarray = np.atleast_2d(np.asarray(tau_curves, dtype=np.float64))
+    if end_round is None:
+        end_round = init_round + taus.shape[1] - 1
+    if end_round - init_round + 1 != taus.shape[1]:
+        raise ValueError("The curves must have one point per round between init_round and end_round")
+
+    rounds: np.ndarray = _rounds(init_round, end_round).astype(np.float64)
+    log_rounds: np.ndarray = np.log(rounds)
+
+    power, multiplier = _log_log_estimates(taus, log_rounds)
+
+    if refine:
+        power, multiplier = _levenberg_marquardt(
+            taus, rounds, log_rounds, power, multiplier, max_iterations, tolerance
+        )
+
+    predicted: np.ndarray = multiplier[:, None] * rounds ** power[:, None]
+    residuals_sum_of_squares: np.ndarray = np.sum((taus - predicted) ** 2, axis=1)
+    total_sum_of_squares: np.ndarray = np.sum((taus - predicted.mean(axis=1, keepdims=True)) ** 2, axis=1)
+
+    r_square: np.ndarray = 1 - residuals_sum_of_squares / total_sum_of_squares
+    auc: np.ndarray = np.trapezoid(taus, rounds, axis=1)
+
+    return power, multiplier, r_square, auc
+
+
+@lru_cache(maxsize=None)
+def _rounds(init_round: int, end_round: int) -> np.ndarray:
+    """
+    Returns the read-only array of rounds from `init_round` to `end_round`, cached per range.
+    """
+    rounds: np.ndarray = np.arange(init_round, end_round + 1)
+    rounds.flags.writeable = False
+
+    return rounds
+
+
+def _log_log_estimates(taus: np.ndarray, log_rounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fits log(tau) = log(b) + a * log(round) by least squares for every curve.
+
+    Parameters:
+        taus (np.ndarray): Kendall-tau distances with shape (curves, rounds).
+        log_rounds (np.ndarray): The logarithm of every round.
+
+    Returns:
+        tuple: The exponent and the multiplier of every curve.
+    """
+    weights: np.ndarray = (taus > 0).astype(np.float64)
+    with np.errstate(divide="ignore"):
+        log_taus: np.ndarray = np.where(taus > 0, np.log(np.where(taus > 0, taus, 1)), 0)
+
+    count: np.ndarray = weights.sum(axis=1)
+    sum_x: np.ndarray = weights @ log_rounds
+    sum_xx: np.ndarray = weights @ log_rounds**2
+    sum_y: np.ndarray = log_taus.sum(axis=1)
+    sum_xy: np.ndarray = log_taus @ log_rounds
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        power: np.ndarray = (count * sum_xy - sum_x * sum_y) / (count * sum_xx - sum_x**2)
+        multiplier: np.ndarray = np.exp((sum_y - power * sum_x) / count)
+
+    return power, multiplier
+
+
+def _levenberg_marquardt(
+    taus: np.ndarray,
+    rounds: np.ndarray,
+    log_rounds: np.ndarray,
+    power: np.ndarray,
+    multiplier: np.ndarray,
+    max_iterations: int,
+    tolerance: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Minimizes the squared residuals of tau = b * round^a for every curve simultaneously.
+
+    Every curve keeps its own damping factor and stops moving once its residuals converge.
+
+    Parameters:
+        taus (np.ndarray): Kendall-tau distances with shape (curves, rounds).
+        rounds (np.ndarray): The round of every point.
+        log_rounds (np.ndarray): The logarithm of every round.
+        power (np.ndarray): The initial exponent of every curve.
+        multiplier (np.ndarray): The initial multiplier of every curve.
+        max_iterations (int): The largest number of iterations.
+        tolerance (float): The relative change of the residuals below which a curve has converged.
+
+    Returns:
+        tuple: The refined exponent and multiplier of every curve.
+    """
+    power = np.where(np.isfinite(power), power, 0.0)
+    multiplier = np.where(np.isfinite(multiplier), multiplier, 1.0)
+    damping: np.ndarray = np.full(len(taus), 1e-3)
+    active: np.ndarray = np.ones(len(taus), dtype=bool)
+
+    def cost(power: np.ndarray, multiplier: np.ndarray) -> np.ndarray:
+        return np.sum((multiplier[:, None] * rounds ** power[:, None] - taus) ** 2, axis=1)
+
+    current_cost: np.ndarray = cost(power, multiplier)
+
+    for _ in range(max_iterations):
+        if not active.any():
+            break
+
+        powered: np.ndarray = rounds ** power[:, None]
+        residuals: np.ndarray = multiplier[:, None] * powered - taus
+        jacobian_power: np.ndarray = multiplier[:, None] * powered * log_rounds
+        jacobian_multiplier: np.ndarray = powered
+
+        # 2x2 normal equations of every curve, solved in closed form
+        jpp: np.ndarray = np.sum(jacobian_power**2, axis=1) * (1 + damping)
+        jmm: np.ndarray = np.sum(jacobian_multiplier**2, axis=1) * (1 + damping)
+        jpm: np.ndarray = np.sum(jacobian_power * jacobian_multiplier, axis=1)
+        gp: np.ndarray = np.sum(jacobian_power * residuals, axis=1)
+        gm: np.ndarray = np.sum(jacobian_multiplier * residuals, axis=1)
+
+        determinant: np.ndarray = jpp * jmm - jpm**2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step_power: np.ndarray = -(jmm * gp - jpm * gm) / determinant
+            step_multiplier: np.ndarray = -(jpp * gm - jpm * gp) / determinant
+
+        valid: np.ndarray = active & np.isfinite(step_power) & np.isfinite(step_multiplier)
+        new_power: np.ndarray = np.where(valid, power + step_power, power)
+        new_multiplier: np.ndarray = np.where(valid, multiplier + step_multiplier, multiplier)
+
+        with np.errstate(over="ignore", invalid="ignore"):
+            new_cost: np.ndarray = cost(new_power, new_multiplier)
+        improved: np.ndarray = valid & (new_cost < current_cost)
+
+        converged: np.ndarray = improved & (current_cost - new_cost <= tolerance * (current_cost + tolerance))
+        power = np.where(improved, new_power, power)
+        multiplier = np.where(improved, new_multiplier, multiplier)
+        current_cost = np.where(improved, new_cost, current_cost)
+
+        damping = np.where(improved, damping / 10, damping * 10)
+        active &= ~converged & (damping < 1e12)
+
+    return power, multiplier
\ No newline at end of file
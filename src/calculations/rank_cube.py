@@ -0,0 +1,333 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from typing import Dict, List, Sequence, Union
+
+from src.calculations.club_registry import ClubRegistry
+from src.calculations.league_table import rank_dtype
+
+
+class RankCube:
+    """
+    A dense cube with the position of every club after every round of many seasons.
+
+    Positions are stored as int8 (int16 for leagues above 127 teams) indexed by
+    (season, team, round), next to a club-ID side table mapping every (season, team) row to a
+    club name. A position of 0 marks a missing value. Cubes are saved as .npy files so they can
+    be memory-mapped and sliced without loading every season into RAM.
+
+    Attributes:
+        ranks (np.ndarray): Positions with shape (seasons, teams, rounds), possibly a np.memmap.
+        club_ids (np.ndarray): int32 IDs with shape (seasons, teams), indexing `club_names`.
+        club_names (list): The name of every club ID.
+        seasons (list): A label for every season, such as its year.
+    """
+
+    RANKS_FILE: str = "ranks.npy"
+    CLUB_IDS_FILE: str = "club_ids.npy"
+    META_FILE: str = "meta.json"
+
+    def __init__(
+        self,
+        ranks: np.ndarray,
+        club_ids: np.ndarray = None,
+        club_names: Sequence = None,
+        seasons: Sequence = None,
+    ):
+        """
+        Initializes the cube from already built arrays.
+
+        Parameters:
+            ranks (np.ndarray): Positions with shape (seasons, teams, rounds).
+            club_ids (np.ndarray, optional): IDs with shape (seasons, teams). If None, every season
+                uses the clubs 0..teams-1, as in simulated leagues.
+            club_names (sequence, optional): The name of every club ID. If None, the IDs themselves.
+            seasons (sequence, optional): A label for every season. If None, 0..seasons-1.
+        """
+        n_seasons, n_teams, _ = ranks.shape
+
+        if club_ids is None:
+            club_ids = np.broadcast_to(np.arange(n_teams, dtype=np.int32), (n_seasons, n_teams))
+
+        self.ranks: np.ndarray = ranks
+        self.club_ids: np.ndarray = club_ids
+        self.club_names: List = (
+            list(club_names) if club_names is not None else list(range(int(club_ids.max(initial=-1)) + 1))
+        )
+        self.seasons: List = list(seasons) if seasons is not None else list(range(n_seasons))
+
+    def __len__(self) -> int:
+        return self.ranks.shape[0]
+
+    @property
+    def n_teams(self) -> int:
+        """The number of teams of every season."""
+        return self.ranks.shape[1]
+
+    @property
+    def n_rounds(self) -> int:
+        """The number of rounds of every season."""
+        return self.ranks.shape[2]
+
+    @classmethod
+    def from_rank_tables(
+        cls, rank_tables: List[pd.DataFrame], seasons: Sequence = None, registry: ClubRegistry = None
+    ) -> "RankCube":
+        """
+        Builds a cube from rank tables such as the ones saved under `rank_tables/`.
+
+        Parameters:
+            rank_tables (list): Rank tables with a "Club" column and one column per matchweek,
+                all with the same number of clubs and matchweeks. Tables written with a registry
+                also have a "ClubID" column.
+            seasons (sequence, optional): A label for every table. If None, 0..len-1.
+            registry (ClubRegistry, optional): The registry the club IDs come from, so cubes of
+                different leagues and runs share them. "ClubID" columns are used as they are and
+                clubs without one are looked up by name. Default is None.
+
+        Returns:
+            RankCube: The cube, with club IDs assigned in order of first appearance if there is
+                no registry, or the registry IDs and names otherwise.
+        """
+        arrays: List[np.ndarray] = [rank_table_to_array(rank_table) for rank_table in rank_tables]
+        if len({array.shape for array in arrays}) > 1:
+            raise ValueError("All rank tables must have the same number of clubs and matchweeks")
+
+        ranks: np.ndarray = np.nan_to_num(np.stack(arrays), nan=0).astype(rank_dtype(arrays[0].shape[0]))
+
+        if registry is not None:
+            club_ids: np.ndarray = np.array(
+                [
+                    rank_table["ClubID"].to_numpy(dtype=np.int32)
+                    if "ClubID" in rank_table.columns
+                    else registry.ids(rank_table["Club"])
+                    for rank_table in rank_tables
+                ],
+                dtype=np.int32,
+            )
+
+            return cls(ranks, club_ids, list(registry.names), seasons)
+
+        club_index: Dict = {}
+        club_ids = np.array(
+            [
+                [club_index.setdefault(club, len(club_index)) for club in rank_table["Club"]]
+                for rank_table in rank_tables
+            ],
+            dtype=np.int32,
+        )
+
+        return cls(ranks, club_ids, list(club_index), seasons)
+
+    @classmethod
+    def create(
+        cls, path: str, n_seasons: int, n_teams: int, n_rounds: int, seasons: Sequence = None
+    ) -> "RankCube":
+        """
+        Creates an on-disk cube of simulated seasons whose ranks are filled in later, chunk by chunk.
+
+        Parameters:
+            path (str): The folder where the cube is saved.
+            n_seasons (int): The number of seasons.
+            n_teams (int): The number of teams of every season.
+            n_rounds (int): The number of rounds of every season.
+            seasons (sequence, optional): A label for every season. If None, 0..n_seasons-1.
+
+        Returns:
+            RankCube: A cube whose `ranks` is a writable np.memmap.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        ranks: np.memmap = np.lib.format.open_memmap(
+            os.path.join(path, cls.RANKS_FILE),
+            mode="w+",
+            dtype=rank_dtype(n_teams),
+            shape=(n_seasons, n_teams, n_rounds),
+        )
+
+        cube: RankCube = cls(ranks, seasons=seasons)
+        cube.__save_side_tables(path)
+
+        return cube
+
+    def save(self, path: str):
+        """
+        Saves the cube to a folder, with the ranks in a .npy file that can be memory-mapped.
+
+        Parameters:
+            path (str): The folder where the cube is saved.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        ranks: np.memmap = np.lib.format.open_memmap(
+            os.path.join(path, self.RANKS_FILE),
+            mode="w+",
+            dtype=self.ranks.dtype,
+            shape=self.ranks.shape,
+        )
+        ranks[:] = self.ranks
+        ranks.flush()
+
+        self.__save_side_tables(path)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = "r") -> "RankCube":
+        """
+        Opens a saved cube. By default the ranks are memory-mapped and only read when sliced.
+
+        Parameters:
+            path (str): The folder where the cube was saved.
+            mmap_mode (str, optional): The mode passed to `np.load`, or None to load the ranks into
+                memory. Default is "r".
+
+        Returns:
+            RankCube: The loaded cube.
+        """
+        ranks: np.ndarray = np.load(os.path.join(path, cls.RANKS_FILE), mmap_mode=mmap_mode)
+        club_ids: np.ndarray = np.load(os.path.join(path, cls.CLUB_IDS_FILE))
+
+        with open(os.path.join(path, cls.META_FILE), encoding="utf-8") as meta_file:
+            meta: Dict = json.load(meta_file)
+
+        return cls(ranks, club_ids, meta["club_names"], meta["seasons"])
+
+    def club_history(self, club_id: int) -> np.ndarray:
+        """
+        Returns the positions of one club in every season of the cube.
+
+        Parameters:
+            club_id (int): The club ID.
+
+        Returns:
+            np.ndarray: Positions with shape (seasons, rounds), 0 in the seasons the club did not play.
+        """
+        seasons, teams = np.nonzero(np.asarray(self.club_ids) == club_id)
+
+        history: np.ndarray = np.zeros((len(self), self.n_rounds), dtype=self.ranks.dtype)
+        history[seasons] = self.ranks[seasons, teams]
+
+        return history
+
+    def mean_position_by_club(self, round_index: int = -1) -> np.ndarray:
+        """
+        Averages the position of every club at one round over the seasons it played.
+
+        Parameters:
+            round_index (int, optional): The index of the round. Default is -1, the final round.
+
+        Returns:
+            np.ndarray: The mean position of every club ID, NaN for clubs without seasons in the cube.
+        """
+        club_ids: np.ndarray = np.asarray(self.club_ids).ravel()
+        positions: np.ndarray = np.asarray(self.ranks[:, :, round_index], dtype=np.float64).ravel()
+        played: np.ndarray = positions > 0
+
+        totals: np.ndarray = np.bincount(club_ids[played], positions[played], minlength=len(self.club_names))
+        seasons: np.ndarray = np.bincount(club_ids[played], minlength=len(self.club_names))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return totals / seasons
+
+    def to_rank_table(self, season: int) -> pd.DataFrame:
+        """
+        Converts one season back into the rank table format used by the analysis.
+
+        Parameters:
+            season (int): The index of the season in the cube.
+
+        Returns:
+            pd.DataFrame: A dataframe with one column per matchweek ("1", "2", ...) and a "Club" column.
+        """
+        rank_table_df: pd.DataFrame = pd.DataFrame(
+            np.asarray(self.ranks[season], dtype=np.int64),
+            columns=[f"{i}" for i in range(1, self.n_rounds + 1)],
+        )
+        rank_table_df["Club"] = [self.club_names[club_id] for club_id in self.club_ids[season]]
+
+        return rank_table_df
+
+    def __save_side_tables(self, path: str):
+        """
+        Saves the club IDs and the metadata of the cube.
+
+        Parameters:
+            path (str): The folder where the cube is saved.
+        """
+        np.save(os.path.join(path, self.CLUB_IDS_FILE), np.ascontiguousarray(self.club_ids))
+
+        with open(os.path.join(path, self.META_FILE), "w", encoding="utf-8") as meta_file:
+            json.dump(
+                {
+                    "club_names": [_to_json(name) for name in self.club_names],
+                    "seasons": [_to_json(season) for season in self.seasons],
+                },
+                meta_file,
+                ensure_ascii=False,
+            )
+
+
+def as_rank_tensor(
+    rank_tables: Union[RankCube, np.ndarray, List[pd.DataFrame]], allow_missing: bool = False, chunk_size: int = 4096
+) -> np.ndarray:
+    """
+    Returns the (seasons, teams, rounds) positions of any of the rank formats used by the analysis.
+
+    A position of 0 marks a club missing from a cube. Correlations would take it as a real
+    position, so cubes and tensors with zeros are rejected unless `allow_missing` is set by a
+    caller that leaves them out, like the transition tables.
+
+    Parameters:
+        rank_tables (RankCube, np.ndarray or list): A cube, a rank tensor or a list of rank tables
+            with the same number of clubs and matchweeks.
+        allow_missing (bool, optional): Whether positions equal to 0 are accepted. Default is False.
+        chunk_size (int, optional): The number of seasons checked at once, so memory-mapped cubes
+            are never fully loaded. Default is 4096.
+
+    Returns:
+        np.ndarray: The positions, without copying cubes and tensors.
+
+    Raises:
+        ValueError: If a position is 0 and `allow_missing` is False.
+    """
+    if isinstance(rank_tables, RankCube):
+        ranks: np.ndarray = rank_tables.ranks
+    elif isinstance(rank_tables, np.ndarray):
+        ranks = rank_tables
+    else:
+        return np.stack([rank_table_to_array(rank_table) for rank_table in rank_tables])
+
+    if not allow_missing:
+        for start in range(0, len(ranks), chunk_size):
+            if (ranks[start : start + chunk_size] == 0).any():
+                raise ValueError("The ranks have missing positions (0), which correlations cannot use")
+
+    return ranks
+
+
+def rank_table_to_array(rank_table: pd.DataFrame) -> np.ndarray:
+    """
+    Extracts the matchweek columns of a rank table as an array of positions.
+
+    Parameters:
+        rank_table (pd.DataFrame): The table containing the rankings of teams over different matchweeks,
+            with one column per matchweek named "1", "2", ... (or the matching integers).
+
+    Returns:
+        np.ndarray: Float positions with shape (teams, rounds), in matchweek order.
+    """
+    matchweek_columns: List = sorted(
+        (column for column in rank_table.columns if str(column).isdigit()),
+        key=lambda column: int(column),
+    )
+
+    return rank_table[matchweek_columns].to_numpy(dtype=np.float64)
+
+
+def _to_json(value):
+    """
+    Converts NumPy scalars into plain Python values so they can be written as JSON.
+    """
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,75 @@
+import numpy as np
+
+from typing import Sequence, Tuple, Union
+
+from src.calculations.fixtures import fixture_arrays
+from src.calculations.league_table import LeagueTable
+from src.calculations.team_strength import TeamStrengths
+from src.instrumentation import instrument
+
+
+@instrument()
+def simulate_seasons(
+    poisson_mean: float,
+    n_teams: int = 20,
+    n_seasons: int = 1,
+    random_seed: int = 42,
+    fixtures: Tuple[np.ndarray, np.ndarray] = None,
+    tie_break: Union[str, Sequence[str]] = "premier_league",
+    strengths: TeamStrengths = None,
+) -> np.ndarray:
+    """
+    Simulates several seasons at once and returns the position of every club after each matchweek.
+
+    All goals are drawn with a single Poisson call and the standings are built with cumulative
+    sums over the fixture index arrays, so no Python code runs per match or per matchweek.
+    With `strengths`, the Poisson means of every match are gathered from the fixture arrays
+    once and broadcast over the seasons, so heterogeneous leagues run at the same speed.
+
+    Parameters:
+        poisson_mean (float): The mean of the Poisson distribution for simulating match goals.
+        n_teams (int, optional): The number of teams in the league. Default is 20.
+        n_seasons (int, optional): The number of seasons to simulate. Default is 1.
+        random_seed (int or np.random.SeedSequence, optional): The seed for the random number
+            generator. Default is 42.
+        fixtures (tuple, optional): Home and away index arrays with shape (rounds, n_teams // 2)
+            in which every team plays once per round. If None, `fixture_arrays(n_teams)` is used.
+        tie_break (str or sequence of str, optional): The ranking criteria, a key of
+            `TIE_BREAK_RULES` or a sequence of columns. Default is "premier_league".
+        strengths (TeamStrengths, optional): Per-club attack, defence and home advantage. If given,
+            it replaces `poisson_mean` and its number of clubs must be `n_teams`. Default is None.
+
+    Returns:
+        np.ndarray: A rank tensor with shape (n_seasons, n_teams, rounds), where entry
+            [season, club, round] is the position of the club after that round.
+    """
+    home, away = fixture_arrays(n_teams) if fixtures is None else fixtures
+    n_rounds, n_matches = home.shape
+
+    if strengths is not None:
+        if strengths.n_teams != n_teams:
+            raise ValueError(f"strengths has {strengths.n_teams} clubs, expected {n_teams}")
+        poisson_mean = strengths.match_rates(home, away)
+
+    rng: np.random.Generator = np.random.default_rng(random_seed)
+    goals: np.ndarray = rng.poisson(
+        poisson_mean, size=(n_seasons, n_rounds, n_matches, 2)
+    ).astype(np.int32)
+    home_goals: np.ndarray = goals[..., 0]
+    away_goals: np.ndarray = goals[..., 1]
+
+    # Every club plays exactly once per round, so a scatter by fixture index is enough
+    rounds: np.ndarray = np.arange(n_rounds)[:, None]
+    goals_for: np.ndarray = np.empty((n_seasons, n_rounds, n_teams), dtype=np.int32)
+    goals_against: np.ndarray = np.empty((n_seasons, n_rounds, n_teams), dtype=np.int32)
+
+    goals_for[:, rounds, home] = home_goals
+    goals_for[:, rounds, away] = away_goals
+    goals_against[:, rounds, home] = away_goals
+    goals_against[:, rounds, away] = home_goals
+
+    table: LeagueTable = LeagueTable.from_round_goals(
+        goals_for, goals_against, tie_break=tie_break
+    )
+
+    return np.ascontiguousarray(table.positions().transpose(0, 2, 1))
@@ -1,7 +1,13 @@
 import numpy as np
 import pandas as pd
 
-from typing import List, Tuple
+from typing import List, Sequence, Tuple, Union
+
+from src.calculations.fixtures import fixture_arrays
+from src.calculations.league_table import LeagueTable
+from src.calculations.simulation import simulate_seasons
+from src.calculations.team_strength import TeamStrengths
+from src.instrumentation import instrument
 
 def init_standings(n_teams: int = 20, random_seed: int = 42):
     np.random.seed(random_seed)
@@ -59,15 +65,15 @@ def update_table(standings: pd.DataFrame, match: Tuple[int, int], goals_a: int,
 
     return standings
 
-def set_table_positions(standings: pd.DataFrame):
-    standings = standings.sort_values(by=["Pts", "SG", "+"], ascending=False)
-    position = 1
-    for _, row in standings.iterrows():
-        row["Position"] = position
-        position += 1
+@instrument()
+def set_table_positions(standings: pd.DataFrame, tie_break: Union[str, Sequence[str]] = "premier_league"):
+    table: LeagueTable = LeagueTable.from_standings(standings, tie_break=tie_break)
 
-    return standings
+    standings = standings.assign(Position=table.positions().astype(np.int64))
 
+    return standings.sort_values(by="Position")
+
+@instrument()
 def update_rank_table(rank_table_df: pd.DataFrame, standings:pd.DataFrame, matchweek: int):
     if matchweek == 0:
         clubs: pd.Series = standings["Club"]
@@ -75,20 +81,17 @@ def update_rank_table(rank_table_df: pd.DataFrame, standings:pd.DataFrame, match
             rank_table_df.at[index, "Club"] = int(club)
             rank_table_df.at[index, f"{matchweek + 1}"] = index + 1
     else:
-        for index, row in standings.iterrows():
-            club: str = row["Club"]
+        club_rows: pd.Series = pd.Series(rank_table_df.index, index=rank_table_df["Club"])
+        rows: np.ndarray = club_rows.loc[standings["Club"].to_numpy()].to_numpy()
 
-            club_index: int = rank_table_df[rank_table_df["Club"] == club].index
-            club_index = club_index.item()
-            rank_table_df.at[club_index, f"{matchweek + 1}"] = int(
-                row["Position"]
-            )
+        rank_table_df.loc[rows, f"{matchweek + 1}"] = standings["Position"].to_numpy(dtype=np.int64)
 
     return rank_table_df, standings
 
 
+@instrument()
 def generate_table(
-    poisson_mean: float, n_teams: int = 20, random_seed: int = 42
+    poisson_mean: float, n_teams: int = 20, random_seed: int = 42, strengths: TeamStrengths = None
 ) -> pd.DataFrame:
     """
     Generates a table of football standings by simulating match results over a season.
@@ -97,26 +100,37 @@ def generate_table(
         poisson_mean (float): The mean of the Poisson distribution for simulating match goals.
         n_teams (int, optional): The number of teams in the league. Default is 20.
         random_seed (int, optional): The seed for the random number generator. Default is 42.
+        strengths (TeamStrengths, optional): Per-club attack, defence and home advantage, replacing
+            `poisson_mean`. Default is None.
 
     Returns:
         pd.DataFrame: A dataframe containing the standings with the club positions after each matchweek.
     """
 
-    rank_table_df, standings = init_standings(n_teams, random_seed)
+    rank_tensor: np.ndarray = simulate_seasons(
+        poisson_mean, n_teams=n_teams, n_seasons=1, random_seed=random_seed, strengths=strengths
+    )
+
+    return rank_tensor_to_table(rank_tensor[0])
 
-    fixtures: List[List[Tuple[int, int]]] = generate_matchweeks(n_teams)
 
-    for matchweek_i, matchweek in enumerate(fixtures):
-        for match in matchweek:
-            goals_a, goals_b = simulate_match(poisson_mean)
+def rank_tensor_to_table(season_ranks: np.ndarray) -> pd.DataFrame:
+    """
+    Converts one season of a rank tensor into the rank table format used by the analysis.
 
-            standings = update_goals_from_match(standings, match, goals_a, goals_b)
-            standings = update_table(standings, match, goals_a, goals_b)
+    Parameters:
+        season_ranks (np.ndarray): Positions with shape (n_teams, rounds).
 
-        standings = set_table_positions(standings)
+    Returns:
+        pd.DataFrame: A dataframe with one column per matchweek ("1", "2", ...) and a "Club" column.
+    """
 
-        rank_table_df, standings = update_rank_table(rank_table_df, standings, matchweek_i)
+    n_teams, n_rounds = season_ranks.shape
 
+    rank_table_df: pd.DataFrame = pd.DataFrame(
+        season_ranks.astype(np.int64), columns=[f"{i}" for i in range(1, n_rounds + 1)]
+    )
+    rank_table_df["Club"] = np.arange(n_teams)
 
     return rank_table_df
 
@@ -152,32 +166,10 @@ def generate_matchweeks(n_teams: int = 20) -> List[List[Tuple[int, int]]]:
         Exception: If the number of teams is odd, an exception will be raised.
     """
 
-    if n_teams % 2 == 1:
-        raise Exception("Number of teams must be even")
-
-    teams: List[int] = list(range(0, n_teams))
-    anchor: int = teams[0]
-    rotating_teams: List = teams[1:]
-
-    first_legs: List[Tuple[int]] = []
-    for _ in range(n_teams - 1):
-        round_matches: List = []
-        for j in range(len(rotating_teams) // 2):
-            home: int = rotating_teams[j]
-            away: int = rotating_teams[-(j + 1)]
-            round_matches.append((home, away))
-
-        round_matches.append((anchor, rotating_teams[len(rotating_teams) // 2]))
-
-        first_legs.append(round_matches)
-
-        rotating_teams = [rotating_teams[-1]] + rotating_teams[:-1]
-
-    second_legs: List[Tuple[int]] = []
-    for round in first_legs:
-        new_round: List[Tuple[int]] = [(match[1], match[0]) for match in round]
-        second_legs.append(new_round)
+    home, away = fixture_arrays(n_teams)
 
-    rounds = first_legs + second_legs
+    rounds: List[List[Tuple[int, int]]] = [
+        list(zip(round_home, round_away)) for round_home, round_away in zip(home.tolist(), away.tolist())
+    ]
 
     return rounds
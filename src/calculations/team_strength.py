@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+from typing import Sequence
+
+from src.calculations.league_table import LeagueTable
+
+# The goals per club and match of the uniform model, used when a table has no goals to fit
+DEFAULT_GOALS_PER_MATCH: float = 1.325
+
+
+class TeamStrengths:
+    """
+    Per-club attack and defence multipliers of a Poisson match model with home advantage.
+
+    In a match between home club h and away club a, the goals are Poisson distributed with means
+
+        home: base_rate * attack[h] * defence[a] * home_advantage
+        away: base_rate * attack[a] * defence[h]
+
+    so an attack above 1 scores more than the average club and a defence above 1 concedes more.
+    With every multiplier equal to 1 the model is the uniform league of `simulate_match`.
+
+    Attributes:
+        attack (np.ndarray): The attack multiplier of every club, with mean 1.
+        defence (np.ndarray): The defence multiplier of every club, with mean 1.
+        home_advantage (float): The multiplier of the home club's scoring rate.
+        base_rate (float): The goals per match of an average club away from home.
+        clubs (list): The club names, in the order of the multipliers.
+    """
+
+    def __init__(
+        self,
+        attack: Sequence[float],
+        defence: Sequence[float],
+        home_advantage: float = 1.0,
+        base_rate: float = 1.325,
+        clubs: Sequence = None,
+    ):
+        """
+        Initializes the model from already known parameters.
+
+        Parameters:
+            attack (sequence): The attack multiplier of every club.
+            defence (sequence): The defence multiplier of every club.
+            home_advantage (float, optional): The multiplier of the home club's scoring rate. Default is 1.0.
+            base_rate (float, optional): The goals per match of an average club away from home. Default is 1.325.
+            clubs (sequence, optional): The club names. If None, the club indexes.
+        """
+        self.attack: np.ndarray = np.asarray(attack, dtype=np.float64)
+        self.defence: np.ndarray = np.asarray(defence, dtype=np.float64)
+        if self.attack.shape != self.defence.shape or self.attack.ndim != 1:
+            raise ValueError("attack and defence must be 1-D arrays with one value per club")
+
+        self.home_advantage: float = float(home_advantage)
+        self.base_rate: float = float(base_rate)
+        self.clubs: list = list(clubs) if clubs is not None else list(range(len(self.attack)))
+
+    @property
+    def n_teams(self) -> int:
+        """The number of clubs of the model."""
+        return len(self.attack)
+
+    @classmethod
+    def uniform(cls, n_teams: int = 20, poisson_mean: float = 1.325) -> "TeamStrengths":
+        """
+        Builds the model of a league of identical clubs, equivalent to a single `poisson_mean`.
+
+        Parameters:
+            n_teams (int, optional): The number of clubs. Default is 20.
+            poisson_mean (float, optional): The goals per match of every club. Default is 1.325.
+
+        Returns:
+            TeamStrengths: The uniform model.
+        """
+        return cls(np.ones(n_teams), np.ones(n_teams), 1.0, poisson_mean)
+
+    @classmethod
+    def from_standings(
+        cls, standings: pd.DataFrame, home_advantage: float = 1.0, prior_matches: float = 1.0
+    ) -> "TeamStrengths":
+        """
+        Fits attack and defence multipliers from the goals for and against of a standings table.
+
+        In a double round robin every club meets every opponent home and away, so the scoring and
+        conceding rates relative to the league average are the maximum-likelihood multipliers up
+        to the schedule of a partial season. Standings have no home/away split, so the home
+        advantage has to be given; the base rate is adjusted so the league keeps its goals per match.
+
+        Every club is also credited with `prior_matches` matches at the league average, which
+        shrinks the multipliers toward 1. Early in a season a club that has not scored (or
+        conceded) yet still gets a positive multiplier, and a club without matches gets 1. With
+        no goals in the whole table, the league rate falls back to `DEFAULT_GOALS_PER_MATCH`.
+
+        Parameters:
+            standings (pd.DataFrame): One row per club, in any format read by `LeagueTable.from_standings`,
+                so scraped and simulated standings both work.
+            home_advantage (float, optional): The multiplier of the home club's scoring rate. Default is 1.0.
+            prior_matches (float, optional): The average matches added to every club. 0 gives the
+                plain maximum-likelihood fit, with zero or undefined multipliers for clubs without
+                goals or matches. Default is 1.0.
+
+        Returns:
+            TeamStrengths: The fitted model, with the clubs of the "Club" column if there is one.
+        """
+        table: LeagueTable = LeagueTable.from_standings(standings)
+        goals_for: np.ndarray = table.stats["+"].astype(np.float64)
+        goals_against: np.ndarray = table.stats["-"].astype(np.float64)
+        matches: np.ndarray = table.stats["Matches"].astype(np.float64)
+
+        goals_per_match: float = goals_for.sum() / matches.sum() if goals_for.sum() > 0 else DEFAULT_GOALS_PER_MATCH
+        prior_goals: float = prior_matches * goals_per_match
+        attack: np.ndarray = (goals_for + prior_goals) / ((matches + prior_matches) * goals_per_match)
+        defence: np.ndarray = (goals_against + prior_goals) / ((matches + prior_matches) * goals_per_match)
+
+        # Half of the matches are at home, so the average rate is base * (1 + home_advantage) / 2
+        base_rate: float = 2 * goals_per_match / (1 + home_advantage)
+        clubs = standings["Club"].tolist() if "Club" in standings.columns else None
+
+        return cls(attack, defence, home_advantage, base_rate, clubs)
+
+    @classmethod
+    def from_results(
+        cls,
+        results: pd.DataFrame,
+        max_iterations: int = 200,
+        tolerance: float = 1e-10,
+        prior_matches: float = 1.0,
+    ) -> "TeamStrengths":
+        """
+        Fits every parameter, home advantage included, from match results by maximum likelihood.
+
+        The Poisson likelihood of a multiplicative model is maximized by iterative proportional
+        fitting: every parameter is rescaled in turn so the expected goals match the observed ones,
+        with one `np.bincount` per parameter group and no Python loop over matches.
+
+        As in `from_standings`, every club is credited with `prior_matches` matches at the league
+        average (a gamma prior with mean 1 on every multiplier), so a club that never scored or
+        never conceded keeps a positive multiplier.
+
+        Parameters:
+            results (pd.DataFrame): One row per match with "Home", "Away", "HomeGoals" and
+                "AwayGoals" columns, as returned by `read_results_csv` or `parse_fixtures_html`.
+            max_iterations (int, optional): The largest number of fitting sweeps. Default is 200.
+            tolerance (float, optional): The largest relative parameter change at convergence. Default is 1e-10.
+            prior_matches (float, optional): The average matches added to every club, 0 for the plain
+                maximum-likelihood fit. Default is 1.0.
+
+        Returns:
+            TeamStrengths: The fitted model, with the clubs sorted by name.
+        """
+        clubs, club_index = np.unique(
+            np.concatenate([results["Home"].to_numpy(dtype=str), results["Away"].to_numpy(dtype=str)]),
+            return_inverse=True,
+        )
+        home, away = np.split(club_index, 2)
+        home_goals: np.ndarray = results["HomeGoals"].to_numpy(dtype=np.float64)
+        away_goals: np.ndarray = results["AwayGoals"].to_numpy(dtype=np.float64)
+        n_teams: int = len(clubs)
+
+        scored: np.ndarray = np.bincount(home, home_goals, n_teams) + np.bincount(away, away_goals, n_teams)
+        conceded: np.ndarray = np.bincount(home, away_goals, n_teams) + np.bincount(away, home_goals, n_teams)
+
+        attack: np.ndarray = np.ones(n_teams)
+        defence: np.ndarray = np.ones(n_teams)
+        home_advantage: float = 1.0
+        base_rate: float = (home_goals.sum() + away_goals.sum()) / (2 * len(results))
+        if base_rate == 0:
+            base_rate = DEFAULT_GOALS_PER_MATCH
+        prior_goals: float = prior_matches * base_rate
+
+        for _ in range(max_iterations):
+            previous: np.ndarray = np.concatenate([attack, defence, [home_advantage, base_rate]])
+
+            home_factor: float = base_rate * home_advantage
+            attack = (scored + prior_goals) / (
+                np.bincount(home, home_factor * defence[away], n_teams)
+                + np.bincount(away, base_rate * defence[home], n_teams)
+                + prior_goals
+            )
+            defence = (conceded + prior_goals) / (
+                np.bincount(away, home_factor * attack[home], n_teams)
+                + np.bincount(home, base_rate * attack[away], n_teams)
+                + prior_goals
+            )
+            home_advantage = home_goals.sum() / np.sum(base_rate * attack[home] * defence[away])
+
+            # Only products matter, so the multipliers are kept with mean 1 and the scale goes to the base rate
+            scale: float = attack.mean() * defence.mean()
+            base_rate *= scale
+            attack /= attack.mean()
+            defence /= defence.mean()
+
+            current: np.ndarray = np.concatenate([attack, defence, [home_advantage, base_rate]])
+            if np.max(np.abs(current - previous) / np.abs(current)) < tolerance:
+                break
+
+        return cls(attack, defence, home_advantage, base_rate, clubs.tolist())
+
+    def match_rates(self, home: np.ndarray, away: np.ndarray) -> np.ndarray:
+        """
+        Computes the Poisson means of every match of a fixture list.
+
+        Parameters:
+            home (np.ndarray): Index of the home club of every match, with any shape.
+            away (np.ndarray): Index of the away club of every match, with the same shape.
+
+        Returns:
+            np.ndarray: The home and away means, with shape (*home.shape, 2).
+        """
+        home_rate: np.ndarray = self.base_rate * self.home_advantage * self.attack[home] * self.defence[away]
+        away_rate: np.ndarray = self.base_rate * self.attack[away] * self.defence[home]
+
+        return np.stack([home_rate, away_rate], axis=-1)
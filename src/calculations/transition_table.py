@@ -1,7 +1,17 @@
+import hashlib
+import os
+
+import numpy as np
 import pandas as pd
 
+from typing import Dict, List, Tuple, Union
+
+from src.calculations.rank_cube import RankCube, as_rank_tensor, rank_table_to_array
+from src.instrumentation import instrument
+
 ### FAZER EXEMPLO NA MÃO PRA CONFERIR RESULTADOS!!!
 
+@instrument()
 def calculate_transitions_year(
     rank_table_df: pd.DataFrame,
     transition_table_df: pd.DataFrame,
@@ -18,17 +28,172 @@ def calculate_transitions_year(
     return transition_table_df
 
 
+@instrument()
 def calculate_transitions_history(
-    rank_tables_list: list, init_round: int = 10, final_round: int = 38
+    rank_tables_list: Union[list, RankCube],
+    init_round: int = 10,
+    final_round: int = 38,
+    cache_folder: str = None,
 ):
-    transition_table_df: pd.DataFrame = pd.DataFrame(
-        0, columns=[i for i in range(1, 21)], index=[i for i in range(1, 21)]
+    if not isinstance(rank_tables_list, (RankCube, np.ndarray)):
+        rank_tables_list = RankCube.from_rank_tables(rank_tables_list)
+
+    if cache_folder is None:
+        return calculate_transitions_cube(rank_tables_list, init_round, final_round)
+
+    ranks: np.ndarray = as_rank_tensor(rank_tables_list, allow_missing=True)
+    transitions: np.ndarray = cached_transition_tensor(ranks, cache_folder)
+
+    return transition_table_from_tensor(transitions, init_round, final_round, len(ranks))
+
+
+@instrument()
+def calculate_transitions_cube(
+    rank_cube: Union[RankCube, np.ndarray], init_round: int = 10, final_round: int = 38
+) -> pd.DataFrame:
+    """
+    Computes the average transition table between two rounds of a rank cube with one bincount.
+
+    Parameters:
+        rank_cube (RankCube or np.ndarray): Positions with shape (seasons, teams, rounds).
+        init_round (int, optional): The round the transitions start from. Default is 10.
+        final_round (int, optional): The round the transitions end at. Default is 38.
+
+    Returns:
+        pd.DataFrame: A (teams x teams) table where entry [i, j] is the average number of clubs per
+            season that went from position i at `init_round` to position j at `final_round`.
+    """
+    ranks: np.ndarray = as_rank_tensor(rank_cube, allow_missing=True)
+    n_seasons, n_teams, _ = ranks.shape
+
+    init_positions: np.ndarray = ranks[:, :, init_round - 1].astype(np.intp).ravel()
+    final_positions: np.ndarray = ranks[:, :, final_round - 1].astype(np.intp).ravel()
+
+    counts: np.ndarray = np.bincount(
+        init_positions * (n_teams + 1) + final_positions, minlength=(n_teams + 1) ** 2
+    ).reshape(n_teams + 1, n_teams + 1)
+
+    return pd.DataFrame(
+        counts[1:, 1:] / n_seasons,
+        columns=[i for i in range(1, n_teams + 1)],
+        index=[i for i in range(1, n_teams + 1)],
     )
 
+
+@instrument()
+def transition_tensor(rank_cube: Union[RankCube, np.ndarray], chunk_size: int = 64) -> np.ndarray:
+    """
+    Counts the transitions between every pair of rounds of a rank cube in one vectorized pass.
+
+    Every (season, club) row is encoded as its (round, position) cells, and the counts for all
+    round pairs are one integer bincount over the pairs of cells of every row, accumulated over
+    chunks of seasons.
+
+    Parameters:
+        rank_cube (RankCube or np.ndarray): Positions with shape (seasons, teams, rounds).
+            Positions equal to 0 are treated as missing and not counted.
+        chunk_size (int, optional): The number of seasons encoded at once. Default is 64.
+
+    Returns:
+        np.ndarray: int64 counts with shape (rounds, rounds, teams, teams), where entry
+            [r1, r2, i, j] is the number of clubs at position i + 1 after round r1 + 1 and at
+            position j + 1 after round r2 + 1.
+    """
+    ranks: np.ndarray = as_rank_tensor(rank_cube, allow_missing=True)
+    n_seasons, n_teams, n_rounds = ranks.shape
+    n_cells: int = n_rounds * n_teams
+
+    counts: np.ndarray = np.zeros(n_cells**2, dtype=np.int64)
+    columns: np.ndarray = np.arange(n_rounds) * n_teams
+
+    for start in range(0, n_seasons, chunk_size):
+        chunk: np.ndarray = np.asarray(ranks[start : start + chunk_size], dtype=np.int64).reshape(-1, n_rounds)
+
+        cells: np.ndarray = columns + chunk - 1
+        pairs: np.ndarray = cells[:, :, None] * n_cells + cells[:, None, :]
+
+        present: np.ndarray = chunk > 0
+        if not present.all():
+            pairs = pairs[present[:, :, None] & present[:, None, :]]
+
+        counts += np.bincount(pairs.ravel(), minlength=n_cells**2)
+
+    return counts.reshape(n_rounds, n_teams, n_rounds, n_teams).transpose(0, 2, 1, 3)
+
+
+def transition_tensors(rank_tables_list: list) -> Dict[Tuple[int, int], Tuple[np.ndarray, int]]:
+    """
+    Computes the transition tensors of leagues with different sizes, one tensor per size.
+
+    Parameters:
+        rank_tables_list (list): Rank tables, possibly with different numbers of clubs or matchweeks.
+
+    Returns:
+        dict: For every (teams, rounds) shape, the transition tensor and the number of seasons.
+    """
+    tables_by_shape: Dict[Tuple[int, int], List[pd.DataFrame]] = {}
     for rank_table_df in rank_tables_list:
-        transition_table_df = calculate_transitions_year(rank_table_df, transition_table_df, init_round, final_round)
+        tables_by_shape.setdefault(rank_table_to_array(rank_table_df).shape, []).append(rank_table_df)
 
-    transition_table_df = transition_table_df.apply(lambda x: x / len(rank_tables_list))
-    
-    return transition_table_df
+    return {
+        shape: (transition_tensor(RankCube.from_rank_tables(tables)), len(tables))
+        for shape, tables in tables_by_shape.items()
+    }
+
+
+@instrument()
+def cached_transition_tensor(rank_cube: Union[RankCube, np.ndarray], cache_folder: str) -> np.ndarray:
+    """
+    Returns the transition tensor of a rank cube, computing it only if it is not cached on disk yet.
+
+    The cache key is a hash of the ranks, so any change in the data produces a new entry.
+
+    Parameters:
+        rank_cube (RankCube or np.ndarray): Positions with shape (seasons, teams, rounds).
+        cache_folder (str): The folder where tensors are cached.
 
+    Returns:
+        np.ndarray: The transition tensor, memory-mapped from the cache.
+    """
+    ranks: np.ndarray = as_rank_tensor(rank_cube, allow_missing=True)
+
+    digest = hashlib.sha1(str((ranks.shape, ranks.dtype.str)).encode())
+    for start in range(0, len(ranks), 4096):
+        digest.update(np.ascontiguousarray(ranks[start : start + 4096]).tobytes())
+
+    cache_path: str = os.path.join(cache_folder, f"transitions_{digest.hexdigest()}.npy")
+
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_folder, exist_ok=True)
+
+        # Written under a temporary name so an interrupted run never leaves a truncated entry
+        temporary_path: str = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as cache_file:
+            np.save(cache_file, transition_tensor(ranks))
+        os.replace(temporary_path, cache_path)
+
+    return np.load(cache_path, mmap_mode="r")
+
+
+def transition_table_from_tensor(
+    transitions: np.ndarray, init_round: int = 10, final_round: int = 38, n_seasons: int = 1
+) -> pd.DataFrame:
+    """
+    Extracts the average transition table between two rounds from a transition tensor.
+
+    Parameters:
+        transitions (np.ndarray): Counts with shape (rounds, rounds, teams, teams).
+        init_round (int, optional): The round the transitions start from. Default is 10.
+        final_round (int, optional): The round the transitions end at. Default is 38.
+        n_seasons (int, optional): The number of seasons the counts are averaged over. Default is 1.
+
+    Returns:
+        pd.DataFrame: The same table as `calculate_transitions_history`.
+    """
+    n_teams: int = transitions.shape[-1]
+
+    return pd.DataFrame(
+        transitions[init_round - 1, final_round - 1] / n_seasons,
+        columns=[i for i in range(1, n_teams + 1)],
+        index=[i for i in range(1, n_teams + 1)],
+    )
@@ -1,36 +1,37 @@
-import os
-import sys
-
+import numpy as np
 import pandas as pd
 
-from typing import List, Tuple
-
-project_path = os.path.abspath(os.path.join(os.getcwd(), ".."))
-sys.path.append(project_path)
+from typing import Dict, List, Tuple, Union
 
-from src.calculations.corr import spearman_corr, normalized_tau_distance  # noqa: E402
-from src.calculations.table_generation import generate_table  # noqa: E402
+from src.calculations.corr import spearman_corr, normalized_tau_distance, round_agreement_batch, spearman_tau_batch
+from src.calculations.accumulator import CurveAccumulator
+from src.calculations.rank_cube import RankCube, as_rank_tensor, rank_table_to_array
+from src.calculations.monte_carlo import iterate_spearman_tau_chunks, simulate_until_converged
+from src.calculations.team_strength import TeamStrengths
+from src.instrumentation import instrument
 
 
 def get_plot_points(year_table: pd.DataFrame, matchweek: int, plot_points_corr: List[float], plot_points_tau: List[float]):
-    rho, _ = spearman_corr(year_table[f"{matchweek}"].to_list(), year_table["38"].to_list())
+    rho, _ = spearman_corr(year_table[f"{matchweek}"].to_list(), year_table["38"].to_list(), p_value=None)
     plot_points_corr.append(rho)
 
     norm_tau_distance: float = normalized_tau_distance(
-        year_table[f"{matchweek}"].to_list(), year_table["38"].to_list()
+        year_table[f"{matchweek}"].to_list(), year_table["38"].to_list(), p_value=False
     )
     plot_points_tau.append(norm_tau_distance)
 
     return plot_points_corr, plot_points_tau
 
+@instrument()
 def spearman_tau_table(
-    year_table: pd.DataFrame, return_as_list: bool = False
+    year_table: Union[pd.DataFrame, np.ndarray], return_as_list: bool = False
 ) -> pd.DataFrame:
     """
     Computes the Spearman correlation and normalized Kendall-tau distance for a given season's rankings.
 
     Parameters:
-        year_table (pd.DataFrame): The table containing the rankings of teams over different matchweeks.
+        year_table (pd.DataFrame or np.ndarray): The table containing the rankings of teams over different
+            matchweeks, or one season of a rank cube with shape (teams, rounds).
         return_as_list (bool, optional): If True, returns the results as lists;
             otherwise, returns them as a DataFrame. Default is False.
 
@@ -39,95 +40,268 @@ def spearman_tau_table(
             or as separate lists, based on the `return_as_list` flag.
     """
 
-    plot_points_corr: List[float] = []
-    plot_points_tau: List[float] = []
+    season_ranks: np.ndarray = (
+        year_table if isinstance(year_table, np.ndarray) else rank_table_to_array(year_table)
+    )
+    rho, tau = spearman_tau_batch(season_ranks[None])
 
-    for i in range(1, 39):
-        plot_points_corr, plot_points_tau = get_plot_points(year_table, i, plot_points_corr, plot_points_tau)
+    plot_points_corr: List[float] = rho[0].tolist()
+    plot_points_tau: List[float] = tau[0].tolist()
 
     if return_as_list:
         return plot_points_corr, plot_points_tau
 
     table_df: pd.DataFrame = pd.DataFrame(
         [plot_points_corr, plot_points_tau],
-        columns=[i for i in range(1, 39)],
+        columns=[i for i in range(1, len(plot_points_corr) + 1)],
         index=["Spearman", "Tau"],
     )
 
     return table_df
 
 
-def generate_spearman_tau(num_seasons: int = 22) -> Tuple[List[float], List[float]]:
+def generate_spearman_tau(
+    num_seasons: int = 22,
+    poisson_mean: float = 1.325,
+    n_teams: int = 20,
+    random_seed: int = 1,
+    n_workers: int = 1,
+    chunk_size: int = 1024,
+    strengths: TeamStrengths = None,
+) -> Tuple[List[float], List[float]]:
     """
     Generates the average Spearman correlation and normalized Kendall-tau distance over a number of seasons.
 
     Parameters:
         num_seasons (int, optional): The number of seasons to simulate. Default is 22.
+        poisson_mean (float, optional): The mean of the Poisson distribution for simulating match goals.
+            Default is 1.325.
+        n_teams (int, optional): The number of teams in the league. Default is 20.
+        random_seed (int, optional): The seed for the simulation. Default is 1.
+        n_workers (int, optional): The number of worker processes simulating seasons. Default is 1.
+        chunk_size (int, optional): The number of seasons simulated by each task. Results are
+            reproducible for a given seed and chunk size, whatever the number of workers. Default is 1024.
+        strengths (TeamStrengths, optional): Per-club attack, defence and home advantage, replacing
+            `poisson_mean`, for example `TeamStrengths.from_standings(final_standings)`. Default is None.
 
     Returns:
         tuple: The mean Spearman correlation and mean normalized Kendall-tau distance across all simulated seasons.
     """
-    spearmans_list: List[List[float]] = []
-    taus_list: List[List[float]] = []
+    n_rounds: int = 2 * (n_teams - 1)
+    spearman_accumulator: CurveAccumulator = CurveAccumulator(n_rounds)
+    tau_accumulator: CurveAccumulator = CurveAccumulator(n_rounds)
+
+    for rho, tau in iterate_spearman_tau_chunks(
+        num_seasons, poisson_mean, n_teams, random_seed, n_workers, chunk_size, strengths
+    ):
+        spearman_accumulator.update(rho)
+        tau_accumulator.update(tau)
+
+    return spearman_accumulator.mean.tolist(), tau_accumulator.mean.tolist()
+
+
+def generate_spearman_tau_until(
+    tolerance: float,
+    confidence: float = 0.95,
+    poisson_mean: float = 1.325,
+    n_teams: int = 20,
+    random_seed: int = 1,
+    n_workers: int = 1,
+    chunk_size: int = 1024,
+    max_seasons: int = 1_000_000,
+    strengths: TeamStrengths = None,
+) -> Tuple[List[float], List[float], List[float], List[float], int]:
+    """
+    Simulates seasons until the confidence interval of the mean normalized Kendall-tau distance is
+    narrower than `tolerance` at every round.
+
+    Parameters:
+        tolerance (float): The largest accepted width of the per-round confidence interval.
+        confidence (float, optional): The confidence level of the interval. Default is 0.95.
+        poisson_mean (float, optional): The mean of the Poisson distribution for simulating match goals.
+            Default is 1.325.
+        n_teams (int, optional): The number of teams in the league. Default is 20.
+        random_seed (int, optional): The seed for the simulation. Default is 1.
+        n_workers (int, optional): The number of worker processes simulating seasons. Default is 1.
+        chunk_size (int, optional): The number of seasons simulated by each task. Default is 1024.
+        max_seasons (int, optional): The number of seasons after which the simulation stops even if
+            the tolerance was not reached. Default is 1,000,000.
+        strengths (TeamStrengths, optional): Per-club attack, defence and home advantage, replacing
+            `poisson_mean`, for example `TeamStrengths.from_standings(final_standings)`. Default is None.
+
+    Returns:
+        tuple: The mean Spearman correlation, the mean normalized Kendall-tau distance, their
+            per-round standard errors and the number of simulated seasons.
+    """
+    spearman_accumulator, tau_accumulator = simulate_until_converged(
+        tolerance,
+        confidence=confidence,
+        poisson_mean=poisson_mean,
+        n_teams=n_teams,
+        random_seed=random_seed,
+        n_workers=n_workers,
+        chunk_size=chunk_size,
+        max_seasons=max_seasons,
+        strengths=strengths,
+    )
+
+    return (
+        spearman_accumulator.mean.tolist(),
+        tau_accumulator.mean.tolist(),
+        spearman_accumulator.std_error().tolist(),
+        tau_accumulator.std_error().tolist(),
+        tau_accumulator.count,
+    )
+
+
+def spearman_tau_from_tensor(rank_tensor: Union[np.ndarray, RankCube]) -> Tuple[List[float], List[float]]:
+    """
+    Computes the average Spearman correlation and normalized Kendall-tau distance from a rank tensor.
+
+    Parameters:
+        rank_tensor (np.ndarray or RankCube): Positions with shape (seasons, teams, rounds), as returned by
+            `simulate_seasons`, or a (possibly memory-mapped) rank cube.
+
+    Returns:
+        tuple: The mean Spearman correlation and mean normalized Kendall-tau distance across all seasons.
+    """
+    return _spearman_tau_from_ranks(as_rank_tensor(rank_tensor))
+
+
+def _spearman_tau_from_ranks(ranks: np.ndarray, chunk_size: int = 4096) -> Tuple[List[float], List[float]]:
+    """
+    Averages the Spearman and tau curves of a rank tensor chunk by chunk, so memory-mapped
+    cubes are never fully loaded.
+
+    Parameters:
+        ranks (np.ndarray): Positions with shape (seasons, teams, rounds).
+        chunk_size (int, optional): The number of seasons read at once. Default is 4096.
+
+    Returns:
+        tuple: The mean Spearman correlation and mean normalized Kendall-tau distance across all seasons.
+    """
+    spearman_accumulator: CurveAccumulator = CurveAccumulator(ranks.shape[2])
+    tau_accumulator: CurveAccumulator = CurveAccumulator(ranks.shape[2])
 
-    for i in range(1, num_seasons + 1):
-        rank_table_df: pd.DataFrame = generate_table(1.325, random_seed=i)
-        spearman_list, tau_list = spearman_tau_table(rank_table_df, return_as_list=True)
+    for start in range(0, ranks.shape[0], chunk_size):
+        rho, tau = spearman_tau_batch(ranks[start : start + chunk_size])
 
-        spearmans_list.append(spearman_list)
-        taus_list.append(tau_list)
+        spearman_accumulator.update(rho)
+        tau_accumulator.update(tau)
 
-    return spearman_tau_mean(taus_list, spearmans_list)
+    return spearman_accumulator.mean.tolist(), tau_accumulator.mean.tolist()
 
 
-def spearman_tau_from_tables(years_table_list: list) -> Tuple[List[float], List[float]]:
+def spearman_tau_from_tables(years_table_list: Union[list, RankCube]) -> Tuple[List[float], List[float]]:
     """
     Computes the average Spearman correlation and normalized Kendall-tau distance from a list of ranking tables.
 
     Parameters:
-        years_table_list (list): A list of ranking tables, one for each season.
+        years_table_list (list or RankCube): A list of ranking tables, one for each season, or a rank cube.
 
     Returns:
         tuple: The mean Spearman correlation and mean normalized Kendall-tau distance across all seasons.
     """
-    spearmans_list: List[List[float]] = []
-    taus_list: List[List[float]] = []
+    if isinstance(years_table_list, (RankCube, np.ndarray)):
+        return _spearman_tau_from_ranks(as_rank_tensor(years_table_list))
+
+    rho, tau = spearman_tau_curves(years_table_list)
+
+    return spearman_tau_mean(tau, rho)
+
+
+def spearman_tau_curves(years_table_list: Union[list, RankCube]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the Spearman correlation and normalized Kendall-tau distance curves of every season.
+
+    Parameters:
+        years_table_list (list or RankCube): A list of ranking tables, one for each season, or a rank cube.
+            All seasons must have the same number of matchweeks.
+
+    Returns:
+        tuple: The Spearman correlations and the normalized Kendall-tau distances, each with
+            shape (seasons, rounds), in the order of `years_table_list`.
+    """
+    if isinstance(years_table_list, (RankCube, np.ndarray)):
+        return spearman_tau_batch(as_rank_tensor(years_table_list))
 
-    for rank_table_df in years_table_list:
-        spearman_list, tau_list = spearman_tau_table(rank_table_df, return_as_list=True)
+    # Seasons with the same shape are stacked so each league size is a single kernel call
+    tables_by_shape: Dict[Tuple[int, int], List[int]] = {}
+    season_ranks: List[np.ndarray] = [rank_table_to_array(rank_table_df) for rank_table_df in years_table_list]
+    for season, ranks in enumerate(season_ranks):
+        tables_by_shape.setdefault(ranks.shape, []).append(season)
 
-        spearmans_list.append(spearman_list)
-        taus_list.append(tau_list)
+    n_rounds: int = season_ranks[0].shape[1]
+    rho: np.ndarray = np.empty((len(season_ranks), n_rounds))
+    tau: np.ndarray = np.empty((len(season_ranks), n_rounds))
 
-    return spearman_tau_mean(taus_list, spearmans_list)
+    for seasons in tables_by_shape.values():
+        rho[seasons], tau[seasons] = spearman_tau_batch(np.stack([season_ranks[season] for season in seasons]))
+
+    return rho, tau
+
+
+def round_agreement_matrices(
+    years_table_list: Union[list, RankCube], return_seasons: bool = False
+) -> Tuple[np.ndarray, ...]:
+    """
+    Computes how much every round agrees with every other round, averaged over a league.
+
+    Parameters:
+        years_table_list (list or RankCube): A list of ranking tables, one for each season, or a rank cube.
+            All seasons must have the same number of clubs and matchweeks.
+        return_seasons (bool, optional): If True, also returns the matrices of every season. Default is False.
+
+    Returns:
+        tuple: The mean Spearman correlation and mean normalized Kendall-tau distance between
+            rounds i + 1 and j + 1 at entry [i, j], each with shape (rounds, rounds), followed by
+            the per-season matrices with shape (seasons, rounds, rounds) when `return_seasons` is True.
+    """
+    if isinstance(years_table_list, (RankCube, np.ndarray)):
+        ranks: np.ndarray = as_rank_tensor(years_table_list)
+    else:
+        ranks = np.stack([rank_table_to_array(rank_table_df) for rank_table_df in years_table_list])
+
+    rho, tau = round_agreement_batch(ranks)
+
+    if return_seasons:
+        return rho.mean(axis=0), tau.mean(axis=0), rho, tau
+
+    return rho.mean(axis=0), tau.mean(axis=0)
 
 
 def spearman_tau_mean(
-    taus_list: list, spearmans_list: list
-) -> Tuple[List[float], List[float]]:
+    taus_list: list, spearmans_list: list, return_std_error: bool = False
+) -> Tuple[List[float], ...]:
     """
     Calculates the mean Spearman correlation and mean normalized Kendall-tau distance from multiple seasons.
 
     Parameters:
-        taus_list (list): A list of normalized Kendall-tau distances for each season.
-        spearmans_list (list): A list of Spearman correlation coefficients for each season.
+        taus_list (list or array-like): A list of normalized Kendall-tau distances for each season.
+        spearmans_list (list or array-like): A list of Spearman correlation coefficients for each season.
+        return_std_error (bool, optional): If True, also returns the per-round standard errors
+            of both means. Default is False.
 
     Returns:
-        tuple: The mean Spearman correlation and the mean normalized Kendall-tau distance across all seasons.
+        tuple: The mean Spearman correlation and the mean normalized Kendall-tau distance across all seasons,
+            followed by their standard errors when `return_std_error` is True.
     """
 
     if len(taus_list) != len(spearmans_list):
         return None
 
-    sum_spearmans_list: List[int] = [0] * len(spearmans_list[0])
-    sum_taus_list: List[int] = [0] * len(taus_list[0])
+    spearman_accumulator: CurveAccumulator = CurveAccumulator(len(spearmans_list[0]))
+    tau_accumulator: CurveAccumulator = CurveAccumulator(len(taus_list[0]))
 
-    for i in range(0, len(spearmans_list[0])):
-        for spearman_list, tau_list in zip(spearmans_list, taus_list):
-            sum_spearmans_list[i] += spearman_list[i]
-            sum_taus_list[i] += tau_list[i]
+    spearman_accumulator.update(spearmans_list)
+    tau_accumulator.update(taus_list)
 
-    mean_spearmans_list: List[float] = [sum_num / (len(taus_list)) for sum_num in sum_spearmans_list]
-    mean_taus_list: List[float] = [sum_num / (len(taus_list)) for sum_num in sum_taus_list]
+    if return_std_error:
+        return (
+            spearman_accumulator.mean.tolist(),
+            tau_accumulator.mean.tolist(),
+            spearman_accumulator.std_error().tolist(),
+            tau_accumulator.std_error().tolist(),
+        )
 
-    return mean_spearmans_list, mean_taus_list
+    return spearman_accumulator.mean.tolist(), tau_accumulator.mean.tolist()
@@ -0,0 +1,253 @@
+"""
+Opt-in instrumentation of the analysis hot paths.
+
+Functions decorated with `instrument` and blocks wrapped in `stage` record their wall time, call
+count and, optionally, the peak memory they allocated (through `tracemalloc`). Nothing is recorded
+until `enable` is called; while disabled, a decorated function only pays for one global flag check.
+
+Example:
+    from src import instrumentation
+
+    instrumentation.enable(track_memory=True)
+    generate_table(1.325)
+    print(instrumentation.format_summary())
+    instrumentation.export_chrome_trace("trace.json")
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+_enabled: bool = False
+_track_memory: bool = False
+_max_events: int = 1_000_000
+
+_lock = threading.Lock()
+_local = threading.local()
+_origin: float = time.perf_counter()
+_stats: Dict[str, Dict] = {}
+_events: List[Dict] = []
+
+
+def enable(track_memory: bool = False, max_events: int = 1_000_000):
+    """
+    Starts recording.
+
+    Parameters:
+        track_memory (bool, optional): Whether to record the peak memory allocated by every stage.
+            This starts `tracemalloc`, which slows allocations down noticeably. Default is False.
+        max_events (int, optional): The largest number of trace events kept, so long runs cannot
+            exhaust memory. Statistics are still updated past it. Default is 1,000,000.
+    """
+    global _enabled, _track_memory, _max_events
+
+    _track_memory = track_memory
+    _max_events = max_events
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    _enabled = True
+
+
+def disable():
+    """
+    Stops recording, keeping what was recorded so far.
+    """
+    global _enabled
+
+    _enabled = False
+    if _track_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled() -> bool:
+    """
+    Returns whether recording is on.
+    """
+    return _enabled
+
+
+def reset():
+    """
+    Drops every recorded statistic and trace event.
+    """
+    global _origin
+
+    with _lock:
+        _stats.clear()
+        _events.clear()
+        _origin = time.perf_counter()
+
+
+def instrument(name: str = None) -> Callable:
+    """
+    Decorates a function so its calls are recorded as a stage while instrumentation is enabled.
+
+    Parameters:
+        name (str, optional): The stage name. If None, the qualified name of the function.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        stage_name: str = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            with stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Records a block of code as a stage while instrumentation is enabled.
+
+    Parameters:
+        name (str): The stage name.
+    """
+    if not _enabled:
+        yield
+        return
+
+    frames: List[List[int]] = _memory_frames()
+    track_memory: bool = _track_memory and tracemalloc.is_tracing()
+    if track_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if frames:
+            frames[-1][1] = max(frames[-1][1], peak)
+        tracemalloc.reset_peak()
+        frames.append([current, current])
+
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        end: float = time.perf_counter()
+
+        allocated: int = 0
+        if track_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            frame = frames.pop()
+            frame[1] = max(frame[1], peak)
+            allocated = frame[1] - frame[0]
+            if frames:
+                frames[-1][1] = max(frames[-1][1], frame[1])
+            tracemalloc.reset_peak()
+
+        _record(name, start, end, allocated)
+
+
+def summary() -> List[Dict]:
+    """
+    Returns the statistics of every stage, the slowest first.
+
+    Returns:
+        list: One dict per stage with "stage", "calls", "total_s", "mean_s", "max_s" and "peak_bytes".
+            Times include the nested stages.
+    """
+    with _lock:
+        rows: List[Dict] = [
+            {
+                "stage": name,
+                "calls": stats["calls"],
+                "total_s": stats["total"],
+                "mean_s": stats["total"] / stats["calls"],
+                "max_s": stats["max"],
+                "peak_bytes": stats["peak_bytes"],
+            }
+            for name, stats in _stats.items()
+        ]
+
+    return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+
+def format_summary() -> str:
+    """
+    Formats the statistics of every stage as a text table.
+
+    Returns:
+        str: The table, the slowest stage first.
+    """
+    rows: List[Dict] = summary()
+    width: int = max([len("stage")] + [len(row["stage"]) for row in rows])
+
+    lines: List[str] = [
+        f"{'stage':<{width}}  {'calls':>8}  {'total (s)':>10}  {'mean (ms)':>10}  {'max (ms)':>10}  {'peak (MiB)':>10}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['stage']:<{width}}  {row['calls']:>8}  {row['total_s']:>10.4f}  "
+            f"{row['mean_s'] * 1e3:>10.3f}  {row['max_s'] * 1e3:>10.3f}  {row['peak_bytes'] / 2**20:>10.2f}"
+        )
+
+    return "\n".join(lines)
+
+
+def export_chrome_trace(path: str):
+    """
+    Saves the recorded calls in the Chrome trace event format, to be opened in chrome://tracing or Perfetto.
+
+    Parameters:
+        path (str): The JSON file path.
+    """
+    with _lock:
+        events: List[Dict] = list(_events)
+
+    with open(path, "w", encoding="utf-8") as trace_file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+
+
+def _record(name: str, start: float, end: float, allocated: int):
+    """
+    Adds one call of a stage to the statistics and to the trace.
+    """
+    duration: float = end - start
+
+    with _lock:
+        stats: Dict = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = {"calls": 0, "total": 0.0, "max": 0.0, "peak_bytes": 0}
+
+        stats["calls"] += 1
+        stats["total"] += duration
+        stats["max"] = max(stats["max"], duration)
+        stats["peak_bytes"] = max(stats["peak_bytes"], allocated)
+
+        if len(_events) < _max_events:
+            _events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - _origin) * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {"peak_bytes": allocated} if allocated else {},
+                }
+            )
+
+
+def _memory_frames() -> List[List[int]]:
+    """
+    Returns the [start, peak] memory of the stages open in the current thread, innermost last.
+    """
+    frames = getattr(_local, "frames", None)
+    if frames is None:
+        frames = _local.frames = []
+
+    return frames
@@ -0,0 +1,317 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from src.calculations.club_registry import ClubRegistry
+from src.scraping.html_table import (
+    format_standings_data,
+    has_standings_table,
+    parse_standings_html,
+)
+from src.scraping.scrape_cache import PageCache, ScrapeManifest, retry_with_backoff
+from src.instrumentation import instrument
+
+
+DEFAULT_HEADERS: Dict[str, str] = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+}
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second: float):
+        """
+        A thread-safe limiter that spaces out requests to the same host.
+
+        Every host gets its own schedule, so workers fetching from different hosts never wait
+        for each other, while workers sharing a host are served one slot at a time.
+
+        Attributes:
+            interval (float): The minimum number of seconds between two requests to the same host.
+        """
+        self.interval = 1 / requests_per_second if requests_per_second > 0 else 0.0
+        self.__lock = threading.Lock()
+        self.__next_slot: Dict[str, float] = {}
+
+    def wait(self, url: str):
+        """
+        Blocks until the host of `url` may receive another request.
+
+        Args:
+            url (str): The URL about to be requested.
+        """
+        host = urlsplit(url).netloc
+
+        with self.__lock:
+            now = time.monotonic()
+            slot = max(now, self.__next_slot.get(host, now))
+            self.__next_slot[host] = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ConcurrentLeagueScrapper:
+    def __init__(
+        self,
+        url_template: str,
+        save_folder: str,
+        n_workers: int = 8,
+        requests_per_second: float = 2.0,
+        timeout: float = 30,
+        max_wait: float = 30,
+        poll_interval: float = 0.5,
+        max_attempts: int = 5,
+        league: str = None,
+        cache_folder: str = None,
+        registry: ClubRegistry = None,
+    ):
+        """
+        A concurrent alternative to `LeagueScrapper` that fetches the standings pages with plain HTTP.
+
+        Pages are requested by a pool of worker threads and parsed with BeautifulSoup, so no browser
+        is needed. Instead of sleeping a fixed time, a worker re-polls a page until its standings
+        table is present. The output folders have the same layout as the ones of `LeagueScrapper`.
+
+        Runs are resumable: every fetched page is kept in a content-addressed cache and every
+        completed matchweek in a manifest, so a re-run only downloads the missing matchweeks and
+        re-parses the others from the cache.
+
+        Attributes:
+            url (str): A URL template containing placeholders for `year` and `matchweek`.
+            save_folder (str): The folder path where output CSV files will be saved.
+            n_workers (int): The number of pages fetched at the same time.
+            rate_limiter (RateLimiter): The per-host limiter shared by the workers.
+            timeout (float): The timeout of every HTTP request, in seconds.
+            max_wait (float): How long to wait for the standings table of a page, in seconds.
+            poll_interval (float): The initial delay between two polls of a page, doubled after every poll.
+            max_attempts (int): How many times a failed page is retried, with exponential backoff.
+            league (str): The league name in the manifest. Defaults to the name of `save_folder`.
+            page_cache (PageCache): The cache of raw pages, in `cache_folder` (`save_folder/page_cache` by default).
+            manifest (ScrapeManifest): The record of completed matchweeks, kept next to the page cache.
+            registry (ClubRegistry): If given, rank tables get a "ClubID" column from it and matchweeks
+                are aligned by ID, so Transfermarkt naming variants of a club stay on one row.
+        """
+        self.url = url_template
+        self.save_folder = save_folder
+        self.n_workers = n_workers
+        self.registry = registry
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.timeout = timeout
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.league = league or os.path.basename(os.path.normpath(save_folder))
+
+        cache_folder = cache_folder or os.path.join(save_folder, "page_cache")
+        self.page_cache = PageCache(cache_folder)
+        self.manifest = ScrapeManifest(os.path.join(cache_folder, "manifest.jsonl"))
+
+    def scrape_tables(
+        self,
+        init_year: int,
+        end_year: int,
+        init_matchweek: int,
+        end_matchweek: int,
+        verbose: bool = False,
+    ) -> Dict[int, pd.DataFrame]:
+        """
+        Executes the scraping and saving process for league standings tables.
+
+        Args:
+            init_year (int): Starting year for scraping.
+            end_year (int): Ending year for scraping.
+            init_matchweek (int): Initial matchweek number.
+            end_matchweek (int): Final matchweek number.
+            verbose (bool): Whether to print debug messages (optional).
+
+        Returns:
+            Dict[int, pd.DataFrame]: The rank table of every year.
+        """
+        self.__create_necessary_folders(init_year, end_year)
+
+        units: List[Tuple[int, int]] = [
+            (year, matchweek)
+            for year in range(init_year, end_year + 1)
+            for matchweek in range(init_matchweek, end_matchweek + 1)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            tables = executor.map(lambda unit: self.__scrape_matchweek(*unit, verbose), units)
+            standings: Dict[Tuple[int, int], pd.DataFrame] = dict(zip(units, tables))
+
+        rank_tables: Dict[int, pd.DataFrame] = {}
+        for year in range(init_year, end_year + 1):
+            rank_tables[year] = build_rank_table(
+                {matchweek: standings[(year, matchweek)] for matchweek in range(init_matchweek, end_matchweek + 1)},
+                self.registry,
+            )
+            rank_tables[year].to_csv(os.path.join(self.save_folder, "rank_tables", f"{year}.csv"))
+
+        if self.registry is not None and self.registry.path:
+            self.registry.save()
+
+        return rank_tables
+
+    @instrument()
+    def fetch_page(self, url: str) -> str:
+        """
+        Downloads a page, respecting the per-host rate limit.
+
+        Args:
+            url (str): The page URL.
+
+        Returns:
+            str: The page source.
+        """
+        self.rate_limiter.wait(url)
+
+        with urlopen(Request(url, headers=DEFAULT_HEADERS), timeout=self.timeout) as response:
+            charset = response.headers.get_content_charset() or "utf-8"
+            return response.read().decode(charset, errors="replace")
+
+    def get_standings_page(self, url: str) -> str:
+        """
+        Fetches a page until its standings table is present.
+
+        Args:
+            url (str): The page URL.
+
+        Returns:
+            str: The page source.
+
+        Raises:
+            TimeoutError: If the table does not show up within `max_wait` seconds.
+        """
+        deadline = time.monotonic() + self.max_wait
+        delay = self.poll_interval
+
+        while True:
+            html = self.fetch_page(url)
+            if has_standings_table(html):
+                return html
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Tabela não encontrada em {url}")
+
+            time.sleep(min(delay, remaining))
+            delay *= 2
+
+    def __scrape_matchweek(self, year: int, matchweek: int, verbose: bool = False) -> pd.DataFrame:
+        """
+        Scrapes and saves the standings of one matchweek, or re-parses them from the cache if the
+        matchweek was already completed.
+
+        Args:
+            year (int): The season year.
+            matchweek (int): The matchweek number.
+            verbose (bool): Whether to print debug messages (optional).
+
+        Returns:
+            pd.DataFrame: The standings of the matchweek.
+        """
+        save_path = os.path.join(self.save_folder, "matchweek_standings", f"{year}", f"{matchweek}.csv")
+
+        digest = self.manifest.digest(self.league, year, matchweek)
+        html = self.page_cache.get(digest) if digest else None
+        if html is not None and os.path.exists(save_path):
+            return parse_standings_table(html)
+
+        url = self.url.format(year=year, matchweek=matchweek)
+
+        if verbose:
+            print("Baixando", url)
+
+        html = retry_with_backoff(
+            lambda: self.get_standings_page(url),
+            max_attempts=self.max_attempts,
+            base_delay=self.poll_interval,
+            max_delay=self.max_wait,
+            verbose=verbose,
+        )
+        digest = self.page_cache.put(html)
+
+        table_df = parse_standings_table(html)
+        table_df.to_csv(save_path)
+
+        self.manifest.mark_done(self.league, year, matchweek, digest)
+
+        return table_df
+
+    def __create_necessary_folders(self, init_year: int, end_year: int):
+        """
+        Creates the necessary folders for saving the results.
+
+        Args:
+            init_year (int): Starting year of the range.
+            end_year (int): Ending year of the range.
+        """
+        os.makedirs(os.path.join(self.save_folder, "rank_tables"), exist_ok=True)
+
+        for year in range(init_year, end_year + 1):
+            os.makedirs(
+                os.path.join(self.save_folder, "matchweek_standings", f"{year}"), exist_ok=True
+            )
+
+
+def parse_standings_table(html: str) -> pd.DataFrame:
+    """
+    Converts the standings table of a page into a DataFrame.
+
+    Args:
+        html (str): The page source.
+
+    Returns:
+        pd.DataFrame: The formatted standings table.
+    """
+    headers, rows, indexes = parse_standings_html(html)
+
+    return format_standings_data(rows, headers, indexes)
+
+
+def build_rank_table(matchweek_standings: Dict[int, pd.DataFrame], registry: ClubRegistry = None) -> pd.DataFrame:
+    """
+    Builds the rank table of a season from the standings of its matchweeks.
+
+    The clubs are listed in the order of the first matchweek, as in `LeagueScrapper`, and every
+    other matchweek is aligned to them by club name, or by club ID when there is a registry.
+
+    Args:
+        matchweek_standings (Dict[int, pd.DataFrame]): The standings of every matchweek, keyed by matchweek number.
+        registry (ClubRegistry): The registry the club IDs come from (optional).
+
+    Returns:
+        pd.DataFrame: A DataFrame with one column per matchweek and a "Club" column, plus a "ClubID"
+            column when there is a registry.
+    """
+    matchweeks = sorted(matchweek_standings)
+    first_table = matchweek_standings[matchweeks[0]]
+
+    def club_keys(table_df: pd.DataFrame):
+        return table_df["Club"].to_numpy() if registry is None else registry.ids(table_df["Club"])
+
+    rank_table_df = pd.DataFrame(columns=matchweeks)
+    rank_table_df["Club"] = first_table["Club"].to_numpy()
+    rank_table_df[matchweeks[0]] = range(1, len(first_table) + 1)
+    if registry is not None:
+        rank_table_df["ClubID"] = club_keys(first_table)
+
+    club_rows = pd.Series(rank_table_df.index, index=club_keys(first_table))
+    for matchweek in matchweeks[1:]:
+        table_df = matchweek_standings[matchweek]
+        rows = club_rows.loc[club_keys(table_df)].to_numpy()
+
+        rank_table_df.loc[rows, matchweek] = table_df["#"].to_numpy()
+
+    return rank_table_df
@@ -0,0 +1,134 @@
+import importlib.util
+
+import pandas as pd
+
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import List, Tuple
+
+from src.instrumentation import instrument
+
+
+# lxml é bem mais rápido que o parser nativo, mas é opcional
+HTML_PARSER: str = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+@instrument()
+def parse_standings_html(html: str) -> Tuple[List[str], List[List[str]], List[str]]:
+    """
+    Extracts the headers, rows and row indexes of the Transfermarkt standings table from a page.
+
+    Reads the `<th>` texts of the table inside the `responsive-table` div (plus a trailing "url"
+    header) and the `<td>` texts of every body row, in a single pass over the page. Only the
+    markup of the table is turned into a tree, so the rest of the page is skipped.
+
+    Args:
+        html (str): The page source.
+
+    Returns:
+        Tuple[List[str], List[List[str]], List[str]]: The headers, the row data and the row indexes
+            (the text of the first cell of every row).
+
+    Raises:
+        ValueError: If the page has no standings table.
+    """
+    table = _find_standings_table(_table_snippet(html))
+    if table is None:
+        # O recorte falhou (por exemplo, "responsive-table" citado num script): lê a página inteira
+        table = _find_standings_table(html)
+    if table is None:
+        raise ValueError("Standings table not found in page")
+
+    headers = [_cell_text(th) for th in table.find("thead").find_all("th")]
+    headers.append("url")
+
+    rows = []
+    indexes = []
+    for row in table.find("tbody").find_all("tr"):
+        row_data = [_cell_text(td) for td in row.find_all("td")]
+        if row_data:
+            indexes.append(row_data[0])
+            rows.append(row_data)
+
+    return headers, rows, indexes
+
+
+def has_standings_table(html: str) -> bool:
+    """
+    Checks cheaply whether a page already contains the standings table.
+
+    Args:
+        html (str): The page source.
+
+    Returns:
+        bool: Whether the `responsive-table` div and a table body are present.
+    """
+    return "responsive-table" in html and "<tbody" in html
+
+
+@instrument()
+def format_standings_data(
+    rows: List[List[str]], headers: List[str], indexes: List[str]
+) -> pd.DataFrame:
+    """
+    Formats extracted table data into a pandas DataFrame with appropriate column names and transformations.
+
+    Args:
+        rows (List[List[str]]): List of row data extracted from the table.
+        headers (List[str]): List of table headers to be used as column names.
+        indexes (List[str]): List of row indexes to be used as DataFrame indexes.
+
+    Returns:
+        pd.DataFrame: A formatted pandas DataFrame representing the standings table.
+    """
+    df = pd.DataFrame(rows, columns=headers, index=indexes)
+    df.index.name = headers[0]
+
+    df = df.loc[:, ~df.columns.duplicated(keep="first")]
+
+    df["Club"] = df[""]
+
+    if "Form" in df.columns:
+        df["Pts"] = df["Form"]
+        df.drop(columns=["Form"], inplace=True)
+        df["GP"] = df["W"]
+        df["W"] = df["D"]
+        df["D"] = df["L"]
+    else:
+        df["SG"] = df["Pts"]
+        df["Pts"] = df["url"]
+
+    df.drop(columns=["", "url"], inplace=True)
+
+    return df
+
+
+def _table_snippet(html: str) -> str:
+    """
+    Cuts the first `responsive-table` div, up to the end of its table, out of a page.
+    """
+    start = html.find("responsive-table")
+    end = html.find("</table>", start)
+    if start < 0 or end < 0:
+        return ""
+
+    return html[html.rfind("<", 0, start) : end + len("</table>")] + "</div>"
+
+
+def _find_standings_table(html: str):
+    """
+    Parses the `responsive-table` divs of some markup and returns the table of the first one, if any.
+    """
+    soup = BeautifulSoup(
+        html, HTML_PARSER, parse_only=SoupStrainer("div", class_="responsive-table")
+    )
+
+    responsive_div = soup.find("div", class_="responsive-table")
+
+    return responsive_div.find("table") if responsive_div else None
+
+
+def _cell_text(cell) -> str:
+    """
+    Returns the visible text of a cell with its whitespace collapsed, like Selenium's `.text`.
+    """
+    return " ".join(cell.get_text(" ", strip=True).split())
@@ -1,35 +1,55 @@
 import os
-import time
 
 import pandas as pd
 
+from typing import TYPE_CHECKING, List
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+# O Selenium só é importado quando o navegador é de fato necessário
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
 
-from selenium.webdriver.chrome.webdriver import WebDriver
-from selenium.webdriver.remote.webelement import WebElement
-
-from typing import List
+from src.calculations.club_registry import ClubRegistry
+from src.scraping.html_table import format_standings_data, parse_standings_html
+from src.scraping.scrape_cache import PageCache, ScrapeManifest, retry_with_backoff
+from src.instrumentation import instrument
 
 
 class LeagueScrapper:
-    def __init__(self, url_template: str, save_folder: str):
+    def __init__(
+        self,
+        url_template: str,
+        save_folder: str,
+        max_attempts: int = 5,
+        league: str = None,
+        cache_folder: str = None,
+        registry: ClubRegistry = None,
+    ):
         """
         A class for scraping and processing football league standings tables from Transfermarkt
 
         The class uses Selenium to navigate the website, extract HTML tables, and save the processed data as CSV files.
+        The source of every scraped page is kept in a content-addressed cache and every completed matchweek in a
+        manifest, so a re-run skips finished matchweeks and re-parses them from the cache without opening the browser.
 
         Attributes:
             url (str): A URL template containing placeholders for `year` and `matchweek`.
             save_folder (str): The folder path where output CSV files will be saved.
+            max_attempts (int): How many times a failed page is retried, with exponential backoff.
+            league (str): The league name in the manifest. Defaults to the name of `save_folder`.
+            page_cache (PageCache): The cache of raw pages, in `cache_folder` (`save_folder/page_cache` by default).
+            manifest (ScrapeManifest): The record of completed matchweeks, kept next to the page cache.
+            registry (ClubRegistry): If given, rank tables get a "ClubID" column from it and matchweeks
+                are aligned by ID, so Transfermarkt naming variants of a club stay on one row.
         """
         self.url = url_template
         self.save_folder = save_folder
+        self.max_attempts = max_attempts
+        self.registry = registry
+        self.league = league or os.path.basename(os.path.normpath(save_folder))
+
+        cache_folder = cache_folder or os.path.join(save_folder, "page_cache")
+        self.page_cache = PageCache(cache_folder)
+        self.manifest = ScrapeManifest(os.path.join(cache_folder, "manifest.jsonl"))
 
     def scrape_tables(
         self,
@@ -49,7 +69,7 @@ class LeagueScrapper:
             end_matchweek (int): Final matchweek number.
             verbose (bool): Whether to print debug messages (optional).
         """
-        driver = self.__set_driver()
+        driver = None
 
         self.__create_necessary_folders(init_year, end_year)
 
@@ -64,42 +84,44 @@ class LeagueScrapper:
                     self.save_folder, "matchweek_standings", f"{year}"
                 )
 
-                while True:
-                    try:
-                        url = self.url.format(year=year, matchweek=matchweek)
+                save_path = os.path.join(
+                    matchweek_standings_save_folder, f"{matchweek}.csv"
+                )
 
-                        if verbose:
-                            print("Chegou no loop", url)
+                table_df = self.__get_cached_table_df(year, matchweek, save_path)
 
-                        table = self.__get_classification_table(driver, url)
+                if table_df is None:
+                    if driver is None:
+                        driver = self.__set_driver()
 
-                        if not table:
-                            print(f"Tabela não encontrada em {url}")
-                            continue
+                    url = self.url.format(year=year, matchweek=matchweek)
 
-                        WebDriverWait(driver, 30).until(
-                            EC.presence_of_all_elements_located((By.TAG_NAME, "td"))
-                        )
+                    if verbose:
+                        print("Chegou no loop", url)
 
-                        table_df = self.__get_table_df(table)
+                    table_df, page_source = retry_with_backoff(
+                        lambda: self.__scrape_table_df(driver, url, verbose),
+                        max_attempts=self.max_attempts,
+                        verbose=verbose,
+                    )
 
-                        table_df.to_csv(
-                            os.path.join(
-                                matchweek_standings_save_folder, f"{matchweek}.csv"
-                            )
-                        )
+                    table_df.to_csv(save_path)
 
-                        rank_table_df = self.__update_rank_table(
-                            matchweek, rank_table_df, table_df
-                        )
-                    except Exception:
-                        continue
+                    self.manifest.mark_done(
+                        self.league, year, matchweek, self.page_cache.put(page_source)
+                    )
 
-                    break
+                rank_table_df = self.__update_rank_table(
+                    matchweek, rank_table_df, table_df
+                )
 
             rank_table_df.to_csv(os.path.join(rank_table_save_folder, f"{year}.csv"))
 
-        driver.quit()
+        if driver is not None:
+            driver.quit()
+
+        if self.registry is not None and self.registry.path:
+            self.registry.save()
 
     def __set_driver(self):
         """
@@ -108,6 +130,10 @@ class LeagueScrapper:
         Returns:
             WebDriver: An instance of Selenium's WebDriver configured for Chrome.
         """
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
         options = webdriver.ChromeOptions()
         options.add_experimental_option("excludeSwitches", ["enable-logging"])
         driver = webdriver.Chrome(
@@ -116,6 +142,44 @@ class LeagueScrapper:
 
         return driver
 
+    def __scrape_table_df(self, driver: "WebDriver", url: str, verbose: bool = False):
+        """
+        Loads a page and extracts its standings table.
+
+        Args:
+            driver (WebDriver): Instance of Selenium's WebDriver.
+            url (str): The webpage URL to extract the table from.
+            verbose (bool): Whether to print debug messages (optional).
+
+        Returns:
+            Tuple[pd.DataFrame, str]: The standings table and the page source it was read from.
+        """
+        page_source = self.__get_classification_table(driver, url, verbose)
+
+        table_df = self.__get_table_df(page_source, verbose)
+
+        return table_df, page_source
+
+    def __get_cached_table_df(self, year: int, matchweek: int, save_path: str):
+        """
+        Re-parses the standings table of a completed matchweek from the page cache.
+
+        Args:
+            year (int): The season year.
+            matchweek (int): The matchweek number.
+            save_path (str): Where the matchweek's CSV file is saved.
+
+        Returns:
+            pd.DataFrame: The standings table, or None if the matchweek still has to be scraped.
+        """
+        digest = self.manifest.digest(self.league, year, matchweek)
+        html = self.page_cache.get(digest) if digest else None
+
+        if html is None or not os.path.exists(save_path):
+            return None
+
+        return self.__get_table_df(html)
+
     def __create_necessary_folders(self, init_year: int, end_year: int):
         """
         Creates the necessary folders for saving the results.
@@ -147,11 +211,12 @@ class LeagueScrapper:
         except Exception:
             pass
 
+    @instrument()
     def __get_classification_table(
-        self, driver: WebDriver, url: str, verbose: bool = False
+        self, driver: "WebDriver", url: str, verbose: bool = False
     ):
         """
-        Accesses a specific webpage and extracts the standings table.
+        Accesses a specific webpage and waits for the standings table to be loaded.
 
         Args:
             driver (WebDriver): Instance of Selenium's WebDriver.
@@ -159,11 +224,13 @@ class LeagueScrapper:
             verbose (bool): Whether to print debug messages (optional).
 
         Returns:
-            WebElement: The HTML table element extracted from the webpage.
+            str: The page source, read once the table and its cells are present.
         """
-        driver.get(url)
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
 
-        time.sleep(10)
+        driver.get(url)
 
         if verbose:
             print("Esperando a tabela ser carregada")
@@ -172,87 +239,37 @@ class LeagueScrapper:
             EC.presence_of_element_located((By.CLASS_NAME, "responsive-table"))
         )
 
-        responsive_div = driver.find_element(By.CLASS_NAME, "responsive-table")
-
-        table = responsive_div.find_element(By.TAG_NAME, "table")
-
-        if verbose:
-            print(f"Tabela: {table}")
+        WebDriverWait(driver, 30).until(
+            EC.presence_of_all_elements_located((By.TAG_NAME, "td"))
+        )
 
-        return table
+        return driver.page_source
 
-    def __get_table_df(self, table: WebElement, verbose: bool = False) -> pd.DataFrame:
+    def __get_table_df(self, page_source: str, verbose: bool = False) -> pd.DataFrame:
         """
-        Processes an HTML table element and converts it into a pandas DataFrame.
+        Extracts the standings table of a page source and converts it into a pandas DataFrame.
+
+        The headers and rows are parsed in a single pass over the page source, instead of one WebDriver
+        call per cell.
 
         Args:
-            table (WebElement): The HTML table element to process.
+            page_source (str): The page source containing the table.
             verbose (bool): Whether to print debug messages (optional).
 
         Returns:
             pd.DataFrame: A DataFrame containing the table's data.
         """
-        # Listas para armazenar os dados
-        headers = []
-        rows = []
-        indexes = []
+        headers, rows, indexes = parse_standings_html(page_source)
 
-        thead = table.find_element(By.TAG_NAME, "thead")
-        headers = [th.text.strip() for th in thead.find_elements(By.TAG_NAME, "th")]
-        headers.append("url")
-
-        tbody = table.find_element(By.TAG_NAME, "tbody")
-
-        rows, indexes = self.__find_table_data(tbody, indexes, rows, verbose)
+        if verbose:
+            print(headers)
+            for row in rows:
+                print(row)
 
         table_df = self.__format_standings_data(rows, headers, indexes)
 
         return table_df
 
-    def __find_table_data(
-        self,
-        tbody: WebElement,
-        indexes: List[str],
-        rows: List[str],
-        verbose: bool = False,
-    ):
-        """
-        Extracts data from a table body (`<tbody>`) element and populates the provided lists with row indexes and data.
-
-        Args:
-            tbody (WebElement): The `<tbody>` element of an HTML table to extract data from.
-            indexes (List[str]): A list to store row indexes (e.g., ranking positions).
-            rows (List[str]): A list to store row data as lists of cell values.
-            verbose (bool): Whether to print debug messages (default is False).
-
-        Returns:
-            Tuple[List[str], List[str]]: Updated `rows` and `indexes` lists populated with extracted data.
-        """
-        for row in tbody.find_elements(By.TAG_NAME, "tr"):
-            columns = row.find_elements(By.TAG_NAME, "td")
-            if columns:
-                # Posição na tabela
-                index = (
-                    row.find_elements(By.TAG_NAME, "td")[0].text.strip()
-                    if row.find_elements(By.TAG_NAME, "td")
-                    else "-"
-                )
-
-                if verbose:
-                    print(index)
-
-                indexes.append(index)
-
-                # Resto das linhas
-                row_data = [col.text.strip() for col in columns]
-
-                if verbose:
-                    print(row_data)
-
-                rows.append(row_data)
-
-        return rows, indexes
-
     def __format_standings_data(
         self, rows: List[str], headers: List[str], indexes: List[str]
     ):
@@ -267,26 +284,7 @@ class LeagueScrapper:
         Returns:
             pd.DataFrame: A formatted pandas DataFrame representing the standings table.
         """
-        df = pd.DataFrame(rows, columns=headers, index=indexes)
-        df.index.name = headers[0]
-
-        df = df.loc[:, ~df.columns.duplicated(keep="first")]
-
-        df["Club"] = df[""]
-
-        if "Form" in df.columns:
-            df["Pts"] = df["Form"]
-            df.drop(columns=["Form"], inplace=True)
-            df["GP"] = df["W"]
-            df["W"] = df["D"]
-            df["D"] = df["L"]
-        else:
-            df["SG"] = df["Pts"]
-            df["Pts"] = df["url"]
-
-        df.drop(columns=["", "url"], inplace=True)
-
-        return df
+        return format_standings_data(rows, headers, indexes)
 
     def __update_rank_table(
         self,
@@ -311,17 +309,24 @@ class LeagueScrapper:
             for index, club in enumerate(clubs):
                 rank_table_df.at[index, "Club"] = club
                 rank_table_df.at[index, current_matchweek] = index + 1
+
+            if self.registry is not None:
+                rank_table_df["ClubID"] = self.registry.ids(clubs)
+        elif self.registry is not None:
+            club_rows = pd.Series(rank_table_df.index, index=rank_table_df["ClubID"])
+            rows = club_rows.loc[self.registry.ids(table_df["Club"])].to_numpy()
+
+            rank_table_df.loc[rows, current_matchweek] = table_df["#"].to_numpy()
         else:
-            for index, row in table_df.iterrows():
-                club = row["Club"]
+            club_rows = pd.Series(rank_table_df.index, index=rank_table_df["Club"])
+            rows = club_rows.loc[table_df["Club"].to_numpy()].to_numpy()
 
-                club_index = rank_table_df[rank_table_df["Club"] == club].index
-                club_index = club_index.item()
-                rank_table_df.at[club_index, current_matchweek] = row["#"]
+            rank_table_df.loc[rows, current_matchweek] = table_df["#"].to_numpy()
 
         return rank_table_df
 
 
+# Executar a partir da raiz do repositório com `python -m src.scraping.league_scrapper`
 if __name__ == "__main__":
     brasileirao_scrapper = LeagueScrapper(
         "https://www.transfermarkt.com/campeonato-brasileiro-serie-a/formtabelle/wettbewerb/BRA1?saison_id={year}&min=1&max={matchweek}",
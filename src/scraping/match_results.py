@@ -0,0 +1,318 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from bs4 import BeautifulSoup
+from typing import Dict, List, Sequence, Union
+
+from src.calculations.league_table import LeagueTable
+from src.scraping.html_table import HTML_PARSER
+
+
+RESULT_COLUMNS: List[str] = ["Round", "Home", "Away", "HomeGoals", "AwayGoals"]
+
+# Nomes alternativos aceitos nos CSVs de resultados (football-data.co.uk, exportações em português...)
+COLUMN_ALIASES: Dict[str, str] = {
+    "matchweek": "Round",
+    "matchday": "Round",
+    "rodada": "Round",
+    "hometeam": "Home",
+    "mandante": "Home",
+    "awayteam": "Away",
+    "visitante": "Away",
+    "fthg": "HomeGoals",
+    "homegoals": "HomeGoals",
+    "golsmandante": "HomeGoals",
+    "ftag": "AwayGoals",
+    "awaygoals": "AwayGoals",
+    "golsvisitante": "AwayGoals",
+}
+
+SCORE_PATTERN = re.compile(r"^\s*(\d+)\s*:\s*(\d+)\s*$")
+
+# "1.Matchday", "Matchday 1", "1. Spieltag", "1ª Rodada"... Other boxes of the page (tables,
+# "Last 5 matches") also hold numbers, so the word is required
+ROUND_WORDS = r"(?:matchday|spieltag|rodada|jornada|giornata|journ[ée]e)"
+ROUND_PATTERN = re.compile(rf"(\d+)\s*(?:\.|ª|º|st|nd|rd|th)?\s*{ROUND_WORDS}|{ROUND_WORDS}\s*(\d+)", re.IGNORECASE)
+
+DATE_COLUMNS: List[str] = ["Date", "Data"]
+
+
+def read_results_csv(path: str) -> pd.DataFrame:
+    """
+    Reads the match results of a season from a CSV file.
+
+    Besides the "Round", "Home", "Away", "HomeGoals" and "AwayGoals" columns, the usual aliases
+    ("Matchweek", "HomeTeam", "FTHG", ...) are accepted. Files without a matchweek column, such as
+    the football-data.co.uk ones, get their rounds from `rounds_from_match_order`. Matches without
+    a score are dropped.
+
+    Args:
+        path (str): The CSV file path.
+
+    Returns:
+        pd.DataFrame: One row per played match, with the `RESULT_COLUMNS`.
+    """
+    results = pd.read_csv(path)
+
+    renames = {}
+    for column in results.columns:
+        key = re.sub(r"[^a-z]", "", str(column).lower())
+        if column not in RESULT_COLUMNS and key in COLUMN_ALIASES:
+            renames[column] = COLUMN_ALIASES[key]
+    results = results.rename(columns=renames)
+
+    if "Round" not in results.columns and {"Home", "Away"} <= set(results.columns):
+        results["Round"] = rounds_from_match_order(results)
+
+    missing = [column for column in RESULT_COLUMNS if column not in results.columns]
+    if missing:
+        raise ValueError(f"Results file {path} has no {missing} columns")
+
+    return _clean_results(results[RESULT_COLUMNS])
+
+
+def rounds_from_match_order(results: pd.DataFrame) -> np.ndarray:
+    """
+    Numbers the matchweeks of results that have no matchweek column.
+
+    Matches are taken in date order (the "Date" column, day first, when there is one; the file
+    order otherwise) and a match is placed in the later matchweek of its two clubs, counting
+    the k-th match of a club as its k-th matchweek. Without postponements this is the official
+    matchweek; a postponed match is counted when it is played.
+
+    Args:
+        results (pd.DataFrame): The match results, with "Home" and "Away" columns.
+
+    Returns:
+        np.ndarray: The 1-based matchweek of every match, in the row order of `results`.
+    """
+    order = np.arange(len(results))
+    date_column = next((column for column in DATE_COLUMNS if column in results.columns), None)
+    if date_column is not None:
+        dates = pd.to_datetime(results[date_column], dayfirst=True, format="mixed", errors="coerce")
+        if dates.notna().all():
+            order = np.argsort(dates.to_numpy(), kind="stable")
+
+    home = results["Home"].astype(str).str.strip().to_numpy()[order]
+    away = results["Away"].astype(str).str.strip().to_numpy()[order]
+    clubs = np.column_stack([home, away]).ravel()
+    matches_played = pd.Series(clubs).groupby(clubs).cumcount().to_numpy() + 1
+
+    rounds = np.empty(len(results), dtype=np.int64)
+    rounds[order] = matches_played.reshape(-1, 2).max(axis=1)
+
+    return rounds
+
+
+def parse_fixtures_html(html: str) -> pd.DataFrame:
+    """
+    Extracts the match results of a season from a Transfermarkt fixtures page (`gesamtspielplan`).
+
+    Every matchday is a `box` div whose headline holds the matchday number ("1.Matchday"),
+    followed by a table with one row per match: the home club, the score ("2:1", in the
+    `ergebnis-link` anchor) and the away club. Boxes without a matchday headline are ignored and
+    matches that were not played yet ("-:-") are skipped.
+
+    Args:
+        html (str): The page source.
+
+    Returns:
+        pd.DataFrame: One row per played match, with the `RESULT_COLUMNS`.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    matches = []
+    for box in soup.find_all("div", class_="box"):
+        headline = box.find(class_="content-box-headline") or box.find(["h2", "h3", "div"])
+        round_match = ROUND_PATTERN.search(headline.get_text(" ", strip=True)) if headline else None
+        if round_match is None:
+            continue
+
+        for row in box.find_all("tr"):
+            score = _match_score(row)
+            clubs = [cell for cell in row.find_all("td") if "hauptlink" in (cell.get("class") or [])]
+            if score is None or len(clubs) < 2:
+                continue
+
+            matches.append(
+                [
+                    int(round_match.group(1) or round_match.group(2)),
+                    _club_name(clubs[0]),
+                    _club_name(clubs[-1]),
+                    int(score.group(1)),
+                    int(score.group(2)),
+                ]
+            )
+
+    return _clean_results(pd.DataFrame(matches, columns=RESULT_COLUMNS))
+
+
+def partial_standings_from_results(
+    results: pd.DataFrame,
+    tie_break: Union[str, Sequence[str]] = "premier_league",
+    n_rounds: int = None,
+) -> Dict[int, pd.DataFrame]:
+    """
+    Computes the standings after every matchweek of a season in one cumulative pass.
+
+    Args:
+        results (pd.DataFrame): The match results, as returned by `read_results_csv` or `parse_fixtures_html`.
+        tie_break (Union[str, Sequence[str]]): The league's ranking criteria, a key of `TIE_BREAK_RULES`
+            or a list of columns (optional).
+        n_rounds (int): The number of matchweeks. Defaults to the last matchweek with a result (optional).
+
+    Returns:
+        Dict[int, pd.DataFrame]: The standings of every matchweek, keyed by matchweek number, in the
+            format of `LeagueTable.to_dataframe`.
+    """
+    table, clubs = _results_table(results, tie_break, n_rounds)
+
+    standings = {}
+    for round_index in range(table.stats["Pts"].shape[0]):
+        standings[round_index + 1] = table.select(round_index).to_dataframe(clubs).reset_index(drop=True)
+
+    return standings
+
+
+def rank_table_from_results(
+    results: pd.DataFrame,
+    tie_break: Union[str, Sequence[str]] = "premier_league",
+    n_rounds: int = None,
+) -> pd.DataFrame:
+    """
+    Builds the rank table of a season directly from its match results.
+
+    The whole season is ranked at once: the per-round results are accumulated with a single
+    cumulative sum and every round is sorted with the league's tie-break rules, so the 38 partial
+    standings never have to be downloaded one by one.
+
+    Args:
+        results (pd.DataFrame): The match results, as returned by `read_results_csv` or `parse_fixtures_html`.
+        tie_break (Union[str, Sequence[str]]): The league's ranking criteria, a key of `TIE_BREAK_RULES`
+            or a list of columns (optional).
+        n_rounds (int): The number of matchweeks. Defaults to the last matchweek with a result (optional).
+
+    Returns:
+        pd.DataFrame: A DataFrame with one column per matchweek (1, 2, ...) and a "Club" column, with
+            the clubs in the order of the first matchweek, like the files under `rank_tables/`.
+    """
+    table, clubs = _results_table(results, tie_break, n_rounds)
+
+    positions = table.positions().T.astype(np.int64)
+    # Mesma ordem de linhas do LeagueScrapper: a classificação da primeira rodada
+    rows = np.argsort(positions[:, 0], kind="stable")
+
+    rank_table_df = pd.DataFrame(positions[rows], columns=list(range(1, positions.shape[1] + 1)))
+    rank_table_df["Club"] = [clubs[row] for row in rows]
+
+    return rank_table_df
+
+
+def save_rank_table_from_results(
+    results: Union[str, pd.DataFrame],
+    save_folder: str,
+    season: int,
+    tie_break: Union[str, Sequence[str]] = "premier_league",
+    n_rounds: int = None,
+) -> pd.DataFrame:
+    """
+    Builds a season's rank table from its match results and saves it under `rank_tables/`.
+
+    Args:
+        results (Union[str, pd.DataFrame]): The match results, or the path of a results CSV.
+        save_folder (str): The league folder, as used by `LeagueScrapper`.
+        season (int): The season year, used as the file name.
+        tie_break (Union[str, Sequence[str]]): The league's ranking criteria (optional).
+        n_rounds (int): The number of matchweeks (optional).
+
+    Returns:
+        pd.DataFrame: The saved rank table.
+    """
+    if isinstance(results, str):
+        results = read_results_csv(results)
+
+    rank_table_df = rank_table_from_results(results, tie_break, n_rounds)
+
+    rank_table_folder = os.path.join(save_folder, "rank_tables")
+    os.makedirs(rank_table_folder, exist_ok=True)
+    rank_table_df.to_csv(os.path.join(rank_table_folder, f"{season}.csv"))
+
+    return rank_table_df
+
+
+def _results_table(
+    results: pd.DataFrame,
+    tie_break: Union[str, Sequence[str]],
+    n_rounds: int = None,
+):
+    """
+    Accumulates the match results of a season into a table batched over rounds.
+
+    Returns:
+        Tuple[LeagueTable, List[str]]: The cumulative table and the club name of every club index.
+    """
+    clubs, club_index = np.unique(
+        np.concatenate([results["Home"].to_numpy(dtype=str), results["Away"].to_numpy(dtype=str)]),
+        return_inverse=True,
+    )
+    home, away = np.split(club_index, 2)
+
+    table = LeagueTable.from_matches(
+        results["Round"].to_numpy(dtype=np.int64) - 1,
+        home,
+        away,
+        results["HomeGoals"].to_numpy(dtype=np.int64),
+        results["AwayGoals"].to_numpy(dtype=np.int64),
+        n_teams=len(clubs),
+        n_rounds=n_rounds,
+        tie_break=tie_break,
+    )
+
+    return table, clubs.tolist()
+
+
+def _clean_results(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drops matches without a score and normalizes the dtypes of a results DataFrame.
+    """
+    results = results.copy()
+    for column in ("Round", "HomeGoals", "AwayGoals"):
+        results[column] = pd.to_numeric(results[column], errors="coerce")
+
+    results = results.dropna(subset=["Round", "HomeGoals", "AwayGoals"])
+    results = results.astype({"Round": np.int64, "HomeGoals": np.int64, "AwayGoals": np.int64})
+    results["Home"] = results["Home"].astype(str).str.strip()
+    results["Away"] = results["Away"].astype(str).str.strip()
+
+    return results.reset_index(drop=True)
+
+
+def _match_score(row):
+    """
+    Finds the score of a fixtures row. The kick-off time ("15:00") looks like a score too, so the
+    result link is preferred, then the highlighted cells.
+    """
+    result_link = row.find("a", class_="ergebnis-link")
+    if result_link is not None:
+        cells = [result_link]
+    else:
+        cells = [cell for cell in row.find_all("td") if "hauptlink" in (cell.get("class") or [])]
+
+    for cell in cells:
+        score = SCORE_PATTERN.match(cell.get_text(strip=True))
+        if score is not None:
+            return score
+
+    return None
+
+
+def _club_name(cell) -> str:
+    """
+    Returns the club name of a fixtures cell, preferring the link title over the (often abbreviated) text.
+    """
+    link = cell.find("a", title=True)
+
+    return link["title"].strip() if link else " ".join(cell.get_text(" ", strip=True).split())
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from typing import Callable, Dict, Optional, Tuple, Type, TypeVar
+
+
+T = TypeVar("T")
+
+
+class PageCache:
+    def __init__(self, folder: str):
+        """
+        A content-addressed cache of raw HTML pages.
+
+        Every page is stored once under the SHA-256 of its content, so identical pages share a file
+        and a digest always identifies exactly one page. Files are written to a temporary name and
+        then renamed, so a crash never leaves a truncated page behind.
+
+        Attributes:
+            folder (str): The folder where the pages are stored.
+        """
+        self.folder = folder
+
+    def put(self, html: str) -> str:
+        """
+        Stores a page.
+
+        Args:
+            html (str): The page source.
+
+        Returns:
+            str: The digest of the page.
+        """
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.__path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(file_descriptor, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """
+        Reads a stored page.
+
+        Args:
+            digest (str): The digest returned by `put`.
+
+        Returns:
+            Optional[str]: The page source, or None if it is not in the cache.
+        """
+        try:
+            with open(self.__path(digest), "rb") as page_file:
+                return page_file.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def __path(self, digest: str) -> str:
+        """
+        Returns the file of a digest, spread over 256 subfolders.
+        """
+        return os.path.join(self.folder, digest[:2], f"{digest}.html")
+
+
+class ScrapeManifest:
+    def __init__(self, path: str):
+        """
+        An append-only record of the (league, season, matchweek) units that were scraped.
+
+        Every completed unit is one JSON line holding the digest of its page in a `PageCache`, so a
+        re-run can skip finished units and re-parse them from the cache without touching the
+        network. Lines are appended under a lock, so the manifest can be shared by worker threads.
+
+        Attributes:
+            path (str): The path of the manifest file.
+        """
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__units: Dict[Tuple[str, int, int], str] = {}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as manifest_file:
+                for line in manifest_file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Linha incompleta de uma execução interrompida
+                        continue
+                    self.__units[(entry["league"], entry["season"], entry["matchweek"])] = entry["digest"]
+
+    def digest(self, league: str, season: int, matchweek: int) -> Optional[str]:
+        """
+        Returns the page digest of a completed unit.
+
+        Args:
+            league (str): The league name.
+            season (int): The season year.
+            matchweek (int): The matchweek number.
+
+        Returns:
+            Optional[str]: The digest, or None if the unit was not completed.
+        """
+        return self.__units.get((league, season, matchweek))
+
+    def mark_done(self, league: str, season: int, matchweek: int, digest: str):
+        """
+        Records a unit as completed.
+
+        Args:
+            league (str): The league name.
+            season (int): The season year.
+            matchweek (int): The matchweek number.
+            digest (str): The digest of the unit's page in the cache.
+        """
+        entry = {"league": league, "season": season, "matchweek": matchweek, "digest": digest}
+
+        with self.__lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as manifest_file:
+                manifest_file.write(json.dumps(entry) + "\n")
+                manifest_file.flush()
+                os.fsync(manifest_file.fileno())
+
+            self.__units[(league, season, matchweek)] = digest
+
+
+def retry_with_backoff(
+    func: Callable[[], T],
+    max_attempts: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    verbose: bool = False,
+) -> T:
+    """
+    Calls a function until it succeeds, doubling the delay between attempts.
+
+    Args:
+        func (Callable): The function to call, without arguments.
+        max_attempts (int): The maximum number of calls (optional).
+        base_delay (float): The delay after the first failure, in seconds (optional).
+        max_delay (float): The upper bound of every delay, in seconds (optional).
+        exceptions (Tuple[Type[BaseException], ...]): The exceptions that trigger a retry (optional).
+        verbose (bool): Whether to print debug messages (optional).
+
+    Returns:
+        The return value of `func`.
+
+    Raises:
+        The last exception raised by `func` if every attempt fails.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return func()
+        except exceptions as error:
+            if attempt == max_attempts - 1:
+                raise
+
+            delay = min(max_delay, base_delay * 2**attempt)
+            if verbose:
+                print(f"Tentativa {attempt + 1} falhou ({error!r}), nova tentativa em {delay:.1f}s")
+            time.sleep(delay)
@@ -0,0 +1,353 @@
+import json
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from typing import Dict, Iterable, List
+
+from src.calculations.club_registry import ClubRegistry
+from src.calculations.rank_cube import RankCube
+
+
+class StandingsStore:
+    """
+    A single-file columnar store for scraped league data.
+
+    The store is a zip archive of .npy members. Every (league, season) has a small JSON index
+    and one member per column: the matchweek standings are kept as (rounds, clubs) arrays and
+    the rank table as (clubs,) / (clubs, rounds) arrays. Loaders only read the members of the
+    requested seasons and columns, so no CSV is ever parsed.
+
+    Attributes:
+        path (str): The path of the store file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens a store, which is created on the first write if it does not exist.
+
+        Parameters:
+            path (str): The path of the store file.
+        """
+        self.path = path
+        self.__index: Dict = None
+
+    def leagues(self) -> List[str]:
+        """
+        Lists the leagues in the store.
+
+        Returns:
+            list: The league names, sorted.
+        """
+        return sorted(self.__get_index())
+
+    def seasons(self, league: str) -> List[int]:
+        """
+        Lists the seasons of a league.
+
+        Parameters:
+            league (str): The league name.
+
+        Returns:
+            list: The seasons, sorted.
+        """
+        return sorted(self.__get_index().get(league, {}))
+
+    def rounds(self, league: str, season: int) -> List[int]:
+        """
+        Lists the matchweeks stored for a season.
+
+        Parameters:
+            league (str): The league name.
+            season (int): The season.
+
+        Returns:
+            list: The matchweek numbers, in storage order.
+        """
+        return self.__get_index()[league][season]["rounds"]
+
+    def write_season(
+        self,
+        league: str,
+        season: int,
+        matchweek_standings: Dict[int, pd.DataFrame] = None,
+        rank_table: pd.DataFrame = None,
+    ):
+        """
+        Adds one season to the store. Seasons already in the store are never rewritten.
+
+        Parameters:
+            league (str): The league name.
+            season (int): The season.
+            matchweek_standings (dict, optional): Standings of every matchweek, keyed by matchweek number.
+                All of them must have the same clubs count.
+            rank_table (pd.DataFrame, optional): The rank table of the season.
+        """
+        if season in self.__get_index().get(league, {}):
+            raise ValueError(f"Season {season} of {league} is already in the store")
+
+        prefix: str = f"{league}/{season}"
+        entry: Dict = {"rounds": [], "standings_columns": [], "rank_table_columns": []}
+
+        with zipfile.ZipFile(self.path, "a", compression=zipfile.ZIP_STORED) as store:
+            if matchweek_standings:
+                rounds: List[int] = sorted(matchweek_standings)
+                columns: List[str] = list(
+                    dict.fromkeys(
+                        column for matchweek in rounds for column in matchweek_standings[matchweek].columns
+                    )
+                )
+
+                for i, column in enumerate(columns):
+                    values: np.ndarray = _column_array(
+                        [
+                            matchweek_standings[matchweek][column]
+                            if column in matchweek_standings[matchweek].columns
+                            else pd.Series([None] * len(matchweek_standings[matchweek]))
+                            for matchweek in rounds
+                        ]
+                    )
+                    _write_member(store, f"{prefix}/standings/{i}.npy", values)
+
+                entry["rounds"] = rounds
+                entry["standings_columns"] = [str(column) for column in columns]
+
+            if rank_table is not None:
+                for i, column in enumerate(rank_table.columns):
+                    _write_member(store, f"{prefix}/rank_table/{i}.npy", _column_array([rank_table[column]])[0])
+
+                entry["rank_table_columns"] = [str(column) for column in rank_table.columns]
+
+            store.writestr(f"{prefix}/index.json", json.dumps(entry, ensure_ascii=False))
+
+        self.__get_index().setdefault(league, {})[season] = entry
+
+    def load_standings(
+        self,
+        league: str,
+        seasons: Iterable[int] = None,
+        rounds: Iterable[int] = None,
+        columns: Iterable[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Loads matchweek standings, reading only the requested seasons and columns.
+
+        Seasons and matchweeks that are not in the store are skipped.
+
+        Parameters:
+            league (str): The league name.
+            seasons (iterable, optional): The seasons to load. If None, all of them.
+            rounds (iterable, optional): The matchweeks to load. If None, all of them.
+            columns (iterable, optional): The standings columns to load. If None, all of them.
+
+        Returns:
+            pd.DataFrame: One row per club, season and matchweek, with "Season" and "Round" columns
+                followed by the standings columns.
+        """
+        index: Dict = self.__get_index()[league]
+        frames: List[pd.DataFrame] = []
+
+        with zipfile.ZipFile(self.path) as store:
+            for season in self.seasons(league) if seasons is None else seasons:
+                if season not in index:
+                    continue
+
+                entry: Dict = index[season]
+                stored_rounds: List[int] = entry["rounds"]
+                selected: List[int] = [
+                    stored_rounds.index(matchweek)
+                    for matchweek in (stored_rounds if rounds is None else rounds)
+                    if matchweek in stored_rounds
+                ]
+                if not selected:
+                    continue
+
+                wanted: List[str] = entry["standings_columns"] if columns is None else list(columns)
+                data: Dict[str, np.ndarray] = {
+                    column: _read_member(
+                        store,
+                        f"{league}/{season}/standings/{entry['standings_columns'].index(column)}.npy",
+                    )[selected]
+                    for column in wanted
+                }
+
+                n_clubs: int = next(iter(data.values())).shape[1] if data else 0
+                frame: pd.DataFrame = pd.DataFrame({column: values.ravel() for column, values in data.items()})
+                frame.insert(0, "Round", np.repeat([stored_rounds[i] for i in selected], n_clubs))
+                frame.insert(0, "Season", season)
+                frames.append(frame)
+
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def load_rank_tables(self, league: str, seasons: Iterable[int] = None) -> Dict[int, pd.DataFrame]:
+        """
+        Loads rank tables in the same format as the CSVs under `rank_tables/`.
+
+        Seasons that are not in the store are skipped.
+
+        Parameters:
+            league (str): The league name.
+            seasons (iterable, optional): The seasons to load. If None, all of them.
+
+        Returns:
+            dict: The rank table of every season.
+        """
+        index: Dict = self.__get_index()[league]
+        rank_tables: Dict[int, pd.DataFrame] = {}
+
+        with zipfile.ZipFile(self.path) as store:
+            for season in self.seasons(league) if seasons is None else seasons:
+                columns: List[str] = index[season]["rank_table_columns"] if season in index else []
+                if not columns:
+                    continue
+
+                rank_tables[season] = pd.DataFrame(
+                    {
+                        column: _read_member(store, f"{league}/{season}/rank_table/{i}.npy")
+                        for i, column in enumerate(columns)
+                    }
+                )
+
+        return rank_tables
+
+    def load_rank_cube(
+        self, league: str, seasons: Iterable[int] = None, registry: ClubRegistry = None
+    ) -> RankCube:
+        """
+        Loads rank tables as a rank cube.
+
+        Parameters:
+            league (str): The league name.
+            seasons (iterable, optional): The seasons to load. If None, all of them.
+            registry (ClubRegistry, optional): The registry the club IDs come from, so cubes of
+                different leagues share them. Default is None.
+
+        Returns:
+            RankCube: The cube, with the seasons as labels.
+        """
+        rank_tables: Dict[int, pd.DataFrame] = self.load_rank_tables(league, seasons)
+
+        return RankCube.from_rank_tables(list(rank_tables.values()), seasons=list(rank_tables), registry=registry)
+
+    def __get_index(self) -> Dict:
+        """
+        Reads the per-season indexes of the store once.
+
+        Returns:
+            dict: The index of every season, keyed by league then season.
+        """
+        if self.__index is None:
+            self.__index = {}
+
+            if os.path.exists(self.path):
+                with zipfile.ZipFile(self.path) as store:
+                    for name in store.namelist():
+                        if name.endswith("/index.json"):
+                            league, season, _ = name.rsplit("/", 2)
+                            self.__index.setdefault(league, {})[int(season)] = json.loads(store.read(name))
+
+        return self.__index
+
+
+def convert_csv_layout(data_folder: str, store_path: str, league: str = None) -> StandingsStore:
+    """
+    Converts the CSV layout written by `LeagueScrapper.scrape_tables` into a standings store.
+
+    Parameters:
+        data_folder (str): The league folder, with `matchweek_standings/{year}/{matchweek}.csv`
+            and `rank_tables/{year}.csv`.
+        store_path (str): The path of the store file.
+        league (str, optional): The league name in the store. If None, the name of `data_folder`.
+
+    Returns:
+        StandingsStore: The store with every season found in `data_folder`.
+    """
+    league = league or os.path.basename(os.path.normpath(data_folder))
+    store: StandingsStore = StandingsStore(store_path)
+
+    standings_folder: str = os.path.join(data_folder, "matchweek_standings")
+    rank_tables_folder: str = os.path.join(data_folder, "rank_tables")
+
+    seasons: set = set()
+    for folder in (standings_folder, rank_tables_folder):
+        if os.path.isdir(folder):
+            seasons.update(int(os.path.splitext(name)[0]) for name in os.listdir(folder) if name[:4].isdigit())
+
+    for season in sorted(seasons):
+        if season in store.seasons(league):
+            continue
+
+        season_folder: str = os.path.join(standings_folder, f"{season}")
+        matchweek_standings: Dict[int, pd.DataFrame] = {}
+        if os.path.isdir(season_folder):
+            for name in os.listdir(season_folder):
+                if name.endswith(".csv"):
+                    matchweek_standings[int(name[:-4])] = pd.read_csv(os.path.join(season_folder, name)).drop(
+                        columns=["Unnamed: 0"], errors="ignore"
+                    )
+
+        rank_table: pd.DataFrame = None
+        rank_table_path: str = os.path.join(rank_tables_folder, f"{season}.csv")
+        if os.path.exists(rank_table_path):
+            rank_table = pd.read_csv(rank_table_path).drop(columns=["Unnamed: 0"], errors="ignore")
+
+        store.write_season(league, season, matchweek_standings, rank_table)
+
+    return store
+
+
+def _column_array(values: List[pd.Series]) -> np.ndarray:
+    """
+    Stacks the values of one column over several matchweeks into a single array.
+
+    Numeric columns become int64 (float64 if they have missing values), everything else becomes
+    a fixed-width unicode array, so members never need pickling.
+
+    Parameters:
+        values (list): One series per matchweek, all with the same length.
+
+    Returns:
+        np.ndarray: The column with shape (matchweeks, clubs).
+    """
+    stacked: pd.Series = pd.concat(values, ignore_index=True)
+    numeric: pd.Series = pd.to_numeric(stacked, errors="coerce")
+
+    if numeric.notna().sum() == stacked.notna().sum():
+        if numeric.notna().all() and (numeric == numeric.round()).all():
+            array: np.ndarray = numeric.to_numpy(dtype=np.int64)
+        else:
+            array = numeric.to_numpy(dtype=np.float64)
+    else:
+        array = stacked.fillna("").astype(str).to_numpy(dtype=str)
+
+    return array.reshape(len(values), -1)
+
+
+def _write_member(store: zipfile.ZipFile, name: str, array: np.ndarray):
+    """
+    Writes an array as a .npy member of the store.
+
+    Parameters:
+        store (zipfile.ZipFile): The store, opened for appending.
+        name (str): The member name.
+        array (np.ndarray): The array to write.
+    """
+    with store.open(name, "w", force_zip64=True) as member:
+        np.lib.format.write_array(member, np.ascontiguousarray(array), allow_pickle=False)
+
+
+def _read_member(store: zipfile.ZipFile, name: str) -> np.ndarray:
+    """
+    Reads a .npy member of the store.
+
+    Parameters:
+        store (zipfile.ZipFile): The store, opened for reading.
+        name (str): The member name.
+
+    Returns:
+        np.ndarray: The array.
+    """
+    with store.open(name) as member:
+        return np.lib.format.read_array(member, allow_pickle=False)
@@ -0,0 +1,147 @@
+"""
+Headless rendering of the per-season report figures: rank positions and Spearman / tau curves.
+
+Figures are drawn on Agg canvases without pyplot, so no display or GUI event loop is needed and
+nothing is kept alive between figures. Every season is an independent task of a process pool.
+"""
+
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from src.calculations.utils import spearman_tau_table
+from src.visualization.utils import draw_curves, draw_positions
+from src.instrumentation import instrument
+
+
+@instrument()
+def render_season(
+    rank_table: pd.DataFrame,
+    output_folder: str,
+    name: str,
+    title: str = None,
+    image_format: str = "png",
+    fig_size: tuple = (14, 8),
+    dpi: int = 100,
+    line_width: float = 0.9,
+) -> List[str]:
+    """
+    Renders the position and Spearman / tau figures of one season to files.
+
+    Parameters:
+        rank_table (pd.DataFrame): The table with club rankings over different matchweeks.
+        output_folder (str): The folder where the figures are written.
+        name (str): The file name prefix, such as the season.
+        title (str, optional): The title of both figures. Default is None.
+        image_format (str, optional): Any format supported by Agg, such as "png", "svg" or "pdf". Default is "png".
+        fig_size (tuple, optional): The size of the figures. Default is (14, 8).
+        dpi (int, optional): The resolution of raster formats. Default is 100.
+        line_width (float, optional): The width of the position lines. Default is 0.9.
+
+    Returns:
+        list: The paths of the `{name}_positions` and `{name}_spearman_tau` files.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    os.makedirs(output_folder, exist_ok=True)
+    plot_points_corr, plot_points_tau = spearman_tau_table(rank_table, return_as_list=True)
+
+    paths: List[str] = []
+    for kind in ("positions", "spearman_tau"):
+        fig: Figure = Figure(figsize=fig_size, dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+
+        if kind == "positions":
+            draw_positions(ax, rank_table, line_width)
+        else:
+            draw_curves(
+                ax,
+                [plot_points_corr, plot_points_tau],
+                ["Correlação de Spearman", "Distância de tau normalizada"],
+                ["orange", "black"],
+                line_width,
+            )
+
+        if title is not None:
+            ax.set_title(title)
+
+        path: str = os.path.join(output_folder, f"{name}_{kind}.{image_format}")
+        # The default zlib level spends more time compressing a PNG than drawing it
+        fig.savefig(path, format=image_format, pil_kwargs={"compress_level": 1} if image_format == "png" else None)
+        paths.append(path)
+
+    return paths
+
+
+def render_leagues(
+    leagues: Dict[str, str],
+    output_folder: str,
+    workers: int = None,
+    image_format: str = "png",
+    dpi: int = 100,
+) -> List[Tuple[str, int, float, str]]:
+    """
+    Renders the figures of every season of several leagues, one process pool task per season.
+
+    Parameters:
+        leagues (dict): The folder of every league, keyed by league name, each with one
+            `rank_tables/{year}.csv` per season.
+        output_folder (str): The figures of a league are written to `output_folder/{league}/`.
+        workers (int, optional): The number of processes. If None, the number of CPUs.
+        image_format (str, optional): Any format supported by Agg. Default is "png".
+        dpi (int, optional): The resolution of raster formats. Default is 100.
+
+    Returns:
+        list: (league, season, elapsed seconds, error message or None) for every season.
+    """
+    tasks: List[Tuple] = []
+    for league, folder in sorted(leagues.items()):
+        rank_tables_folder: str = os.path.join(folder, "rank_tables")
+        for name in sorted(os.listdir(rank_tables_folder)):
+            if name.endswith(".csv") and name[:-4].isdigit():
+                tasks.append(
+                    (
+                        league,
+                        int(name[:-4]),
+                        os.path.join(rank_tables_folder, name),
+                        os.path.join(output_folder, league),
+                        image_format,
+                        dpi,
+                    )
+                )
+
+    workers = workers or os.cpu_count() or 1
+    if len(tasks) > 1 and workers > 1:
+        # Seasons are small, so tasks are sent in chunks to amortize the pool overhead
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            return list(executor.map(_render_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+    return [_render_task(task) for task in tasks]
+
+
+def _render_task(task: Tuple) -> Tuple[str, int, float, str]:
+    """
+    Renders one season, reporting failures instead of raising so one bad table does not stop the batch.
+
+    Parameters:
+        task (tuple): The league, the season, the rank table path, the output folder, the image format and the dpi.
+
+    Returns:
+        tuple: The league, the season, the elapsed seconds and the error message, None on success.
+    """
+    league, season, rank_table_path, output_folder, image_format, dpi = task
+    start: float = time.perf_counter()
+
+    try:
+        rank_table: pd.DataFrame = pd.read_csv(rank_table_path).drop(columns=["Unnamed: 0"], errors="ignore")
+        render_season(rank_table, output_folder, f"{season}", f"{league} {season}", image_format, dpi=dpi)
+    except Exception as error:
+        return league, season, time.perf_counter() - start, repr(error)
+
+    return league, season, time.perf_counter() - start, None
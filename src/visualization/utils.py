@@ -1,21 +1,42 @@
-import os
-import sys
-
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
-project_path = os.path.abspath(os.path.join(os.getcwd(), ".."))
-sys.path.append(project_path)
+from typing import List, Sequence
 
-from src.calculations.corr import spearman_corr, normalized_tau_distance  # noqa: E402
+from src.calculations.corr import spearman_corr, normalized_tau_distance
+from src.calculations.rank_cube import rank_table_to_array
 from src.calculations.utils import spearman_tau_table
 
+DEFAULT_CLUB_COLORS: List[str] = [
+    "red",
+    "blue",
+    "green",
+    "orange",
+    "purple",
+    "brown",
+    "pink",
+    "gray",
+    "olive",
+    "cyan",
+    "magenta",
+    "teal",
+    "gold",
+    "lime",
+    "navy",
+    "maroon",
+    "violet",
+    "turquoise",
+    "indigo",
+    "salmon",
+]
+
 
 def positions_visualization(
     year_table: pd.DataFrame,
     line_width: float = 0.9,
     fig_size: tuple = (14, 8),
     colors: list = None,
+    save_path: str = None,
 ):
     """
     Visualizes the positions of clubs throughout a season, showing how the rankings change over the matchweeks.
@@ -25,57 +46,17 @@ def positions_visualization(
         line_width (float, optional): The width of the lines in the plot. Default is 0.9.
         fig_size (tuple, optional): The size of the figure. Default is (14, 8).
         colors (list, optional): List of colors to use for the plot. If None, default colors are used.
+        save_path (str, optional): If given, the figure is saved to this file and closed instead of shown.
 
     Returns:
         None: Displays a plot of the rankings over time.
     """
-    if colors is None:
-        colors = [
-            "red",
-            "blue",
-            "green",
-            "orange",
-            "purple",
-            "brown",
-            "pink",
-            "gray",
-            "olive",
-            "cyan",
-            "magenta",
-            "teal",
-            "gold",
-            "lime",
-            "navy",
-            "maroon",
-            "violet",
-            "turquoise",
-            "indigo",
-            "salmon",
-        ]
-
-    plt.figure(figsize=fig_size)
-
-    for index, row in year_table.iterrows():
-        x = year_table.columns.to_list()[:-1]
-        y = row.to_list()[:-1]
-        plt.plot(x, y, color=colors[index], linewidth=line_width)
-
-    plt.xticks(ticks=[9, 19, 29], rotation=90)
-    plt.yticks(ticks=[i for i in range(1, 21)], labels=year_table["Club"].to_list())
-
-    plt.gca().invert_yaxis()
-
-    ax = plt.gca()
-    ax_right = ax.twinx()  # Criar um eixo Y adicional no lado direito
-    ax_right.set_ylim(
-        ax.get_ylim()
-    )  # Sincronizar os limites do eixo direito com o esquerdo
-    ax_right.set_yticks([20, 15, 10, 5, 1])  # Mesmos ticks do eixo esquerdo
+    import matplotlib.pyplot as plt
 
-    ax_right.set_label("Posição")
-    plt.xlabel("Rodada")
+    fig = plt.figure(figsize=fig_size)
+    draw_positions(fig.gca(), year_table, line_width, colors)
 
-    plt.show()
+    _show_or_save(fig, save_path)
 
 
 def spearman_tau_visualization(
@@ -83,7 +64,8 @@ def spearman_tau_visualization(
     line_width: float = 0.9,
     fig_size: tuple = (14, 8),
     colors: list = None,
-    plot_points: tuple = None
+    plot_points: tuple = None,
+    save_path: str = None,
 ):
     """
     Visualizes the Spearman correlation and normalized Kendall-tau distance for each matchweek.
@@ -93,47 +75,37 @@ def spearman_tau_visualization(
         line_width (float, optional): The width of the lines in the plot. Default is 0.9.
         fig_size (tuple, optional): The size of the figure. Default is (14, 8).
         colors (list, optional): List of colors to use for the plot. If None, default colors are used.
-        plot_points (tuple, optional): A tuple containing the Spearman correlation and Tau distance values. 
+        plot_points (tuple, optional): A tuple containing the Spearman correlation and Tau distance values.
             If None, they will be computed using `spearman_tau_table`.
+        save_path (str, optional): If given, the figure is saved to this file and closed instead of shown.
 
     Returns:
         None: Displays a plot of Spearman correlation and normalized Kendall-tau distance.
     """
-    if colors is None:
-        colors = ["orange", "black"]
+    import matplotlib.pyplot as plt
 
     if plot_points is None:
-        plot_points_corr, plot_points_tau = spearman_tau_table(year_table, return_as_list=True)
-    else:
-        plot_points_corr, plot_points_tau = plot_points[0], plot_points[1]
-
-    x = [i for i in range(1, 39)]
-    y = plot_points_corr
-
-    plt.figure(figsize=fig_size)
-
-    plt.yticks(ticks=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0])
-    plt.ylim((-0.1, 1.1))
-
-    plt.axhline(y=1.0, color="red", linestyle="--", linewidth=line_width).set_dashes(
-        [10, 5]
+        plot_points = spearman_tau_table(year_table, return_as_list=True)
+
+    fig = plt.figure(figsize=fig_size)
+    draw_curves(
+        fig.gca(),
+        [plot_points[0], plot_points[1]],
+        ["Correlação de Spearman", "Distância de tau normalizada"],
+        ["orange", "black"] if colors is None else colors,
+        line_width,
     )
-    plt.axhline(y=0.0, color="red", linestyle="--", linewidth=line_width).set_dashes(
-        [10, 5]
-    )
-
-    plt.xticks(ticks=[10, 20, 30])
-    plt.plot(x, y, label="Correlação de Spearman", color=colors[0])
-
-    x = [i for i in range(1, 39)]
-    y = plot_points_tau
 
-    plt.plot(x, y, label="Distância de tau normalizada", color=colors[1])
+    _show_or_save(fig, save_path)
 
-    plt.legend()
-    plt.show()
-
-def tau_visualization(plot_points_list: list, labels: list, line_width: float = 0.9, fig_size: tuple = (14,8), colors: list = None):
+def tau_visualization(
+    plot_points_list: list,
+    labels: list,
+    line_width: float = 0.9,
+    fig_size: tuple = (14,8),
+    colors: list = None,
+    save_path: str = None,
+):
     """
     Visualizes the normalized Kendall-tau distances for multiple series of rankings, comparing their changes over time.
 
@@ -143,40 +115,110 @@ def tau_visualization(plot_points_list: list, labels: list, line_width: float =
         line_width (float, optional): The width of the lines in the plot. Default is 0.9.
         fig_size (tuple, optional): The size of the figure. Default is (14, 8).
         colors (list, optional): List of colors to use for the plot. If None, colors are generated automatically.
+        save_path (str, optional): If given, the figure is saved to this file and closed instead of shown.
 
     Returns:
         None: Displays a plot of multiple series of Tau distances.
     """
+    import matplotlib.pyplot as plt
+
     if colors is None:
         num_colors = len(plot_points_list)
-        cmap = plt.cm.get_cmap("tab10")  # Usando a paleta "tab10", mas pode ser qualquer outra
+        cmap = plt.get_cmap("tab10")  # Usando a paleta "tab10", mas pode ser qualquer outra
         colors = [cmap(i / num_colors) for i in range(num_colors)]  # Gera cores suficientes
-    
+
     if len(plot_points_list) != len(labels) or len(labels) != len(colors):
         return None
-    
-    plt.figure(figsize=fig_size)
 
-    for plot_points, label, color in zip(plot_points_list, labels, colors):
-        plt.yticks(ticks=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0])
-        plt.ylim((-0.1, 1.1))
+    fig = plt.figure(figsize=fig_size)
+    draw_curves(fig.gca(), plot_points_list, labels, colors, line_width)
 
-        plt.axhline(y=1.0, color="red", linestyle="--", linewidth=line_width).set_dashes(
-            [10, 5]
-        )
-        plt.axhline(y=0.0, color="red", linestyle="--", linewidth=line_width).set_dashes(
-            [10, 5]
-        )
-        plt.xticks(ticks=[10, 20, 30])
+    _show_or_save(fig, save_path)
 
-        x = [i for i in range(1, len(plot_points) + 1)]
-        y = plot_points
-        plt.plot(x, y, label=label, color=color)
 
-    plt.legend()
-    plt.show()
+def draw_positions(ax, year_table: pd.DataFrame, line_width: float = 0.9, colors: list = None):
+    """
+    Draws the positions of every club over a season on an existing axis.
+
+    All clubs go into a single LineCollection, so the cost of a figure does not grow with the
+    number of artists. Works with any Matplotlib backend, including Agg for headless rendering.
 
+    Parameters:
+        ax (matplotlib.axes.Axes): The axis to draw on.
+        year_table (pd.DataFrame): The table with club rankings over different matchweeks.
+        line_width (float, optional): The width of the lines in the plot. Default is 0.9.
+        colors (list, optional): One color per club, reused cyclically. If None, `DEFAULT_CLUB_COLORS`.
+    """
+    from matplotlib.collections import LineCollection
 
+    colors = DEFAULT_CLUB_COLORS if colors is None else colors
+
+    positions: np.ndarray = rank_table_to_array(year_table)
+    n_teams, n_rounds = positions.shape
+    matchweeks: np.ndarray = np.arange(1, n_rounds + 1, dtype=np.float64)
+
+    segments: np.ndarray = np.stack([np.broadcast_to(matchweeks, positions.shape), positions], axis=-1)
+    ax.add_collection(
+        LineCollection(segments, colors=[colors[i % len(colors)] for i in range(n_teams)], linewidths=line_width)
+    )
+    ax.autoscale_view()
+
+    ax.set_xticks([matchweek for matchweek in (10, 20, 30) if matchweek <= n_rounds])
+    ax.tick_params(axis="x", labelrotation=90)
+    ax.set_yticks(range(1, n_teams + 1), labels=year_table["Club"].to_list())
+
+    ax.invert_yaxis()
+
+    ax_right = ax.twinx()  # Criar um eixo Y adicional no lado direito
+    ax_right.set_ylim(ax.get_ylim())  # Sincronizar os limites do eixo direito com o esquerdo
+    ax_right.set_yticks(sorted({1, 5, 10, 15, n_teams} & set(range(1, n_teams + 1)), reverse=True))
+
+    ax_right.set_label("Posição")
+    ax.set_xlabel("Rodada")
+
+
+def draw_curves(ax, plot_points_list: Sequence, labels: Sequence[str], colors: Sequence, line_width: float = 0.9):
+    """
+    Draws per-matchweek curves in [0, 1], such as Spearman and tau, on an existing axis.
+
+    The curves go into a single LineCollection, with the dashed reference lines at 0 and 1.
+
+    Parameters:
+        ax (matplotlib.axes.Axes): The axis to draw on.
+        plot_points_list (sequence): One sequence of values per curve, starting at matchweek 1.
+        labels (sequence): The legend label of every curve.
+        colors (sequence): The color of every curve.
+        line_width (float, optional): The width of the reference lines. Default is 0.9.
+    """
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
+    segments: List[np.ndarray] = [
+        np.column_stack([np.arange(1, len(plot_points) + 1), np.asarray(plot_points, dtype=np.float64)])
+        for plot_points in plot_points_list
+    ]
+    ax.add_collection(LineCollection(segments, colors=list(colors)))
+    ax.autoscale_view()
+
+    ax.set_yticks([0.0, 0.2, 0.4, 0.6, 0.8, 1.0])
+    ax.set_ylim((-0.1, 1.1))
+    ax.set_xticks([10, 20, 30])
+
+    for reference in (1.0, 0.0):
+        ax.axhline(y=reference, color="red", linestyle="--", linewidth=line_width).set_dashes([10, 5])
+
+    ax.legend(handles=[Line2D([], [], color=color, label=label) for color, label in zip(colors, labels)])
+
+
+def _show_or_save(fig, save_path: str = None):
+    """
+    Shows a pyplot figure, or saves it to `save_path` and closes it so batch runs do not accumulate figures.
+    """
+    import matplotlib.pyplot as plt
 
-    
+    if save_path is None:
+        plt.show()
+        return
 
+    fig.savefig(save_path)
+    plt.close(fig)
@@ -0,0 +1,42 @@
+from benchmarks.run import find_regressions, run_environment
+
+CASE = "spearman_tau_table[teams=20]"
+HERE = {"machine": "ci-runner", "python": "3.12.1", "numpy": "2.1.0"}
+
+
+def record(seconds: float, **environment) -> dict:
+    return {**HERE, **environment, "results": {CASE: seconds}}
+
+
+def test_baseline_only_uses_runs_of_the_same_environment():
+    history = [
+        record(1.0),
+        record(1.0),
+        # A faster host, a newer Python and a newer NumPy, all more recent
+        record(0.5, machine="workstation"),
+        record(0.5, python="3.13.0"),
+        record(0.5, numpy="2.2.0"),
+    ]
+
+    assert find_regressions({CASE: 1.1}, history, threshold=0.2, environment=HERE) == {}
+    assert find_regressions({CASE: 1.3}, history, threshold=0.2, environment=HERE) == {CASE: (1.0, 1.3)}
+
+    # Mixing the hosts makes the same run look like a regression
+    assert CASE in find_regressions({CASE: 1.1}, history, threshold=0.2)
+
+
+def test_window_counts_only_matching_runs():
+    history = [record(1.0), record(2.0)] + [record(0.1, machine="workstation")] * 5
+
+    assert find_regressions({CASE: 1.7}, history, threshold=0.2, window=2, environment=HERE) == {}
+    assert find_regressions({CASE: 1.7}, history, threshold=0.2, window=2) == {CASE: (0.1, 1.7)}
+
+
+def test_no_matching_runs_means_no_baseline():
+    history = [record(0.1, machine="workstation")]
+
+    assert find_regressions({CASE: 10.0}, history, threshold=0.2, environment=HERE) == {}
+
+
+def test_run_environment_matches_the_history_records():
+    assert set(run_environment()) == {"machine", "python", "numpy"}
@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.calculations.club_registry import ClubRegistry, normalize_club_name
+
+
+@pytest.mark.parametrize(
+    "variant",
+    ["São Paulo FC", "Sao Paulo", "são-paulo", "  SAO  PAULO  ", "São Paulo Futebol Clube"],
+)
+def test_normalization_merges_spelling_variants(variant):
+    assert normalize_club_name(variant) == "sao paulo"
+
+
+def test_normalization_keeps_names_made_only_of_ignored_words():
+    assert normalize_club_name("FC") == "fc"
+    assert normalize_club_name("Brighton & Hove Albion") == "brighton & hove albion"
+
+
+def test_variants_share_an_id_and_the_canonical_name():
+    registry = ClubRegistry()
+
+    assert registry.get_id("Man City") == registry.get_id("Manchester City FC") == 0
+    assert registry.get_id("Wolves") == registry.get_id("Wolverhampton Wanderers") == 1
+    assert registry.names == ["Manchester City", "Wolverhampton Wanderers"]
+
+    assert registry.get_id("Flamengo", create=False) == -1
+    np.testing.assert_array_equal(registry.ids(["Wolverhampton", "Flamengo"], create=False), [1, -1])
+    assert len(registry) == 2
+
+
+def test_added_alias_resolves_to_the_club():
+    registry = ClubRegistry(aliases={})
+    sport = registry.get_id("Sport Recife")
+
+    registry.add_alias("Sport", "Sport Recife")
+
+    assert registry.get_id("Sport Club do Recife") == sport
+    assert registry.get_id("Sport") == sport
+    assert len(registry) == 1
+
+
+def test_alias_seen_first_keeps_its_id():
+    registry = ClubRegistry(aliases={})
+    spurs = registry.get_id("Spurs")
+
+    registry.add_alias("Spurs", "Tottenham Hotspur")
+
+    assert registry.get_id("Tottenham Hotspur") == spurs
+    assert len(registry) == 1
+
+
+def test_conflicting_alias_raises_and_changes_nothing():
+    registry = ClubRegistry(aliases={})
+    wolves = registry.get_id("Wolves")
+    wolverhampton = registry.get_id("Wolverhampton Wanderers")
+
+    with pytest.raises(ValueError):
+        registry.add_alias("Wolves", "Wolverhampton Wanderers")
+
+    assert registry.get_id("Wolves") == wolves == 0
+    assert registry.get_id("Wolverhampton Wanderers") == wolverhampton == 1
+
+    # Restating an alias the registry already follows is not a conflict
+    registry.add_alias("Wolverhampton Wanderers FC", "Wolverhampton Wanderers")
+    assert registry.get_id("Wolverhampton Wanderers FC") == wolverhampton
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "registry" / "clubs.json")
+    registry = ClubRegistry(path, aliases={"Athletico Paranaense": ["Atlético-PR"]})
+    ids = registry.ids(["Palmeiras", "Atlético-PR", "Grêmio"])
+    registry.add_alias("Sport", "Sport Recife")
+    registry.save()
+
+    loaded = ClubRegistry(path, aliases={})
+
+    assert loaded.names == ["Palmeiras", "Athletico Paranaense", "Grêmio"]
+    np.testing.assert_array_equal(loaded.ids(["Palmeiras", "Atlético-PR", "Gremio"], create=False), ids)
+    # New clubs continue the numbering, aliases added at run time are kept
+    assert loaded.get_id("Sport") == loaded.get_id("Sport Recife") == 3
+
+    with open(path, encoding="utf-8") as registry_file:
+        assert set(json.load(registry_file)) == {"names", "keys", "aliases"}
+    assert [entry.name for entry in tmp_path.joinpath("registry").iterdir()] == ["clubs.json"]
@@ -0,0 +1,201 @@
+import os
+import re
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import pytest
+
+from src.calculations.club_registry import ClubRegistry
+from src.scraping.concurrent_scrapper import ConcurrentLeagueScrapper, build_rank_table, parse_standings_table
+
+FORMTABELLE = os.path.join(os.path.dirname(__file__), "fixtures", "transfermarkt", "formtabelle_premier_league_2016_1_10.html")
+
+ROW = re.compile(r'<tr class="(?:odd|even)">.*?</tr>\n', re.S)
+
+
+def matchweek_page(html: str, order: List[int], renames: Dict[str, str] = None) -> str:
+    """
+    The formtabelle page with its clubs reordered (`order` lists the current row of every new
+    position) and renumbered, and some clubs renamed.
+    """
+    rows = ROW.findall(html)
+    body = "".join(
+        re.sub(r">\d+&nbsp;<", f">{position}&nbsp;<", rows[row], count=1) for position, row in enumerate(order, 1)
+    )
+    start, end = html.index(rows[0]), html.index(rows[-1]) + len(rows[-1])
+    page = html[:start] + body + html[end:]
+
+    for name, rename in (renames or {}).items():
+        page = page.replace(f">{name}</a>", f">{rename}</a>")
+
+    return page
+
+
+def incomplete_page(html: str) -> str:
+    """The page as served before the standings widget is rendered."""
+    return re.sub(r'<div class="responsive-table">.*?</table>\s*</div>', "", html, flags=re.S)
+
+
+class TransfermarktStub:
+    """
+    Serves saved pages on a free local port, logging the path and time of every request.
+
+    `pages` maps a path to its page; a list of pages is served in turn, repeating the last one.
+    """
+
+    def __init__(self, pages: Dict[str, object]):
+        self.pages = pages
+        self.requests: List[Tuple[str, float]] = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub.lock:
+                    served = sum(path == self.path for path, _ in stub.requests)
+                    stub.requests.append((self.path, time.monotonic()))
+
+                page = stub.pages.get(self.path)
+                if isinstance(page, list):
+                    page = page[min(served, len(page) - 1)]
+                if page is None:
+                    self.send_error(404)
+                    return
+
+                content = page.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url_template(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/{{year}}/{{matchweek}}"
+
+    def count(self, path: str) -> int:
+        return sum(requested == path for requested, _ in self.requests)
+
+    def __enter__(self) -> "TransfermarktStub":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def formtabelle() -> str:
+    with open(FORMTABELLE, encoding="utf-8") as page:
+        return page.read()
+
+
+@pytest.fixture
+def season_pages(formtabelle) -> Dict[str, object]:
+    """Three matchweeks of 2016: the fixture, Liverpool and Man City swapped, then Arsenal on top."""
+    order = list(range(20))
+    second, third = order[:], order[:]
+    second[0], second[1] = 1, 0
+    third[0], third[1], third[2] = 2, 1, 0
+
+    return {
+        "/2016/1": formtabelle,
+        # The first poll sees the page before the table is rendered
+        "/2016/2": [incomplete_page(matchweek_page(formtabelle, second)), matchweek_page(formtabelle, second)],
+        "/2016/3": matchweek_page(formtabelle, third),
+    }
+
+
+def make_scrapper(stub: TransfermarktStub, save_folder: str, **kwargs) -> ConcurrentLeagueScrapper:
+    kwargs = {"n_workers": 3, "requests_per_second": 20, "poll_interval": 0.01, "max_wait": 5, **kwargs}
+    return ConcurrentLeagueScrapper(stub.url_template, save_folder, **kwargs)
+
+
+def test_scrapes_season_into_rank_table(season_pages, tmp_path):
+    with TransfermarktStub(season_pages) as stub:
+        rank_tables = make_scrapper(stub, str(tmp_path)).scrape_tables(2016, 2016, 1, 3)
+
+    rank_table = rank_tables[2016]
+    # Like `LeagueScrapper`, later matchweeks keep the positions as scraped text until saved
+    clubs = rank_table.set_index("Club")[[1, 2, 3]].astype(int)
+    assert rank_table["Club"].tolist()[:3] == ["Liverpool", "Man City", "Arsenal"]
+    assert clubs.loc["Liverpool"].tolist() == [1, 2, 3]
+    assert clubs.loc["Man City"].tolist() == [2, 1, 2]
+    assert clubs.loc["Arsenal"].tolist() == [3, 3, 1]
+    assert clubs.loc["Chelsea"].tolist() == [4, 4, 4]
+
+    saved = pd.read_csv(tmp_path / "rank_tables" / "2016.csv", index_col=0)
+    assert saved["Club"].tolist() == rank_table["Club"].tolist()
+    assert saved["3"].tolist() == clubs[3].tolist()
+    for matchweek in (1, 2, 3):
+        assert (tmp_path / "matchweek_standings" / "2016" / f"{matchweek}.csv").exists()
+
+
+def test_incomplete_page_is_polled_until_the_table_renders(season_pages, tmp_path):
+    with TransfermarktStub(season_pages) as stub:
+        make_scrapper(stub, str(tmp_path)).scrape_tables(2016, 2016, 1, 3)
+
+    assert stub.count("/2016/1") == 1
+    assert stub.count("/2016/2") == 2
+    assert stub.count("/2016/3") == 1
+
+
+def test_page_that_never_renders_times_out(formtabelle, tmp_path):
+    with TransfermarktStub({"/2016/1": incomplete_page(formtabelle)}) as stub:
+        scrapper = make_scrapper(stub, str(tmp_path), max_wait=0.1)
+
+        with pytest.raises(TimeoutError):
+            scrapper.get_standings_page(stub.url_template.format(year=2016, matchweek=1))
+
+    assert stub.count("/2016/1") > 1
+
+
+def test_requests_to_one_host_are_rate_limited(formtabelle, tmp_path):
+    pages = {f"/2016/{matchweek}": formtabelle for matchweek in range(1, 7)}
+
+    with TransfermarktStub(pages) as stub:
+        make_scrapper(stub, str(tmp_path), n_workers=6, requests_per_second=10).scrape_tables(2016, 2016, 1, 6)
+
+    times = sorted(requested_at for _, requested_at in stub.requests)
+    assert len(times) == 6
+    # Six workers start together, yet the requests are spaced by the 0.1 s interval
+    assert min(later - earlier for earlier, later in zip(times, times[1:])) > 0.08
+    assert times[-1] - times[0] > 0.45
+
+
+def test_registry_mode_aligns_renamed_clubs(formtabelle, season_pages, tmp_path):
+    # Transfermarkt names the club "Manchester City" in the later matchweeks
+    season_pages["/2016/3"] = matchweek_page(
+        formtabelle, [2, 1, 0] + list(range(3, 20)), {"Man City": "Manchester City"}
+    )
+    registry = ClubRegistry(str(tmp_path / "registry.json"))
+
+    with TransfermarktStub(season_pages) as stub:
+        rank_table = make_scrapper(stub, str(tmp_path / "league"), registry=registry).scrape_tables(2016, 2016, 1, 3)[2016]
+
+    man_city = rank_table[rank_table["Club"] == "Man City"]
+    assert len(rank_table) == 20 and len(man_city) == 1
+    assert man_city[[1, 2, 3]].astype(int).values.tolist() == [[2, 1, 2]]
+    assert man_city["ClubID"].item() == registry.get_id("Manchester City", create=False)
+    assert rank_table["ClubID"].tolist() == list(range(20))
+
+    # The registry was saved, so a new session gives the clubs the same IDs
+    assert ClubRegistry(str(tmp_path / "registry.json")).ids(rank_table["Club"]).tolist() == list(range(20))
+
+    # Without the registry the renamed club cannot be aligned by name
+    standings = {
+        matchweek: parse_standings_table(season_pages[f"/2016/{matchweek}"]) for matchweek in (1, 3)
+    }
+    with pytest.raises(KeyError):
+        build_rank_table(standings)
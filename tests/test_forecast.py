@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.calculations.forecast import MAX_GOALS, forecast_final_positions, score_tables
+from src.calculations.team_strength import TeamStrengths
+from src.scraping.match_results import parse_fixtures_html, partial_standings_from_results
+
+GESAMTSPIELPLAN = os.path.join(
+    os.path.dirname(__file__), "fixtures", "transfermarkt", "gesamtspielplan_premier_league_2016_1_4.html"
+)
+
+
+@pytest.fixture
+def round_one_standings():
+    with open(GESAMTSPIELPLAN, encoding="utf-8") as page:
+        results = parse_fixtures_html(page.read())
+
+    return partial_standings_from_results(results)[1]
+
+
+def test_zero_rate_always_scores_zero():
+    tables = score_tables(np.array([0.0, 1.5, 0.0]), np.array([1.2, 0.0, 0.0]))
+
+    home_goals, away_goals = tables // MAX_GOALS, tables % MAX_GOALS
+    assert (home_goals[0] == 0).all() and (away_goals[1] == 0).all()
+    assert (tables[2] == 0).all()
+    # The other side keeps its Poisson distribution
+    assert away_goals[0].mean() == pytest.approx(1.2, abs=0.01)
+    assert home_goals[1].mean() == pytest.approx(1.5, abs=0.01)
+
+
+@pytest.mark.parametrize("rate", [np.nan, -1.0, np.inf])
+def test_invalid_rates_are_rejected(rate):
+    with pytest.raises(ValueError):
+        score_tables(np.array([1.0, rate]), np.array([1.0, 1.0]))
+
+
+def test_forecast_after_round_one_with_scoreless_clubs(round_one_standings):
+    # After round one several clubs have scored or conceded nothing
+    assert (round_one_standings["+"] == 0).any() and (round_one_standings["-"] == 0).any()
+
+    strengths = TeamStrengths.from_standings(round_one_standings)
+    # Zero multipliers, as a fit without shrinkage gives them, must not break the score tables
+    strengths.attack[round_one_standings["+"].to_numpy() == 0] = 0.0
+
+    forecast = forecast_final_positions(
+        round_one_standings, played_rounds=1, n_simulations=2_000, strengths=strengths, chunk_size=500
+    )
+
+    probabilities = forecast[list(range(1, 21))].to_numpy()
+    assert np.isfinite(probabilities).all()
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1)
+    np.testing.assert_allclose(probabilities.sum(axis=0), 1)
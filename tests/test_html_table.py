@@ -0,0 +1,174 @@
+import os
+import re
+
+from html.parser import HTMLParser
+
+import pandas as pd
+import pytest
+
+from src.scraping import html_table
+from src.scraping.html_table import format_standings_data, has_standings_table, parse_standings_html
+from src.scraping.league_scrapper import LeagueScrapper
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "transfermarkt")
+FORMTABELLE = os.path.join(FIXTURES, "formtabelle_premier_league_2016_1_10.html")
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+BLOCK_TAGS = {"div", "p", "br", "tr", "li", "ul", "table", "thead", "tbody", "h1", "h2", "form", "header", "footer"}
+
+
+class WebElement:
+    """
+    A stand-in for Selenium's WebElement over a static page, with the `.text` rules of a browser:
+    scripts, styles and hidden elements are skipped, block elements break lines, runs of
+    whitespace (non-breaking spaces included) collapse and every line is trimmed.
+    """
+
+    def __init__(self, tag: str, attrs: dict):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+
+    def find_element(self, by: str, value: str) -> "WebElement":
+        found = self.find_elements(by, value)
+        if not found:
+            raise LookupError(f"No element with {by} {value}")
+        return found[0]
+
+    def find_elements(self, by: str, value: str) -> list:
+        found = []
+        for child in self.children:
+            if isinstance(child, WebElement):
+                if (by == "tag name" and child.tag == value) or (
+                    by == "class name" and value in (child.attrs.get("class") or "").split()
+                ):
+                    found.append(child)
+                found.extend(child.find_elements(by, value))
+        return found
+
+    @property
+    def text(self) -> str:
+        lines = [" ".join(line.replace("\xa0", " ").split()) for line in self._raw_text().split("\n")]
+        return "\n".join(line for line in lines if line)
+
+    def _raw_text(self) -> str:
+        if self.tag in ("script", "style") or "display:none" in (self.attrs.get("style") or "").replace(" ", ""):
+            return ""
+
+        text = "".join(child if isinstance(child, str) else child._raw_text() for child in self.children)
+        return f"\n{text}\n" if self.tag in BLOCK_TAGS else text
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = WebElement("document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        element = WebElement(tag, dict(attrs))
+        self.stack[-1].children.append(element)
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag == tag:
+                del self.stack[depth:]
+                break
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def selenium_table_df(html: str, scrapper: LeagueScrapper) -> pd.DataFrame:
+    """
+    The extraction of the original Selenium scrapper, one `.text` per cell, fed to its formatter.
+    """
+    builder = _TreeBuilder()
+    builder.feed(html)
+
+    table = builder.root.find_element("class name", "responsive-table").find_element("tag name", "table")
+
+    headers = [th.text.strip() for th in table.find_element("tag name", "thead").find_elements("tag name", "th")]
+    headers.append("url")
+
+    rows, indexes = [], []
+    for row in table.find_element("tag name", "tbody").find_elements("tag name", "tr"):
+        columns = row.find_elements("tag name", "td")
+        if columns:
+            indexes.append(columns[0].text.strip())
+            rows.append([column.text.strip() for column in columns])
+
+    return scrapper._LeagueScrapper__format_standings_data(rows, headers, indexes)
+
+
+def parsed_table_df(html: str) -> pd.DataFrame:
+    headers, rows, indexes = parse_standings_html(html)
+    return format_standings_data(rows, headers, indexes)
+
+
+@pytest.fixture
+def formtabelle() -> str:
+    with open(FORMTABELLE, encoding="utf-8") as page:
+        return page.read()
+
+
+@pytest.fixture
+def scrapper(tmp_path) -> LeagueScrapper:
+    return LeagueScrapper("http://localhost/{year}/{matchweek}", str(tmp_path))
+
+
+@pytest.fixture
+def find_calls(monkeypatch) -> list:
+    """Records the markup handed to `_find_standings_table`, to tell the snippet path from the fallback."""
+    calls = []
+    find = html_table._find_standings_table
+
+    def recording_find(html):
+        calls.append(html)
+        return find(html)
+
+    monkeypatch.setattr(html_table, "_find_standings_table", recording_find)
+    return calls
+
+
+@pytest.fixture(params=["html.parser", "lxml"])
+def parser(request, monkeypatch) -> str:
+    if request.param == "lxml":
+        pytest.importorskip("lxml")
+    monkeypatch.setattr(html_table, "HTML_PARSER", request.param)
+    return request.param
+
+
+def test_formtabelle_matches_selenium_path(formtabelle, scrapper, parser, find_calls):
+    table_df = parsed_table_df(formtabelle)
+
+    pd.testing.assert_frame_equal(table_df, selenium_table_df(formtabelle, scrapper))
+    # O recorte da tabela bastou: a página inteira nunca foi lida
+    assert len(find_calls) == 1 and find_calls[0] != formtabelle
+
+    assert table_df["Club"].tolist()[:4] == ["Liverpool", "Man City", "Arsenal", "Chelsea"]
+    assert table_df["Pts"].tolist()[:4] == ["23", "23", "23", "22"]
+    assert table_df["SG"].tolist()[:4] == ["16", "14", "13", "13"]
+    assert table_df.index.tolist() == [str(position) for position in range(1, 21)]
+
+
+def test_snippet_miss_falls_back_to_whole_page(formtabelle, scrapper, parser, find_calls):
+    # A table between the first mention of "responsive-table" (in a script) and the standings
+    # makes the cut snippet end early, so the whole page has to be parsed
+    html = formtabelle.replace("<main>", '<main>\n<table class="breadcrumb"><tr><td>Premier League</td></tr></table>', 1)
+
+    table_df = parsed_table_df(html)
+
+    assert len(find_calls) == 2 and find_calls[1] is html
+    pd.testing.assert_frame_equal(table_df, selenium_table_df(html, scrapper))
+    pd.testing.assert_frame_equal(table_df, parsed_table_df(formtabelle))
+
+
+def test_page_without_table_raises(formtabelle):
+    html = re.sub(r'<div class="responsive-table">.*?</table>', "", formtabelle, flags=re.S)
+
+    assert not has_standings_table(html.replace("responsive-table", ""))
+    with pytest.raises(ValueError):
+        parse_standings_html(html)
@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.calculations.league_table import LeagueTable
+from src.scraping.match_results import (
+    RESULT_COLUMNS,
+    parse_fixtures_html,
+    partial_standings_from_results,
+    rank_table_from_results,
+    read_results_csv,
+)
+
+GESAMTSPIELPLAN = os.path.join(
+    os.path.dirname(__file__), "fixtures", "transfermarkt", "gesamtspielplan_premier_league_2016_1_4.html"
+)
+
+
+@pytest.fixture
+def gesamtspielplan() -> str:
+    with open(GESAMTSPIELPLAN, encoding="utf-8") as page:
+        return page.read()
+
+
+@pytest.fixture
+def results(gesamtspielplan) -> pd.DataFrame:
+    return parse_fixtures_html(gesamtspielplan)
+
+
+def football_data_csv(results: pd.DataFrame, path, rng: np.random.Generator) -> pd.DataFrame:
+    """Writes results the way football-data.co.uk does: no matchweek, one date per match, rows shuffled."""
+    dates = pd.Timestamp("2016-08-13") + pd.to_timedelta(7 * (results["Round"] - 1), unit="D")
+    csv = pd.DataFrame(
+        {
+            "Div": "E0",
+            "Date": dates.dt.strftime("%d/%m/%y"),
+            "HomeTeam": results["Home"],
+            "AwayTeam": results["Away"],
+            "FTHG": results["HomeGoals"],
+            "FTAG": results["AwayGoals"],
+            "FTR": np.where(results["HomeGoals"] > results["AwayGoals"], "H", "A"),
+        }
+    )
+    csv.iloc[rng.permutation(len(csv))].to_csv(path, index=False)
+    return csv
+
+
+def test_fixtures_page_is_parsed(results):
+    assert results.columns.tolist() == RESULT_COLUMNS
+    # The sidebar boxes ("Last 5 matches", "Table") and the two unplayed matches are skipped
+    assert results.groupby("Round").size().to_dict() == {1: 10, 2: 10, 3: 10, 4: 8}
+    assert results.iloc[0].tolist() == [1, "Hull City", "Leicester City", 2, 1]
+    assert results.iloc[-1].tolist() == [4, "Liverpool FC", "Leicester City", 4, 1]
+    assert "Swansea City" not in results.loc[results["Round"] == 4, "Home"].tolist()
+
+
+@pytest.mark.parametrize(
+    "headline",
+    ["{round}.Matchday - 2016/17", "Matchday {round}", "{round}. Spieltag", "{round}ª Rodada", "Rodada {round} - 2016"],
+)
+def test_round_headlines(gesamtspielplan, results, headline):
+    for round_number in range(1, 5):
+        gesamtspielplan = gesamtspielplan.replace(
+            f"\n{round_number}.Matchday - 2016/17\n", headline.format(round=round_number)
+        )
+
+    pd.testing.assert_frame_equal(parse_fixtures_html(gesamtspielplan), results)
+
+
+def test_kick_off_times_are_not_scores(gesamtspielplan, results):
+    for time, twenty_four_hours in (("1:45 PM", "13:45"), ("4:00 PM", "16:00"), ("9:00 PM", "21:00")):
+        gesamtspielplan = gesamtspielplan.replace(f">{time}<", f">{twenty_four_hours}<")
+
+    pd.testing.assert_frame_equal(parse_fixtures_html(gesamtspielplan), results)
+
+
+def test_football_data_csv_gets_rounds_from_dates(results, tmp_path):
+    football_data_csv(results, tmp_path / "E0.csv", np.random.default_rng(0))
+
+    read = read_results_csv(str(tmp_path / "E0.csv"))
+
+    merged = read.merge(results, on=["Home", "Away"], suffixes=("", "_page"))
+    assert len(merged) == len(results)
+    assert (merged["Round"] == merged["Round_page"]).all()
+    assert (merged["HomeGoals"] == merged["HomeGoals_page"]).all()
+
+
+def test_football_data_csv_without_dates_uses_file_order(results, tmp_path):
+    results.rename(columns={"Home": "HomeTeam", "Away": "AwayTeam", "HomeGoals": "FTHG", "AwayGoals": "FTAG"}).drop(
+        columns="Round"
+    ).to_csv(tmp_path / "E0.csv", index=False)
+
+    assert read_results_csv(str(tmp_path / "E0.csv"))["Round"].tolist() == results["Round"].tolist()
+
+
+def test_postponed_match_is_counted_when_played(tmp_path):
+    pd.DataFrame(
+        {
+            "Date": ["01/08/2020", "01/08/2020", "08/08/2020", "10/08/2020"],
+            "HomeTeam": ["A", "C", "A", "B"],
+            "AwayTeam": ["B", "D", "C", "D"],
+            "FTHG": [1, 0, 2, 1],
+            "FTAG": [0, 0, 2, 3],
+        }
+    ).iloc[[3, 2, 1, 0]].to_csv(tmp_path / "results.csv", index=False)
+
+    read = read_results_csv(str(tmp_path / "results.csv"))
+
+    assert dict(zip(zip(read["Home"], read["Away"]), read["Round"])) == {
+        ("A", "B"): 1,
+        ("C", "D"): 1,
+        ("A", "C"): 2,
+        ("B", "D"): 2,
+    }
+
+
+def test_partial_standings_after_every_round(results):
+    standings = partial_standings_from_results(results)
+
+    assert sorted(standings) == [1, 2, 3, 4]
+    assert standings[3]["Club"].tolist()[:3] == ["Manchester City", "Chelsea FC", "Manchester United"]
+    assert standings[3]["Pts"].tolist()[:3] == [9, 9, 9]
+    assert standings[3]["Position"].tolist() == list(range(1, 21))
+
+    # Every round matches a table built from the matches up to that round only
+    rank_table = rank_table_from_results(results).set_index("Club")
+    for round_number, round_standings in standings.items():
+        played = results[results["Round"] <= round_number]
+        table = LeagueTable.from_standings(round_standings)
+        assert table.stats["Matches"].sum() == 2 * len(played)
+        assert round_standings.set_index("Club")["Position"].to_dict() == rank_table[round_number].to_dict()
+
+
+def test_select_views_one_round_of_a_batched_table():
+    table = LeagueTable.from_matches([0, 1, 1], [0, 0, 2], [1, 2, 1], [1, 0, 3], [0, 0, 3], n_teams=3)
+
+    last_round = table.select(-1)
+
+    assert last_round.stats["Pts"].shape == (3,)
+    np.testing.assert_array_equal(last_round["Pts"], table["Pts"][-1])
+    np.testing.assert_array_equal(last_round.positions(), table.positions()[-1])
+    assert last_round.tie_break == table.tie_break
+    assert np.shares_memory(last_round.stats["W"], table.stats["W"])
+
+    with pytest.raises(IndexError):
+        last_round.select(0)
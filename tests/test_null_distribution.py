@@ -0,0 +1,97 @@
+import os
+
+from itertools import permutations
+from math import factorial
+
+import numpy as np
+import pytest
+
+from src.calculations import corr, null_distribution
+from src.calculations.corr import spearman_corr
+from src.calculations.null_distribution import (
+    DEFAULT_TABLES_FOLDER,
+    MAX_EXACT_SPEARMAN_N,
+    P_VALUE_TABLES,
+    PValueTables,
+    spearman_square_sum_counts,
+)
+
+
+@pytest.fixture(autouse=True)
+def tables_in_tmp_path(tmp_path, monkeypatch):
+    """Builds the tables of `spearman_corr` and `kendall_p_value` under tmp_path, not in the user's cache."""
+    monkeypatch.setattr(corr, "P_VALUE_TABLES", PValueTables(str(tmp_path)))
+
+
+def brute_force_counts(n: int) -> np.ndarray:
+    counts = np.zeros(n * (n**2 - 1) // 3 + 1, dtype=np.int64)
+    for permutation in permutations(range(n)):
+        counts[sum((i - rank) ** 2 for i, rank in enumerate(permutation))] += 1
+    return counts
+
+
+@pytest.mark.parametrize("n", range(2, 9))
+def test_spearman_counts_match_brute_force(n):
+    expected = brute_force_counts(n)
+
+    np.testing.assert_array_equal(spearman_square_sum_counts(n), expected)
+    np.testing.assert_array_equal(null_distribution._spearman_split_counts(n), expected)
+
+
+@pytest.mark.parametrize("n", [11, 12])
+def test_split_counts_match_subset_dp(n):
+    np.testing.assert_array_equal(null_distribution._spearman_split_counts(n), spearman_square_sum_counts(n))
+
+
+@pytest.mark.parametrize("n", range(null_distribution.MAX_SUBSET_DP_N + 1, MAX_EXACT_SPEARMAN_N + 1))
+def test_shipped_tables_are_exact_and_loaded_without_building(n, monkeypatch):
+    def fail(statistic, n):
+        raise AssertionError(f"{statistic} {n} was built instead of loaded")
+
+    monkeypatch.setattr(null_distribution, "_null_counts", fail)
+    lower, upper = PValueTables().table("spearman", n)
+
+    counts = np.load(os.path.join(null_distribution.SHIPPED_TABLES_FOLDER, f"spearman_{n}.npz"))["counts"]
+    assert counts.sum() == factorial(n)
+    # Reversing one ranking maps S to its maximum minus S
+    np.testing.assert_array_equal(counts, counts[::-1])
+    # Only adjacent transpositions have S = 2
+    assert counts[2] == n - 1
+
+    assert lower[0] == 1 / factorial(n) and upper[0] == 1.0
+
+
+def test_exact_mode_is_never_sampled():
+    n = MAX_EXACT_SPEARMAN_N
+    final = list(range(1, n + 1))
+    partial = final[:]
+    partial[0], partial[1] = partial[1], partial[0]
+
+    correlation, p_value = spearman_corr(partial, final, alternative="greater", p_value="exact")
+
+    assert correlation == pytest.approx(1 - 12 / (n * (n**2 - 1)))
+    assert p_value == n / factorial(n)
+
+    with pytest.raises(ValueError):
+        spearman_corr(final + [n + 1], final + [n + 1], p_value="exact")
+
+
+def test_permutation_mode_estimates_the_exact_p_value():
+    final = list(range(1, 11))
+    partial = [2, 1, 4, 3, 6, 5, 10, 7, 9, 8]
+
+    _, exact = spearman_corr(partial, final, p_value="exact")
+    _, estimated = spearman_corr(partial, final, p_value="permutation")
+
+    assert estimated == pytest.approx(exact, abs=1e-3)
+    assert os.path.exists(os.path.join(corr.P_VALUE_TABLES.folder, "spearman_permutation_10.npz"))
+
+
+def test_tables_are_cached_in_the_folder(tmp_path, monkeypatch):
+    p_value = PValueTables(str(tmp_path)).kendall_p_value(10, 12)
+    assert os.path.exists(tmp_path / "kendall_12.npz")
+
+    monkeypatch.setattr(null_distribution, "_null_counts", None)
+    assert PValueTables(str(tmp_path)).kendall_p_value(10, 12) == p_value
+
+    assert P_VALUE_TABLES.folder == DEFAULT_TABLES_FOLDER
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from src.calculations.bootstrap import bootstrap_curve_bands
+from src.calculations.power_law import TauPowerLaw, fit_power_laws
+
+N_ROUNDS = 38
+
+
+@pytest.fixture
+def known_curves():
+    """Noisy b * round^a curves with known exponents and multipliers, some points non-positive."""
+    rng = np.random.default_rng(17)
+    power = rng.uniform(-0.9, -0.2, 64)
+    multiplier = rng.uniform(0.1, 0.6, 64)
+    rounds = np.arange(1, N_ROUNDS + 1)
+
+    curves = multiplier[:, None] * rounds ** power[:, None] + rng.normal(0, 0.005, (64, N_ROUNDS))
+    # Flat tails reach 0, which the log-log estimates leave out
+    curves[:4, -3:] = 0.0
+
+    return power, multiplier, curves
+
+
+def squared_residuals(curves, power, multiplier):
+    rounds = np.arange(1, curves.shape[1] + 1)
+    return np.sum((multiplier[:, None] * rounds ** power[:, None] - curves) ** 2, axis=1)
+
+
+def test_refined_fit_matches_curve_fit(known_curves):
+    true_power, true_multiplier, curves = known_curves
+
+    power, multiplier, r_square, _ = fit_power_laws(curves, refine=True)
+
+    expected = np.array([TauPowerLaw.get_power_law_coefficients(curve, 1, N_ROUNDS) for curve in curves])
+    np.testing.assert_allclose(power, expected[:, 0], rtol=1e-4, atol=1e-6)
+    np.testing.assert_allclose(multiplier, expected[:, 1], rtol=1e-4, atol=1e-6)
+
+    # Both fits land near the parameters the curves without zeroed tails were drawn from
+    np.testing.assert_allclose(power[4:], true_power[4:], atol=0.1)
+    np.testing.assert_allclose(multiplier[4:], true_multiplier[4:], atol=0.02)
+
+    r_square_of_curve_fit = [TauPowerLaw(a, b).r_square(curve) for (a, b), curve in zip(expected, curves)]
+    np.testing.assert_allclose(r_square, r_square_of_curve_fit, rtol=1e-6)
+
+
+def test_refinement_never_increases_the_residuals(known_curves):
+    _, _, curves = known_curves
+
+    log_log = fit_power_laws(curves)[:2]
+    refined = fit_power_laws(curves, refine=True)[:2]
+
+    assert (squared_residuals(curves, *refined) <= squared_residuals(curves, *log_log) + 1e-15).all()
+
+
+def test_exact_curves_are_recovered_without_refinement():
+    rounds = np.arange(5, 5 + N_ROUNDS)
+    curves = np.array([0.4 * rounds**-0.5, 0.25 * rounds**-0.7])
+
+    for refine in (False, True):
+        power, multiplier, r_square, _ = fit_power_laws(curves, init_round=5, refine=refine)
+
+        np.testing.assert_allclose(power, [-0.5, -0.7])
+        np.testing.assert_allclose(multiplier, [0.4, 0.25])
+        np.testing.assert_allclose(r_square, 1)
+
+
+def test_bootstrap_power_band_covers_the_fit_of_the_mean_curve():
+    rng = np.random.default_rng(3)
+    # One league: seasons around a single curve
+    rounds = np.arange(1, N_ROUNDS + 1)
+    tau_curves = 0.35 * rounds**-0.45 + rng.normal(0, 0.02, (40, N_ROUNDS))
+
+    _, tau_band, power_band, multiplier_band = bootstrap_curve_bands(
+        np.zeros_like(tau_curves), tau_curves, n_replicates=400, chunk_size=128
+    )
+
+    power, multiplier = TauPowerLaw.get_power_law_coefficients(tau_curves.mean(axis=0), 1, N_ROUNDS)
+    assert power_band[0] <= power <= power_band[1]
+    assert multiplier_band[0] <= multiplier <= multiplier_band[1]
+    assert (tau_band[0] <= tau_curves.mean(axis=0)).all() and (tau_curves.mean(axis=0) <= tau_band[1]).all()
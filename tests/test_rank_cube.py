@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.calculations.rank_cube import RankCube
+from src.calculations.simulation import simulate_seasons
+from src.calculations.transition_table import transition_tensor
+from src.calculations.utils import spearman_tau_curves
+
+
+@pytest.fixture
+def rank_tables():
+    """Two seasons of four clubs over three matchweeks; Derby's last matchweek of 2017 is missing."""
+    return [
+        pd.DataFrame({"1": [1, 2, 3, 4], "2": [2, 1, 3, 4], "3": [1, 2, 4, 3], "Club": ["A", "B", "C", "D"]}),
+        pd.DataFrame({"1": [1, 2, 3, 4], "2": [1, 3, 2, 4], "3": [2, 1, 3, np.nan], "Club": ["B", "A", "E", "Derby"]}),
+    ]
+
+
+def test_save_and_load_round_trip(rank_tables, tmp_path):
+    cube = RankCube.from_rank_tables(rank_tables, seasons=[2016, 2017])
+
+    # The missing position is stored as 0 in the int8 cube
+    assert cube.ranks.dtype == np.int8
+    assert cube.ranks[1, 3, 2] == 0 and (cube.ranks == 0).sum() == 1
+
+    cube.save(str(tmp_path / "cube"))
+    loaded = RankCube.load(str(tmp_path / "cube"))
+
+    assert isinstance(loaded.ranks, np.memmap) and loaded.ranks.dtype == np.int8
+    np.testing.assert_array_equal(loaded.ranks, cube.ranks)
+    np.testing.assert_array_equal(loaded.club_ids, [[0, 1, 2, 3], [1, 0, 4, 5]])
+    assert loaded.club_names == ["A", "B", "C", "D", "E", "Derby"] and loaded.seasons == [2016, 2017]
+
+    expected = rank_tables[1].fillna(0).astype({"3": np.int64})
+    pd.testing.assert_frame_equal(loaded.to_rank_table(1), expected)
+
+    # The missing position is left out of the averages
+    np.testing.assert_array_equal(loaded.club_history(5), [[0, 0, 0], [4, 4, 0]])
+    assert np.isnan(loaded.mean_position_by_club()[5])
+    assert loaded.mean_position_by_club()[0] == pytest.approx(1)
+
+
+def test_correlations_reject_missing_positions(rank_tables, tmp_path):
+    cube = RankCube.from_rank_tables(rank_tables)
+    cube.save(str(tmp_path / "cube"))
+
+    for ranks in (cube, RankCube.load(str(tmp_path / "cube")), np.asarray(cube.ranks)):
+        with pytest.raises(ValueError):
+            spearman_tau_curves(ranks)
+
+    # Transition tables leave the missing position out instead
+    assert transition_tensor(cube)[2, 2].sum() == 7
+
+
+def test_complete_cube_matches_the_rank_tables():
+    ranks = simulate_seasons(1.325, n_teams=6, n_seasons=5, random_seed=3)
+    rank_tables = [
+        pd.DataFrame(season, columns=[f"{i}" for i in range(1, ranks.shape[2] + 1)]).assign(Club=list("ABCDEF"))
+        for season in ranks
+    ]
+
+    from_cube = spearman_tau_curves(RankCube.from_rank_tables(rank_tables))
+    from_tables = spearman_tau_curves(rank_tables)
+
+    np.testing.assert_allclose(from_cube[0], from_tables[0])
+    np.testing.assert_allclose(from_cube[1], from_tables[1])
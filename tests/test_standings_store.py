@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.scraping.match_results import parse_fixtures_html, partial_standings_from_results, save_rank_table_from_results
+from src.scraping.standings_store import StandingsStore, convert_csv_layout
+
+GESAMTSPIELPLAN = os.path.join(
+    os.path.dirname(__file__), "fixtures", "transfermarkt", "gesamtspielplan_premier_league_2016_1_4.html"
+)
+
+
+@pytest.fixture
+def league_folder(tmp_path) -> str:
+    """The CSV layout of `LeagueScrapper`: four matchweeks of 2016 with a rank table, two of 2017 without."""
+    with open(GESAMTSPIELPLAN, encoding="utf-8") as page:
+        results = parse_fixtures_html(page.read())
+
+    folder = tmp_path / "premier_league"
+    standings = partial_standings_from_results(results)
+    for season, rounds in ((2016, [1, 2, 3, 4]), (2017, [1, 2])):
+        os.makedirs(folder / "matchweek_standings" / str(season))
+        for round_number in rounds:
+            standings[round_number].to_csv(folder / "matchweek_standings" / str(season) / f"{round_number}.csv")
+
+    save_rank_table_from_results(results, str(folder), 2016)
+
+    return str(folder)
+
+
+def read_matchweek_csv(league_folder: str, season: int, round_number: int) -> pd.DataFrame:
+    return pd.read_csv(os.path.join(league_folder, "matchweek_standings", str(season), f"{round_number}.csv"), index_col=0)
+
+
+def test_converted_standings_match_the_csvs(league_folder, tmp_path):
+    store = convert_csv_layout(league_folder, str(tmp_path / "store.zip"))
+
+    assert store.leagues() == ["premier_league"] and store.seasons("premier_league") == [2016, 2017]
+
+    columns = ["Club", "Pts", "+", "Position"]
+    # 2015 was never scraped and 2017 stops at matchweek 2, so only three matchweeks are loaded
+    loaded = store.load_standings("premier_league", seasons=[2015, 2016, 2017], rounds=[2, 4, 5], columns=columns)
+
+    expected = pd.concat(
+        [
+            read_matchweek_csv(league_folder, season, round_number)[columns].assign(Season=season, Round=round_number)
+            for season, round_number in ((2016, 2), (2016, 4), (2017, 2))
+        ],
+        ignore_index=True,
+    )[["Season", "Round"] + columns]
+    pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+
+    assert store.load_standings("premier_league", seasons=[2015]).empty
+    assert store.load_standings("premier_league", seasons=[2017], rounds=[3, 4]).empty
+
+
+def test_converted_rank_tables_match_the_csvs(league_folder, tmp_path):
+    convert_csv_layout(league_folder, str(tmp_path / "store.zip"))
+    # A new instance only has the file to read the index from
+    store = StandingsStore(str(tmp_path / "store.zip"))
+
+    rank_tables = store.load_rank_tables("premier_league", seasons=[2015, 2016, 2017])
+
+    assert list(rank_tables) == [2016]
+    expected = pd.read_csv(os.path.join(league_folder, "rank_tables", "2016.csv"), index_col=0)
+    pd.testing.assert_frame_equal(rank_tables[2016], expected, check_dtype=False)
+
+    all_columns = store.load_standings("premier_league", seasons=[2016], rounds=[1])
+    # The CSV index column is not stored
+    csv_columns = read_matchweek_csv(league_folder, 2016, 1).columns.tolist()
+    assert all_columns.columns.tolist() == ["Season", "Round"] + csv_columns
+
+
+def test_conversion_skips_seasons_already_stored(league_folder, tmp_path):
+    store_path = str(tmp_path / "store.zip")
+    convert_csv_layout(league_folder, store_path)
+    size = os.path.getsize(store_path)
+
+    store = convert_csv_layout(league_folder, store_path)
+
+    assert os.path.getsize(store_path) == size
+    assert store.rounds("premier_league", 2016) == [1, 2, 3, 4] and store.rounds("premier_league", 2017) == [1, 2]
+    with pytest.raises(ValueError):
+        store.write_season("premier_league", 2016, rank_table=pd.DataFrame({"Club": ["A"]}))
+
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.calculations.fixtures import fixture_arrays
+from src.calculations.simulation import simulate_seasons
+from src.calculations.team_strength import TeamStrengths
+
+N_TEAMS = 20
+
+
+@pytest.fixture
+def known_strengths() -> TeamStrengths:
+    rng = np.random.default_rng(2016)
+    attack = rng.lognormal(0, 0.25, N_TEAMS)
+    defence = rng.lognormal(0, 0.2, N_TEAMS)
+
+    return TeamStrengths(
+        attack / attack.mean(),
+        defence / defence.mean(),
+        home_advantage=1.3,
+        base_rate=1.2,
+        clubs=[f"{club:02d}" for club in range(N_TEAMS)],
+    )
+
+
+def simulated_results(strengths: TeamStrengths, n_seasons: int, random_seed: int) -> pd.DataFrame:
+    """Draws the goals of every match like `simulate_seasons` and lists them as match results."""
+    home, away = fixture_arrays(strengths.n_teams)
+    rng = np.random.default_rng(random_seed)
+    goals = rng.poisson(strengths.match_rates(home, away), size=(n_seasons,) + home.shape + (2,))
+
+    clubs = np.asarray(strengths.clubs)
+    return pd.DataFrame(
+        {
+            "Round": np.broadcast_to(np.arange(1, home.shape[0] + 1)[:, None], goals.shape[:-1]).ravel(),
+            "Home": clubs[np.broadcast_to(home, goals.shape[:-1]).ravel()],
+            "Away": clubs[np.broadcast_to(away, goals.shape[:-1]).ravel()],
+            "HomeGoals": goals[..., 0].ravel(),
+            "AwayGoals": goals[..., 1].ravel(),
+        }
+    )
+
+
+def test_from_results_recovers_known_parameters(known_strengths):
+    # 60 seasons give every club about 2,300 matches, a standard error of about 2% per multiplier
+    fitted = TeamStrengths.from_results(simulated_results(known_strengths, n_seasons=60, random_seed=7))
+
+    assert fitted.clubs == known_strengths.clubs
+    np.testing.assert_allclose(fitted.attack, known_strengths.attack, rtol=0.06)
+    np.testing.assert_allclose(fitted.defence, known_strengths.defence, rtol=0.06)
+    assert fitted.home_advantage == pytest.approx(known_strengths.home_advantage, rel=0.03)
+    assert fitted.base_rate == pytest.approx(known_strengths.base_rate, rel=0.03)
+
+    # The fitted multipliers keep the normalization of the model
+    assert fitted.attack.mean() == pytest.approx(1) and fitted.defence.mean() == pytest.approx(1)
+
+
+def test_from_results_matches_observed_goals(known_strengths):
+    results = simulated_results(known_strengths, n_seasons=1, random_seed=3)
+    fitted = TeamStrengths.from_results(results, prior_matches=0)
+
+    # At the maximum of the Poisson likelihood, expected and observed totals agree
+    home = np.searchsorted(fitted.clubs, results["Home"])
+    away = np.searchsorted(fitted.clubs, results["Away"])
+    rates = fitted.match_rates(home, away)
+    assert rates[:, 0].sum() == pytest.approx(results["HomeGoals"].sum())
+    assert rates[:, 1].sum() == pytest.approx(results["AwayGoals"].sum())
+
+
+def test_scoreless_clubs_are_shrunk_toward_the_league_mean():
+    standings = pd.DataFrame(
+        {"Club": ["A", "B", "C", "D"], "+": [6, 0, 3, 0], "-": [0, 4, 5, 0], "Matches": [2, 2, 2, 0]}
+    )
+
+    fitted = TeamStrengths.from_standings(standings)
+
+    assert (fitted.attack > 0).all() and (fitted.defence > 0).all()
+    # A club that has not played yet is average
+    assert fitted.attack[3] == pytest.approx(1) and fitted.defence[3] == pytest.approx(1)
+    # One match of prior at 1.5 goals per match: (0 + 1.5) / (3 * 1.5)
+    assert fitted.attack[1] == pytest.approx(1 / 3)
+    # Without the prior, the plain fit gives a zero and, for the club without matches, 0 / 0
+    with np.errstate(invalid="ignore"):
+        unshrunk = TeamStrengths.from_standings(standings, prior_matches=0)
+    assert unshrunk.attack[1] == 0 and np.isnan(unshrunk.attack[3])
+
+
+def test_standings_without_matches_give_the_uniform_model():
+    standings = pd.DataFrame({"Club": ["A", "B", "C"], "+": 0, "-": 0, "Matches": 0})
+
+    fitted = TeamStrengths.from_standings(standings, home_advantage=1.3)
+
+    np.testing.assert_array_equal(fitted.attack, 1)
+    np.testing.assert_array_equal(fitted.defence, 1)
+    assert np.isfinite(fitted.base_rate) and fitted.base_rate > 0
+
+
+def test_from_results_keeps_scoreless_clubs_positive():
+    results = pd.DataFrame(
+        {
+            "Round": [1, 1, 2, 2],
+            "Home": ["A", "C", "A", "B"],
+            "Away": ["B", "D", "C", "D"],
+            "HomeGoals": [0, 2, 0, 1],
+            "AwayGoals": [2, 0, 1, 0],
+        }
+    )
+
+    fitted = TeamStrengths.from_results(results)
+
+    # A and D never score and B never concedes
+    assert np.isfinite(fitted.attack).all() and np.isfinite(fitted.defence).all()
+    assert (fitted.attack > 0).all() and (fitted.defence > 0).all()
+    assert fitted.attack[0] < 1 and fitted.attack[3] < 1 and fitted.defence[1] < 1
+
+
+@pytest.mark.parametrize("poisson_mean", [1.325, 0.8])
+def test_uniform_strengths_reproduce_the_uniform_model(poisson_mean):
+    uniform = simulate_seasons(poisson_mean, N_TEAMS, n_seasons=200, random_seed=11)
+    with_strengths = simulate_seasons(
+        poisson_mean,
+        N_TEAMS,
+        n_seasons=200,
+        random_seed=11,
+        strengths=TeamStrengths.uniform(N_TEAMS, poisson_mean),
+    )
+
+    assert with_strengths.dtype == uniform.dtype
+    np.testing.assert_array_equal(with_strengths, uniform)
+
+
+def test_strengths_must_match_the_league_size():
+    with pytest.raises(ValueError):
+        simulate_seasons(1.325, N_TEAMS, strengths=TeamStrengths.uniform(18))
@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.calculations.simulation import simulate_seasons
+from src.calculations.transition_table import calculate_transitions_cube, transition_tensor
+
+
+def test_tensor_matches_every_round_pair():
+    ranks = simulate_seasons(1.325, n_teams=6, n_seasons=150, random_seed=5)
+
+    transitions = transition_tensor(ranks, chunk_size=16)
+
+    assert transitions.dtype == np.int64 and transitions.shape == (10, 10, 6, 6)
+    for init_round in range(1, 11):
+        for final_round in range(1, 11):
+            expected = calculate_transitions_cube(ranks, init_round, final_round).to_numpy() * 150
+            np.testing.assert_array_equal(transitions[init_round - 1, final_round - 1], np.rint(expected))
+
+    # Every club is at one position after every round
+    assert (transitions.sum(axis=(2, 3)) == 150 * 6).all()
+
+
+def test_missing_positions_are_not_counted():
+    ranks = simulate_seasons(1.325, n_teams=4, n_seasons=3, random_seed=1)
+    ranks[0, 1, 2:] = 0
+
+    transitions = transition_tensor(ranks)
+
+    assert transitions[0, 0].sum() == 12
+    assert transitions[0, 2].sum() == 11
+    assert transitions[2, 2].sum() == 11
+    np.testing.assert_array_equal(transitions[0, 2], transitions[2, 0].T)